@@ -0,0 +1,139 @@
+"""Microbenchmarks of the formula helpers, checked against a stored baseline.
+
+Each case is warmed up, calibrated to run at least `--min-time` seconds per repeat and timed
+`--repeats` times; the fastest time per call is compared with the baseline and the run fails
+when any case is slower by more than `--tolerance`. Baselines are machine specific: record one
+on the machine that runs the comparison.
+
+    python benchmarks/bench_helpers.py                  # compare with the baseline
+    python benchmarks/bench_helpers.py --save-baseline  # record a new baseline
+    python benchmarks/bench_helpers.py -k date --json
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import Callable
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+from harness import load_baseline, machine, measure, regressions, save_baseline
+
+from airtableformulahelpers import (
+    AND,
+    IF,
+    OR,
+    AttachmentsField,
+    BooleanField,
+    DateField,
+    NumberField,
+    TextField,
+    TextListField,
+    id_equals,
+)
+from airtableformulahelpers.binary import decode, encode
+from airtableformulahelpers.evaluate import Row, compile_formula, evaluate
+from airtableformulahelpers.formula import parse, render
+
+BASELINE = Path(__file__).parent / "baselines" / "helpers.json"
+
+text = TextField(name="Name")
+tags = TextListField(name="Tags")
+count = NumberField(name="Count")
+done = BooleanField(name="Done")
+files = AttachmentsField(name="Files")
+due = DateField(name="Due Date")
+when = datetime(2024, 1, 5, 12, 30)
+
+terms_1k = [count.greater_than(i) for i in range(1000)]
+or_1k = OR(*terms_1k)
+or_1k_tree = parse(or_1k)
+or_1k_blob = encode(or_1k_tree)
+record = {"Name": "Ada Lovelace", "Count": 7, "Due Date": "2024-01-05T00:00:00.000Z"}
+filter_formula = AND(
+    text.contains("ada"), count.greater_than(3), due.is_after("2023-12-01"), done.is_false()
+)
+compiled = compile_formula(filter_formula)
+row = Row(record)
+
+
+def _nested(depth: int) -> str:
+    formula = count.equals(0)
+    for i in range(depth):
+        formula = (AND if i % 2 else OR)(formula, count.equals(i))
+    return formula
+
+
+CASES: dict[str, Callable[[], object]] = {
+    "field.construct": lambda: TextField(name="Name"),
+    "text.equals": lambda: text.equals("Ada"),
+    "text._find": lambda: text._find("ada", ">0"),
+    "text._find.case_sensitive": lambda: text._find("Ada", ">0", case_sensitive=True, trim=False),
+    "text._ends_with": lambda: text._ends_with(".com", "="),
+    "text.regex_match": lambda: text.regex_match(r"^\d+$"),
+    "list.contains_any.10": lambda: tags.contains_any([f"tag{i}" for i in range(10)]),
+    "number.greater_than": lambda: count.greater_than(5),
+    "boolean.is_true": done.is_true,
+    "attachments.count_is": lambda: files.count_is(2),
+    "date.is_on.datetime": lambda: due.is_on(when),
+    "date.is_on.text": lambda: due.is_on("2024-01-05"),
+    "date.is_before.days_ago": lambda: due.is_before().days_ago(7),
+    "id_equals": lambda: id_equals("rec123"),
+    "if.then.else": lambda: IF(count.greater_than(5)).THEN("big", string=True).ELSE("small"),
+    "and.1000": lambda: AND(*terms_1k),
+    "or.1000": lambda: OR(*terms_1k),
+    "nested.and_or.50": lambda: _nested(50),
+    "formula.parse.or_1000": lambda: parse(or_1k),
+    "formula.render.or_1000": lambda: render(or_1k_tree),
+    "binary.encode.or_1000": lambda: encode(or_1k_tree),
+    "binary.decode.or_1000": lambda: decode(or_1k_blob),
+    "evaluate.filter": lambda: evaluate(filter_formula, record),
+    "evaluate.compiled": lambda: compiled(row),
+}
+
+
+def main(args: argparse.Namespace) -> int:
+    selected = {name: func for name, func in CASES.items() if args.k in name}
+    timings = []
+    for name, func in selected.items():
+        timing = measure(name, func, args.warmup, args.repeats, args.min_time)
+        timings.append(timing)
+        if not args.json:
+            print(
+                f"{name:32} {timing.median_ns / 1000:12.2f} us  (+/- {timing.stdev_ns / 1000:.2f})"
+            )
+
+    # The fastest repeat is the least disturbed by other load, so it is what gets compared.
+    results = {timing.name: timing.min_ns for timing in timings}
+    if args.save_baseline:
+        save_baseline(args.baseline, {**load_baseline(args.baseline), **results})
+        found = []
+    else:
+        found = regressions(results, load_baseline(args.baseline), args.tolerance)
+
+    if args.json:
+        payload = {
+            "machine": machine(),
+            "tolerance": args.tolerance,
+            "results": [asdict(timing) for timing in timings],
+            "regressions": found,
+        }
+        print(json.dumps(payload, indent=2))
+    else:
+        for regression in found:
+            print(f"REGRESSION {regression['name']}: {regression['ratio']:.2f}x the baseline")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", default="", help="only run cases whose name contains this")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per repeat")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25=25%%")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    sys.exit(main(parser.parse_args()))
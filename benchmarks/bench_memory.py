@@ -0,0 +1,149 @@
+"""Memory footprint of large formula workloads, checked against recorded budgets.
+
+Each case runs under `tracemalloc` and reports the peak allocated while building and what the
+result still holds afterwards. Per-object sizes of `Field`, `THEN` and `ELSE` instances are
+averaged over many instances. The run fails when any number exceeds its budget.
+
+    python benchmarks/bench_memory.py                   # check against the budgets
+    python benchmarks/bench_memory.py --record-budgets  # measure and store new budgets
+    python benchmarks/bench_memory.py -k if --json
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from harness import load_baseline, machine, regressions, save_baseline
+
+from airtableformulahelpers import (
+    IF,
+    OR,
+    DateField,
+    NumberField,
+    TextField,
+    TextListField,
+)
+from airtableformulahelpers.formula import MAX_DEPTH, Members
+
+BUDGETS = Path(__file__).parent / "baselines" / "memory.json"
+
+
+def or_100k() -> str:
+    count = NumberField(name="Count")
+    return OR(*(count.equals(i) for i in range(100_000)))
+
+
+def if_chains_10k() -> list[str]:
+    # Each IF nests the previous one in its ELSE branch, the shape of long lookup tables; chains
+    # stop at MAX_DEPTH, the deepest nesting `parse` accepts, so 10,000 IFs make 100 formulas.
+    count = NumberField(name="Count")
+    formulas = []
+    for start in range(0, 10_000, MAX_DEPTH):
+        formula = '"none"'
+        for i in range(start, start + MAX_DEPTH):
+            formula = IF(count.equals(i)).THEN(f'"v{i}"').ELSE(formula)
+        formulas.append(formula)
+    return formulas
+
+
+def date_comparisons_50k() -> list[str]:
+    fields = [DateField(name=f"Date {i}") for i in range(100)]
+    start = datetime(2024, 1, 1)
+    return [
+        fields[i % 100].is_after(start + timedelta(hours=i))
+        if i % 2
+        else fields[i % 100].is_before().days_ago(i % 365)
+        for i in range(50_000)
+    ]
+
+
+def contains_any_10k() -> str:
+    return TextListField(name="Tags").contains_any([f"tag-{i}" for i in range(10_000)])
+
+
+def record_ids_100k() -> Members:
+    # A reconciliation filter held packed; the ids are generated lazily so only the node counts.
+    return Members.record_ids(f"rec{i:014d}" for i in range(100_000))
+
+
+CASES: dict[str, Callable[[], object]] = {
+    "or_100k": or_100k,
+    "if_chains_10k": if_chains_10k,
+    "date_comparisons_50k": date_comparisons_50k,
+    "contains_any_10k": contains_any_10k,
+    "record_ids_100k": record_ids_100k,
+}
+
+# Instances built by each per-object case; the reported size is per instance.
+OBJECTS: dict[str, Callable[[int], object]] = {
+    "object.Field": lambda i: TextField(name=f"Field {i}"),
+    "object.THEN": lambda i: IF(f"{{A}}={i}"),
+    "object.ELSE": lambda i: IF(f"{{A}}={i}").THEN("x"),
+}
+OBJECT_COUNT = 10_000
+
+
+def traced(build: Callable[[], object]) -> tuple[int, int]:
+    """(peak, retained) bytes allocated by `build`, the result being kept while measuring."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = build()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - before, current - before
+
+
+def measure_all(selected: str) -> dict[str, int]:
+    results: dict[str, int] = {}
+    for name, build in CASES.items():
+        if selected in name:
+            peak, retained = traced(build)
+            results[f"{name}.peak"] = peak
+            results[f"{name}.retained"] = retained
+    for name, make in OBJECTS.items():
+        if selected in name:
+            _, retained = traced(lambda make=make: [make(i) for i in range(OBJECT_COUNT)])
+            results[f"{name}.bytes"] = retained // OBJECT_COUNT
+    return results
+
+
+def main(args: argparse.Namespace) -> int:
+    results = measure_all(args.k)
+    if args.record_budgets:
+        budgets = {name: int(value * (1 + args.headroom)) for name, value in results.items()}
+        save_baseline(args.budgets, {**load_baseline(args.budgets), **budgets})
+        found = []
+    else:
+        found = regressions(results, load_baseline(args.budgets), tolerance=0.0)
+
+    if args.json:
+        payload = {"machine": machine(), "results": results, "over_budget": found}
+        print(json.dumps(payload, indent=2))
+    else:
+        for name, value in results.items():
+            size = f"{value} B" if name.endswith(".bytes") else f"{value / 1024:.1f} KiB"
+            print(f"{name:36} {size:>14}")
+        for over in found:
+            print(f"OVER BUDGET {over['name']}: {over['value']:.0f} > {over['baseline']:.0f} bytes")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", default="", help="only run cases whose name contains this")
+    parser.add_argument("--budgets", type=Path, default=BUDGETS)
+    parser.add_argument("--record-budgets", action="store_true")
+    parser.add_argument(
+        "--headroom", type=float, default=0.1, help="slack added to recorded budgets, 0.1=10%%"
+    )
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,159 @@
+"""Scheduler benchmark against a simulated rate-limited Airtable.
+
+The simulated server answers 429 once a base exceeds `--limit` requests in any one-second
+window and then refuses that base for `--penalty` seconds, like Airtable does (scaled down).
+Each query returns between one and `--pages` pages, every page being a request against the
+limit. The same workload runs once as a naive concurrent fetch loop and once through `Scheduler`.
+
+    python benchmarks/bench_scheduler.py --queries 200 --limit 50 --json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import deque
+
+from airtableformulahelpers import NumberField, TextField
+from airtableformulahelpers.scheduler import RateLimitedError, Scheduler
+
+
+class SimulatedServer:
+    def __init__(self, limit: int, penalty: float, latency: float, pages: int, seed: int):
+        self.limit = limit
+        self.pages = pages
+        self.penalty = penalty
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.windows: dict[str, deque[float]] = {}
+        self.blocked_until: dict[str, float] = {}
+        self.requests = 0
+        self.rejected = 0
+
+    async def fetch_page(self, base: str, table: str, formula: str, offset: str | None) -> dict:
+        self.requests += 1
+        now = time.monotonic()
+        window = self.windows.setdefault(base, deque())
+        while window and window[0] <= now - 1:
+            window.popleft()
+        if now < self.blocked_until.get(base, 0):
+            self.rejected += 1
+            raise RateLimitedError(retry_after=self.blocked_until[base] - now)
+        if len(window) >= self.limit:
+            self.rejected += 1
+            self.blocked_until[base] = now + self.penalty
+            raise RateLimitedError(retry_after=self.penalty)
+        window.append(now)
+        await asyncio.sleep(self.random.lognormvariate(0, 0.5) * self.latency)
+        page = int(offset or 0)
+        following = str(page + 1) if page + 1 < self.page_count(formula) else None
+        return {"records": [{"id": f"rec{page}", "fields": {}}], "offset": following}
+
+    def page_count(self, formula: str) -> int:
+        return random.Random(formula).randint(1, self.pages)
+
+
+def workload(queries: int, bases: int, duplicates: float, seed: int) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    status, count = TextField(name="Status"), NumberField(name="Count")
+    jobs: list[tuple[str, str]] = []
+    for i in range(queries):
+        if jobs and rng.random() < duplicates:
+            jobs.append(rng.choice(jobs))
+        else:
+            formula = f"AND({status.equals(f's{i}')},{count.greater_than(i)})"
+            jobs.append((f"app{i % bases}", formula))
+    return jobs
+
+
+async def run_naive(server: SimulatedServer, jobs, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(base: str, formula: str) -> float:
+        start = time.monotonic()
+        offset = None
+        while True:
+            async with semaphore:
+                try:
+                    page = await server.fetch_page(base, "Jobs", formula, offset)
+                    offset = page.get("offset")
+                    if not offset:
+                        return time.monotonic() - start
+                    continue
+                except RateLimitedError as error:
+                    retry = error.retry_after or 1.0
+            await asyncio.sleep(retry)
+
+    return await asyncio.gather(*(one(base, formula) for base, formula in jobs))
+
+
+async def run_scheduled(server: SimulatedServer, jobs, rate: float, concurrency: int):
+    async with Scheduler(
+        server.fetch_page, rate=rate, max_in_flight=concurrency, paginated=True
+    ) as scheduler:
+
+        async def one(i: int, base: str, formula: str) -> float:
+            start = time.monotonic()
+            priority = "high" if i % 10 == 0 else "normal"
+            await scheduler.submit(base, "Jobs", formula, priority=priority)
+            return time.monotonic() - start
+
+        latencies = await asyncio.gather(*(one(i, *job) for i, job in enumerate(jobs)))
+        return latencies, scheduler.stats
+
+
+def summarize(name: str, latencies: list[float], elapsed: float, server: SimulatedServer):
+    ordered = sorted(latencies)
+    quantiles = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    return {
+        "mode": name,
+        "queries": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_qps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p95_ms": round(quantiles[94] * 1000, 1),
+        "p99_ms": round(quantiles[98] * 1000, 1),
+        "server_requests": server.requests,
+        "rate_limited": server.rejected,
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    jobs = workload(args.queries, args.bases, args.duplicates, args.seed)
+    results = []
+
+    server = SimulatedServer(args.limit, args.penalty, args.latency, args.pages, args.seed)
+    start = time.monotonic()
+    latencies = await run_naive(server, jobs, args.concurrency)
+    results.append(summarize("naive", latencies, time.monotonic() - start, server))
+
+    server = SimulatedServer(args.limit, args.penalty, args.latency, args.pages, args.seed)
+    start = time.monotonic()
+    latencies, stats = await run_scheduled(server, jobs, args.limit, args.concurrency)
+    summary = summarize("scheduler", latencies, time.monotonic() - start, server)
+    summary["coalesced"] = stats.coalesced
+    results.append(summary)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--bases", type=int, default=2)
+    parser.add_argument("--duplicates", type=float, default=0.3)
+    parser.add_argument("--limit", type=int, default=50, help="requests per second per base")
+    parser.add_argument("--penalty", type=float, default=0.5, help="seconds blocked after a 429")
+    parser.add_argument("--latency", type=float, default=0.02, help="median response seconds")
+    parser.add_argument("--pages", type=int, default=5, help="most pages a query returns")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print("  ".join(f"{key}={value}" for key, value in result.items()))
@@ -0,0 +1,99 @@
+"""Timing, baselines and regression checks shared by the benchmark scripts.
+
+A baseline is a JSON file of `{"machine": ..., "results": {case: value}}`; lower values are
+better. A case regresses when its new value exceeds the baseline by more than the tolerance.
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class Timing:
+    name: str
+    median_ns: float
+    min_ns: float
+    stdev_ns: float
+    loops: int
+    repeats: int
+
+
+def calibrate(func: Callable[[], object], min_time: float) -> int:
+    """Loops per repeat so that one repeat takes at least `min_time` seconds."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_time:
+            return loops
+        loops *= 2
+
+
+def measure(
+    name: str,
+    func: Callable[[], object],
+    warmup: int = 1,
+    repeats: int = 5,
+    min_time: float = 0.05,
+) -> Timing:
+    """Time `func` per call: warm up, calibrate the loop count, then take `repeats` samples."""
+    for _ in range(warmup):
+        func()
+    loops = calibrate(func, min_time)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter_ns() - start) / loops)
+    return Timing(
+        name=name,
+        median_ns=statistics.median(samples),
+        min_ns=min(samples),
+        stdev_ns=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        loops=loops,
+        repeats=repeats,
+    )
+
+
+def machine() -> dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    try:
+        return json.loads(path.read_text())["results"]
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: Path, results: Mapping[str, float]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"machine": machine(), "results": dict(sorted(results.items()))}
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def regressions(
+    results: Mapping[str, float], baseline: Mapping[str, float], tolerance: float
+) -> list[dict[str, float | str]]:
+    """Cases whose value grew by more than `tolerance` (0.25 = 25%) over the baseline."""
+    found = []
+    for name, value in results.items():
+        before = baseline.get(name)
+        if before and value > before * (1 + tolerance):
+            found.append(
+                {"name": name, "baseline": before, "value": value, "ratio": value / before}
+            )
+    return found
@@ -1,4 +1,15 @@
+import json
+import sys
+from contextlib import ExitStack
+from itertools import islice
+from pathlib import Path
+from typing import Optional, TextIO
+
+import typer
 from rich import print
+from rich.console import Console
+from rich.markup import escape
+from rich.tree import Tree
 from typer import Typer
 
 from airtableformulahelpers import (
@@ -6,12 +17,34 @@ from airtableformulahelpers import (
     IF,
     TextField,
 )
+from airtableformulahelpers.buildcache import BuildCache, watch_files
+from airtableformulahelpers.codegen import generate_package
+from airtableformulahelpers.explain import Step, explain
+from airtableformulahelpers.formula import FormulaSyntaxError, to_node
+from airtableformulahelpers.spec import (
+    Entry,
+    SpecError,
+    compile_entries,
+    load_spec,
+    spec_entries,
+    spec_formula,
+)
+from airtableformulahelpers.stream import (
+    FORMATS,
+    detect_format,
+    filter_items,
+    read_items,
+    write_items,
+)
+from airtableformulahelpers.synthetic import Workload
 
 app = Typer(rich_markup_mode="markdown")
+stderr = Console(stderr=True)
 
 
 @app.command()
-def main():
+def example():
+    """Print an example formula."""
     # IF({Lab Code}="063", "Product " & {Deal Test Pckg} & "\n", "")
     # IF IsVolo && JobFlag == "Map Hard to See"         THEN "Warning: Hard to See - Scout!"
 
@@ -21,7 +54,7 @@ def main():
         IF(
             AND(
                 lab_code.equals("063"),
-                job_flags.contains("Map Hard to See", case_sensitive=False, no_trim=True),
+                job_flags.contains("Map Hard to See", case_sensitive=False, trim=False),
             )
         )
         .THEN("Warning: Hard to See - Scout!", string=True)
@@ -30,5 +63,258 @@ def main():
     print(formula)
 
 
+def _resolve_formula(formula: Optional[str], spec: Optional[Path], name: Optional[str]) -> str:
+    if (formula is None) == (spec is None):
+        raise typer.BadParameter("Give exactly one of --formula and --spec")
+    try:
+        text = formula if formula is not None else spec_formula(load_spec(spec), name)
+        to_node(text)
+    except (SpecError, FormulaSyntaxError, OSError) as error:
+        raise typer.BadParameter(str(error)) from error
+    return text
+
+
+@app.command("filter")
+def filter_records(
+    input: Optional[Path] = typer.Argument(
+        None, help="NDJSON or CSV file of records; stdin when omitted or `-`"
+    ),
+    formula: Optional[str] = typer.Option(None, "--formula", "-f", help="Raw formula text"),
+    spec: Optional[Path] = typer.Option(None, "--spec", help="JSON or YAML formula spec"),
+    name: Optional[str] = typer.Option(None, "--name", help="Formula to use from the spec"),
+    format: Optional[str] = typer.Option(
+        None, "--format", help="`ndjson` or `csv`; guessed from the file name by default"
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Defaults to stdout"),
+    chunk_size: int = typer.Option(1000, "--chunk-size", min=1, help="Records per evaluation"),
+    workers: int = typer.Option(1, "--workers", "-j", min=1, help="Worker processes"),
+):
+    """Stream the records matching a formula, evaluated locally, in constant memory."""
+    text = _resolve_formula(formula, spec, name)
+    from_stdin = input is None or str(input) == "-"
+    if format is None:
+        format = detect_format(None if from_stdin else str(input))
+    if format not in FORMATS:
+        raise typer.BadParameter(f"Unknown format {format!r}", param_hint="--format")
+
+    with ExitStack() as stack:
+        source = sys.stdin if from_stdin else stack.enter_context(open(input, newline=""))
+        target = (
+            sys.stdout if output is None else stack.enter_context(open(output, "w", newline=""))
+        )
+        items, fieldnames = read_items(source, format)
+        matched = filter_items(items, text, chunk_size=chunk_size, workers=workers)
+        count = write_items(target, matched, format, fieldnames)
+    stderr.print(f"{count} matching records", style="dim")
+
+
+def _step_label(step: Step, width: int = 70) -> str:
+    text = step.text if len(step.text) <= width else step.text[: width - 1] + "…"
+    if step.selectivity is None:
+        return f"{escape(text)}  [dim]not reached[/dim]"
+    return (
+        f"{escape(text)}  [cyan]{step.matched}/{step.evaluated}[/cyan] "
+        f"[dim]({step.selectivity:.1%})[/dim]  "
+        f"[yellow]{step.seconds * 1000:.2f} ms[/yellow] "
+        f"[dim]({step.self_seconds * 1000:.2f} ms self)[/dim]"
+    )
+
+
+def _step_tree(step: Step, leaves: bool, tree: Optional[Tree] = None) -> Tree:
+    branch = Tree(_step_label(step)) if tree is None else tree.add(_step_label(step))
+    for child in step.children:
+        if leaves or child.children:
+            _step_tree(child, leaves, branch)
+    return branch
+
+
+@app.command("explain")
+def explain_formula(
+    input: Optional[Path] = typer.Argument(
+        None, help="NDJSON or CSV file of sample records; stdin when omitted or `-`"
+    ),
+    formula: Optional[str] = typer.Option(None, "--formula", "-f", help="Raw formula text"),
+    spec: Optional[Path] = typer.Option(None, "--spec", help="JSON or YAML formula spec"),
+    name: Optional[str] = typer.Option(None, "--name", help="Formula to use from the spec"),
+    format: Optional[str] = typer.Option(
+        None, "--format", help="`ndjson` or `csv`; guessed from the file name by default"
+    ),
+    limit: int = typer.Option(10_000, "--limit", min=1, help="Records to sample"),
+    leaves: bool = typer.Option(False, "--leaves", help="Also show fields and literals"),
+):
+    """Show how many sample records each part of a formula matches, and the time it takes."""
+    text = _resolve_formula(formula, spec, name)
+    from_stdin = input is None or str(input) == "-"
+    if format is None:
+        format = detect_format(None if from_stdin else str(input))
+    if format not in FORMATS:
+        raise typer.BadParameter(f"Unknown format {format!r}", param_hint="--format")
+
+    with ExitStack() as stack:
+        source = sys.stdin if from_stdin else stack.enter_context(open(input, newline=""))
+        items, _ = read_items(source, format)
+        report = explain(text, islice(items, limit))
+    print(_step_tree(report, leaves))
+
+
+def _load_entries(paths: list[Path]) -> list[tuple[str, Entry]]:
+    entries = []
+    for path in paths:
+        try:
+            spec = load_spec(path)
+        except (SpecError, OSError, ValueError) as error:
+            raise typer.BadParameter(f"{path}: {error}", param_hint="SPECS") from error
+        entries.extend((str(path), entry) for entry in spec_entries(spec))
+    return entries
+
+
+def _write_results(
+    target: TextIO,
+    entries: list[tuple[str, Entry]],
+    cache: Optional[BuildCache],
+    workers: Optional[int],
+) -> int:
+    """Write one NDJSON line per entry, returning how many failed."""
+    specs = [entry for _, entry in entries]
+    results = (
+        cache.compile(specs, workers) if cache is not None else compile_entries(specs, workers)
+    )
+    failed = 0
+    for (source, _), result in zip(entries, results):
+        failed += "error" in result
+        target.write(json.dumps({"spec": source, **result}) + "\n")
+        target.flush()
+    if cache is not None:
+        cache.save()
+    return failed
+
+
+@app.command("compile")
+def compile_specs(
+    specs: list[Path] = typer.Argument(..., help="JSON or YAML spec files"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Defaults to stdout"),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-j", min=1, help="Worker processes; automatic by default"
+    ),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse unchanged entries"),
+    cache_file: Path = typer.Option(Path(".formula-cache.json"), "--cache-file"),
+    watch: bool = typer.Option(False, "--watch", help="Recompile changed entries on save"),
+    interval: float = typer.Option(1.0, "--interval", help="Seconds between checks in --watch"),
+):
+    """Compile every formula in the specs, streaming NDJSON lines in spec order."""
+    entries = _load_entries(specs)
+    cache = BuildCache(cache_file) if use_cache else None
+    with ExitStack() as stack:
+        target = sys.stdout if output is None else stack.enter_context(open(output, "w"))
+        failed = _write_results(target, entries, cache, workers)
+        summary = f"{len(entries) - failed} compiled, {failed} failed"
+        if cache is not None:
+            summary += f", {cache.hits} from cache"
+        stderr.print(summary, style="dim")
+        if not watch:
+            if failed:
+                raise typer.Exit(1)
+            return
+
+        key = (
+            cache.key
+            if cache is not None
+            else (lambda entry: json.dumps(entry[1:], sort_keys=True))
+        )
+        seen = {(source, entry[0]): key(entry) for source, entry in entries}
+        stderr.print("Watching for changes; Ctrl-C to stop", style="dim")
+        try:
+            for changed in watch_files(specs, interval):
+                try:
+                    reloaded = _load_entries(changed)
+                except typer.BadParameter as error:
+                    stderr.print(error.message, style="red")
+                    continue
+                touched = [
+                    (source, entry)
+                    for source, entry in reloaded
+                    if seen.get((source, entry[0])) != key(entry)
+                ]
+                seen.update({(source, entry[0]): key(entry) for source, entry in reloaded})
+                failed = _write_results(target, touched, cache, workers)
+                stderr.print(f"{len(touched)} recompiled, {failed} failed", style="dim")
+        except KeyboardInterrupt:
+            pass
+
+
+@app.command()
+def codegen(
+    schema: Path = typer.Argument(..., help="Base schema JSON saved from the metadata API"),
+    directory: Path = typer.Argument(..., help="Package directory to write, e.g. `basefields`"),
+):
+    """Generate a package of typed field constants, rewriting only tables that changed."""
+    written = generate_package(schema, directory)
+    for path in written:
+        stderr.print(f"{'deleted' if not path.exists() else 'wrote'} {path}", style="dim")
+    stderr.print(f"{len(written)} files changed", style="dim")
+
+
+def _parse_mix(mix: Optional[str]) -> Optional[dict[str, float]]:
+    if mix is None:
+        return None
+    try:
+        pairs = (item.split("=", 1) for item in mix.split(",") if item.strip())
+        return {kind.strip(): float(weight) for kind, weight in pairs}
+    except ValueError as error:
+        raise typer.BadParameter(
+            "Expected weights like `text=3,number=1`", param_hint="--mix"
+        ) from error
+
+
+@app.command()
+def synth(
+    count: int = typer.Option(100, "--count", "-n", min=0, help="Formulas to generate"),
+    seed: int = typer.Option(0, "--seed"),
+    depth: int = typer.Option(3, "--depth", min=0, help="Levels of logic above comparisons"),
+    fanout: tuple[int, int] = typer.Option((2, 4), "--fanout", help="Min and max AND/OR args"),
+    fields: int = typer.Option(20, "--fields", min=1, help="Fields in the synthetic table"),
+    mix: Optional[str] = typer.Option(
+        None, "--mix", help="Field type weights, e.g. `text=3,number=1,date=1`"
+    ),
+    relative_dates: float = typer.Option(
+        0.5, "--relative-dates", min=0, max=1, help="Share of `*_ago` date comparisons"
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Defaults to stdout"),
+    records: int = typer.Option(0, "--records", min=0, help="Records to generate"),
+    records_output: Optional[Path] = typer.Option(
+        None, "--records-output", help="NDJSON file for --records"
+    ),
+    schema_output: Optional[Path] = typer.Option(
+        None, "--schema-output", help="Write the table as a metadata-API schema"
+    ),
+):
+    """Generate a seeded synthetic workload: NDJSON formulas, and optionally records."""
+    if records and records_output is None:
+        raise typer.BadParameter("--records needs --records-output", param_hint="--records")
+    options = {"field_mix": _parse_mix(mix)} if mix else {}
+    try:
+        workload = Workload(
+            seed=seed,
+            depth=depth,
+            fanout=fanout,
+            fields=fields,
+            relative_dates=relative_dates,
+            **options,
+        )
+    except ValueError as error:
+        raise typer.BadParameter(str(error), param_hint="--mix") from error
+    with ExitStack() as stack:
+        target = sys.stdout if output is None else stack.enter_context(open(output, "w"))
+        for i, formula in enumerate(workload.formulas(count)):
+            target.write(json.dumps({"name": f"synthetic_{i}", "formula": formula}) + "\n")
+    if records_output is not None:
+        with open(records_output, "w") as f:
+            for record in workload.records(records):
+                f.write(json.dumps(record) + "\n")
+    if schema_output is not None:
+        schema_output.write_text(json.dumps(workload.schema(), indent=2) + "\n")
+    stderr.print(f"{count} formulas, {records} records (seed {seed})", style="dim")
+
+
 if __name__ == "__main__":
     app()
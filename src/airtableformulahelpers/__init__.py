@@ -1,7 +1,7 @@
+import os
 from datetime import datetime
 from typing import Literal, Optional, overload
 
-import dateparser
 from pydantic import BaseModel
 
 COMPARISON = Literal["=", "!=", ">", "<", ">=", "<="]
@@ -203,6 +203,8 @@ def _parse_date(date: datetime | str) -> datetime:
     if isinstance(date, datetime):
         parsed_date = date
     else:
+        import dateparser  # slow to import, and only needed for dates given as text
+
         result: datetime | None = dateparser.parse(date)
         if result is None:
             raise ValueError(f"Could not parse date: {date}")
@@ -322,3 +324,9 @@ class DateField(Field):
 
         parsed_date: datetime = _parse_date(date)
         return date_comparison._date(parsed_date)
+
+
+if os.environ.get("AIRTABLEFORMULAHELPERS_METRICS"):
+    from . import instrument
+
+    instrument.enable()
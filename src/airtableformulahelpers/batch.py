@@ -0,0 +1,74 @@
+"""Batch several filters on one table into a single query and split the results back out."""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from . import IF, OR
+from .canonical import fingerprint
+from .evaluate import Evaluator, Row, compile_formula, is_truthy
+
+Record = Mapping[str, Any]
+
+
+@dataclass(frozen=True)
+class BatchQuery:
+    """One combined query standing in for several named filters.
+
+    `filter` is the `filterByFormula` to send. `tag` is a formula whose value for a row is one
+    `"1"`/`"0"` character per slot, telling which sub-filters the row matches; create it as a
+    formula field in the base to demultiplex without evaluating locally. Names whose formulas are
+    equivalent share a slot.
+    """
+
+    names: tuple[str, ...]
+    slots: tuple[str, ...]
+    slot_of: Mapping[str, int]
+    filter: str
+    tag: str
+
+    def demultiplex(
+        self, records: Iterable[Record], tag_field: str | None = None
+    ) -> dict[str, list[Record]]:
+        """Split fetched records per name.
+
+        Uses the value of `tag_field` when a record carries it, and otherwise evaluates the
+        sub-filters locally, compiling them only once a record needs it.
+        """
+        checks: list[Evaluator] = []
+        by_slot: list[list[Record]] = [[] for _ in self.slots]
+        for record in records:
+            fields = record.get("fields", {})
+            tag = fields.get(tag_field) if tag_field else None
+            if isinstance(tag, str) and len(tag) == len(self.slots):
+                hits = [bit == "1" for bit in tag]
+            else:
+                if not checks:
+                    checks = [compile_formula(formula) for formula in self.slots]
+                row = Row(fields, record.get("id"))
+                hits = [is_truthy(check(row)) for check in checks]
+            for slot, hit in enumerate(hits):
+                if hit:
+                    by_slot[slot].append(record)
+        return {name: by_slot[self.slot_of[name]] for name in self.names}
+
+
+def batch(named: Mapping[str, str]) -> BatchQuery:
+    """Combine named filters into one `OR(...)` query plus a tag formula for demultiplexing."""
+    slots: list[str] = []
+    slot_of: dict[str, int] = {}
+    by_fingerprint: dict[str, int] = {}
+    for name, formula in named.items():
+        key = fingerprint(formula)
+        if key not in by_fingerprint:
+            by_fingerprint[key] = len(slots)
+            slots.append(formula)
+        slot_of[name] = by_fingerprint[key]
+    tag = " & ".join(IF(formula).THEN("1", string=True).ELSE("0", string=True) for formula in slots)
+    return BatchQuery(
+        names=tuple(named),
+        slots=tuple(slots),
+        slot_of=slot_of,
+        filter=OR(*slots),
+        tag=tag,
+    )
@@ -0,0 +1,274 @@
+"""Compact binary encoding of formula trees, to pass parsed formulas between processes.
+
+    blob = encode(formula)     # bytes, for a cache, a pipe or shared memory
+    node = decode(blob)        # the same tree, without parsing the text again
+
+Layout, all integers unsigned LEB128 varints unless noted:
+
+    b"AFB\\x01"
+    string count, then each string as byte length + UTF-8 bytes
+    node stream length, then the nodes in postfix order, children before their parent:
+        FIELD name | STR_DOUBLE value | STR_SINGLE value | NAME name    (string table indexes)
+        INT zigzag varint | FLOAT 8-byte little-endian double
+        args... CALL name argc | left right BINOP op-index | operand NEG
+        target MEMBERS quote count typecode data-length data little-endian-ends
+
+Postfix order lets `decode` build the tree with a single stack of finished nodes.
+
+Every field name, function name and string is stored once in the table however often it
+occurs. `decode` reads from a `memoryview` of its input without copying it; only a
+membership list's buffer is copied out. `render(decode(encode(node))) == render(node)`.
+"""
+
+import struct
+import sys
+from array import array
+from collections.abc import Callable
+
+from .formula import (
+    BinOp,
+    Call,
+    FieldRef,
+    LiteralList,
+    Members,
+    Name,
+    Neg,
+    Node,
+    Num,
+    Str,
+    to_node,
+)
+
+MAGIC = b"AFB\x01"
+
+FIELD, STR_DOUBLE, STR_SINGLE, INT, FLOAT, NAME, CALL, BINOP, NEG, MEMBERS = range(1, 11)
+OPS = ("=", "!=", ">", "<", ">=", "<=", "&", "+", "-", "*", "/")
+_OP_CODES = {op: i for i, op in enumerate(OPS)}
+_DOUBLE = struct.Struct("<d")
+
+
+class BinaryFormatError(ValueError):
+    """Raised when bytes are not a formula tree written by `encode`."""
+
+
+def _varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class _Strings:
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        found = self.index.get(value)
+        if found is None:
+            found = self.index[value] = len(self.index)
+        return found
+
+
+def encode(formula: str | Node) -> bytes:
+    """The binary form of a formula; text is parsed first."""
+    strings = _Strings()
+    # Records are written parent first with the children right to left, then reversed into
+    # postfix order.
+    records: list[bytes | bytearray] = []
+    stack = [to_node(formula)]
+    while stack:
+        node = stack.pop()
+        record = bytearray()
+        if isinstance(node, FieldRef):
+            record.append(FIELD)
+            _varint(record, strings(node.name))
+        elif isinstance(node, Str):
+            if node.quote not in ('"', "'"):
+                raise BinaryFormatError(f"Unsupported quote {node.quote!r}")
+            record.append(STR_DOUBLE if node.quote == '"' else STR_SINGLE)
+            _varint(record, strings(node.value))
+        elif isinstance(node, Num):
+            if isinstance(node.value, float):
+                record.append(FLOAT)
+                record += _DOUBLE.pack(node.value)
+            else:
+                record.append(INT)
+                value = node.value
+                _varint(record, value << 1 if value >= 0 else ((-value) << 1) - 1)
+        elif isinstance(node, Name):
+            record.append(NAME)
+            _varint(record, strings(node.name))
+        elif isinstance(node, Call):
+            record.append(CALL)
+            _varint(record, strings(node.name))
+            _varint(record, len(node.args))
+            stack += node.args
+        elif isinstance(node, BinOp):
+            record += bytes((BINOP, _OP_CODES[node.op]))
+            stack += (node.left, node.right)
+        elif isinstance(node, Neg):
+            record.append(NEG)
+            stack.append(node.operand)
+        elif isinstance(node, Members):
+            data, ends = node.values.buffers()
+            record += bytes((MEMBERS, ord(node.quote)))
+            _varint(record, len(ends))
+            record.append(ord(ends.typecode))
+            _varint(record, len(data))
+            records.append(_little_endian(ends).tobytes())
+            records.append(data)
+            stack.append(node.target)
+        else:
+            raise TypeError(f"Not a formula node: {node!r}")
+        records.append(record)
+    nodes = b"".join(reversed(records))
+
+    out = bytearray(MAGIC)
+    _varint(out, len(strings.index))
+    for value in strings.index:
+        encoded = value.encode()
+        _varint(out, len(encoded))
+        out += encoded
+    _varint(out, len(nodes))
+    out += nodes
+    return bytes(out)
+
+
+def _little_endian(ends: array) -> array:
+    """Offsets are stored little-endian; swapping is its own inverse."""
+    if sys.byteorder == "big":  # pragma: no cover - little-endian hosts only in CI
+        ends = array(ends.typecode, ends)
+        ends.byteswap()
+    return ends
+
+
+class _Reader:
+    __slots__ = ("view", "pos")
+
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.pos = 0
+
+    def byte(self) -> int:
+        try:
+            value = self.view[self.pos]
+        except IndexError:
+            raise BinaryFormatError("Truncated formula data") from None
+        self.pos += 1
+        return value
+
+    def varint(self) -> int:
+        byte = self.byte()
+        if byte < 0x80:
+            return byte
+        result, shift = byte & 0x7F, 7
+        while True:
+            byte = self.byte()
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def take(self, size: int) -> memoryview:
+        end = self.pos + size
+        if end > len(self.view):
+            raise BinaryFormatError("Truncated formula data")
+        chunk = self.view[self.pos : end]
+        self.pos = end
+        return chunk
+
+
+def decode(data: bytes | bytearray | memoryview) -> Node:
+    """The tree encoded in `data`, which is read in place."""
+    view = memoryview(data).cast("B")
+    if view[:4] != MAGIC:
+        raise BinaryFormatError("Not a binary formula: bad magic")
+    reader = _Reader(view)
+    reader.pos = len(MAGIC)
+    try:
+        strings = [str(reader.take(reader.varint()), "utf-8") for _ in range(reader.varint())]
+    except UnicodeDecodeError as error:
+        raise BinaryFormatError(f"Bad string table: {error}") from error
+    end = reader.varint() + reader.pos
+    if end != len(view):
+        raise BinaryFormatError(f"Node stream should end at {end}, data is {len(view)} long")
+
+    def text(index: int) -> str:
+        try:
+            return strings[index]
+        except IndexError:
+            raise BinaryFormatError(f"String index {index} out of range") from None
+
+    # Leaves are immutable, so each distinct one is built once and shared across the tree.
+    leaves: dict[tuple[int, int], Node] = {}
+    done: list[Node] = []
+    while reader.pos < end:
+        tag = reader.byte()
+        if tag in _LEAVES:
+            key = (tag, reader.varint())
+            leaf = leaves.get(key)
+            if leaf is None:
+                leaf = leaves[key] = _leaf(tag, key[1], text)
+            done.append(leaf)
+        elif tag == CALL:
+            name, count = text(reader.varint()), reader.varint()
+            done.append(Call(name, tuple(_children(done, count))))
+        elif tag == BINOP:
+            code = reader.byte()
+            if code >= len(OPS):
+                raise BinaryFormatError(f"Unknown operator code {code}")
+            left, right = _children(done, 2)
+            done.append(BinOp(OPS[code], left, right))
+        elif tag == FLOAT:
+            done.append(Num(_DOUBLE.unpack(reader.take(8))[0]))
+        elif tag == NEG:
+            done.append(Neg(_children(done, 1)[0]))
+        elif tag == MEMBERS:
+            (target,) = _children(done, 1)
+            done.append(Members(target, *_literal_list(reader)))
+        else:
+            raise BinaryFormatError(f"Unknown node tag {tag} at {reader.pos - 1}")
+    if len(done) != 1:
+        raise BinaryFormatError(f"Node stream holds {len(done)} trees, not one")
+    return done[0]
+
+
+_LEAVES = frozenset((FIELD, STR_DOUBLE, STR_SINGLE, INT, NAME))
+
+
+def _leaf(tag: int, value: int, text: Callable[[int], str]) -> Node:
+    if tag == FIELD:
+        return FieldRef(text(value))
+    if tag == STR_DOUBLE:
+        return Str(text(value))
+    if tag == STR_SINGLE:
+        return Str(text(value), "'")
+    if tag == NAME:
+        return Name(text(value))
+    return Num(value >> 1 if not value & 1 else -((value + 1) >> 1))
+
+
+def _children(done: list[Node], count: int) -> list[Node]:
+    if count > len(done):
+        raise BinaryFormatError("Node stream is missing children")
+    if not count:
+        return []
+    children = done[-count:]
+    del done[-count:]
+    return children
+
+
+def _literal_list(reader: _Reader) -> tuple[LiteralList, str]:
+    quote = chr(reader.byte())
+    count = reader.varint()
+    typecode = chr(reader.byte())
+    if typecode not in ("I", "Q"):
+        raise BinaryFormatError(f"Unknown offset type {typecode!r}")
+    data = bytes(reader.take(reader.varint()))
+    ends = array(typecode)
+    ends.frombytes(reader.take(count * ends.itemsize))
+    ends = _little_endian(ends)
+    try:
+        return LiteralList.from_buffers(data, ends), quote
+    except ValueError as error:
+        raise BinaryFormatError(str(error)) from error
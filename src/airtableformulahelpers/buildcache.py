@@ -0,0 +1,161 @@
+"""On-disk cache of compiled spec entries, keyed by a content hash, plus file watching.
+
+An entry's key hashes its condition, the types of the fields the condition uses, the
+library version and source, and caller settings. Editing one formula or one field's type
+therefore misses only the entries that depend on it. Dates given in words ("yesterday") are
+resolved when compiled, so entries using them also key on the current day.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from datetime import date
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from .spec import Entry, compile_entries
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _library_key() -> str:
+    try:
+        version = metadata.version("airtableformulahelpers")
+    except metadata.PackageNotFoundError:  # pragma: no cover - running from a source tree
+        version = "unknown"
+    digest = hashlib.blake2b(version.encode(), digest_size=16)
+    package = Path(__file__).parent
+    for name in ("__init__.py", "spec.py"):
+        digest.update((package / name).read_bytes())
+    return digest.hexdigest()
+
+
+def _field_names(condition: Any) -> Iterator[str]:
+    if isinstance(condition, Mapping):
+        if isinstance(condition.get("field"), str):
+            yield condition["field"]
+        for value in condition.values():
+            yield from _field_names(value)
+    elif isinstance(condition, list):
+        for value in condition:
+            yield from _field_names(value)
+
+
+def _uses_relative_dates(condition: Any, fields: Mapping[str, str]) -> bool:
+    if isinstance(condition, list):
+        return any(_uses_relative_dates(value, fields) for value in condition)
+    if not isinstance(condition, Mapping):
+        return False
+    kind = condition.get("type") or fields.get(condition.get("field", ""), "text")
+    value = condition.get("value")
+    if kind == "date" and isinstance(value, str) and not _ISO_DATE.match(value):
+        return True
+    return any(_uses_relative_dates(value, fields) for value in condition.values())
+
+
+class BuildCache:
+    """Compiled formulas by entry key, stored as one JSON file.
+
+    `settings` is anything else that changes the output and must invalidate the cache.
+    """
+
+    def __init__(self, path: str | os.PathLike, settings: Mapping[str, Any] | None = None):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._salt = json.dumps([_library_key(), settings or {}], sort_keys=True, default=str)
+        try:
+            self._formulas: dict[str, str] = json.loads(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            self._formulas = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._formulas)
+
+    def key(self, entry: Entry) -> str:
+        _, condition, fields = entry
+        used = {field: fields.get(field) for field in sorted(set(_field_names(condition)))}
+        today = date.today().isoformat() if _uses_relative_dates(condition, fields) else None
+        material = json.dumps([self._salt, condition, used, today], sort_keys=True)
+        return hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        return self._formulas.get(key)
+
+    def put(self, key: str, formula: str) -> None:
+        if self._formulas.get(key) != formula:
+            self._formulas[key] = formula
+            self._dirty = True
+
+    def prune(self, keep: Iterable[str]) -> None:
+        """Drop every entry not in `keep`, e.g. the keys of the latest full build."""
+        keep = set(keep)
+        stale = [key for key in self._formulas if key not in keep]
+        for key in stale:
+            del self._formulas[key]
+        self._dirty |= bool(stale)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        scratch = self.path.with_name(self.path.name + ".tmp")
+        scratch.write_text(json.dumps(self._formulas, separators=(",", ":")))
+        os.replace(scratch, self.path)
+        self._dirty = False
+
+    def compile(
+        self, entries: Iterable[Entry], workers: int | None = None
+    ) -> Iterator[dict[str, str]]:
+        """Like `spec.compile_entries`, serving unchanged entries from the cache.
+
+        Results come in input order; only the misses are handed to the worker pool.
+        """
+        entries = list(entries)
+        keys = [self.key(entry) for entry in entries]
+        cached = [key in self._formulas for key in keys]
+        compiled = compile_entries(
+            (entry for entry, hit in zip(entries, cached) if not hit), workers
+        )
+        for entry, key, hit in zip(entries, keys, cached):
+            if hit:
+                self.hits += 1
+                yield {"name": entry[0], "formula": self._formulas[key]}
+                continue
+            self.misses += 1
+            result = next(compiled)
+            if "formula" in result:
+                self.put(key, result["formula"])
+            yield result
+
+
+def watch_files(
+    paths: Iterable[str | os.PathLike],
+    interval: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[list[Path]]:
+    """Poll files and yield the ones whose modification time or size changed, forever."""
+    paths = [Path(path) for path in paths]
+
+    def stamp(path: Path) -> tuple[int, int] | None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    stamps = {path: stamp(path) for path in paths}
+    while True:
+        sleep(interval)
+        changed = []
+        for path in paths:
+            current = stamp(path)
+            if current != stamps[path]:
+                stamps[path] = current
+                changed.append(path)
+        if changed:
+            yield changed
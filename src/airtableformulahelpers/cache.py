@@ -0,0 +1,251 @@
+"""Result cache for `filterByFormula` queries, keyed by table plus canonical formula fingerprint."""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .canonical import fingerprint
+from .dependencies import referenced_fields
+from .formula import Node
+
+Records = list[dict[str, Any]]
+
+
+@dataclass(slots=True)
+class _Entry:
+    records: Records
+    size: int
+    expires: float | None
+    fields: frozenset[str]
+
+
+class _SqliteTier:
+    def __init__(self, path: str | Path):
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                table_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                expires REAL,
+                fields TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (table_name, fingerprint)
+            );
+            CREATE TABLE IF NOT EXISTS result_fields (
+                table_name TEXT NOT NULL,
+                field TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (table_name, field, fingerprint)
+            );
+            """
+        )
+
+    def get(self, table: str, key: str, now: float) -> tuple[bytes, float | None, list[str]] | None:
+        row = self.connection.execute(
+            "SELECT payload, expires, fields FROM results WHERE table_name=? AND fingerprint=?",
+            (table, key),
+        ).fetchone()
+        if row is None:
+            return None
+        payload, expires, fields = row
+        if expires is not None and expires <= now:
+            self.delete(table, [key])
+            return None
+        return payload, expires, json.loads(fields)
+
+    def put(
+        self, table: str, key: str, payload: bytes, expires: float | None, fields: frozenset[str]
+    ) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (table, key, expires, json.dumps(sorted(fields)), payload),
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO result_fields VALUES (?, ?, ?)",
+                [(table, field, key) for field in fields],
+            )
+
+    def keys_for_fields(self, table: str, fields: Iterable[str]) -> set[str]:
+        keys: set[str] = set()
+        for field in fields:
+            rows = self.connection.execute(
+                "SELECT fingerprint FROM result_fields WHERE table_name=? AND field=?",
+                (table, field),
+            )
+            keys.update(row[0] for row in rows)
+        return keys
+
+    def delete(self, table: str, keys: Iterable[str]) -> None:
+        with self.connection:
+            for key in keys:
+                self.connection.execute(
+                    "DELETE FROM results WHERE table_name=? AND fingerprint=?", (table, key)
+                )
+                self.connection.execute(
+                    "DELETE FROM result_fields WHERE table_name=? AND fingerprint=?", (table, key)
+                )
+
+    def delete_table(self, table: str | None) -> None:
+        with self.connection:
+            if table is None:
+                self.connection.execute("DELETE FROM results")
+                self.connection.execute("DELETE FROM result_fields")
+            else:
+                self.connection.execute("DELETE FROM results WHERE table_name=?", (table,))
+                self.connection.execute("DELETE FROM result_fields WHERE table_name=?", (table,))
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class ResultCache:
+    """Caches query results in memory (LRU, bounded by bytes) and optionally in SQLite.
+
+    Formulas that only differ in argument order, quoting or spacing share an entry. Changing a
+    field drops only the entries whose formulas reference it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float | None = 300.0,
+        path: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._by_field: dict[tuple[str, str], set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk = _SqliteTier(path) if path is not None else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Bytes held by the in-memory tier."""
+        return self._bytes
+
+    def get(self, table: str, formula: str | Node) -> Records | None:
+        key = fingerprint(formula)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is not None:
+                if entry.expires is not None and entry.expires <= now:
+                    self._remove(table, key)
+                else:
+                    self._entries.move_to_end((table, key))
+                    self.hits += 1
+                    return entry.records
+            if self._disk is not None:
+                found = self._disk.get(table, key, now)
+                if found is not None:
+                    payload, expires, fields = found
+                    records = json.loads(payload)
+                    self._store(
+                        table, key, _Entry(records, len(payload), expires, frozenset(fields))
+                    )
+                    self.hits += 1
+                    return records
+            self.misses += 1
+            return None
+
+    def put(
+        self, table: str, formula: str | Node, records: Records, ttl: float | None = None
+    ) -> None:
+        """Store the records of a query. `ttl` overrides the cache default for this entry."""
+        key = fingerprint(formula)
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else self.clock() + ttl
+        fields = referenced_fields(formula)
+        payload = json.dumps(records, separators=(",", ":")).encode()
+        with self._lock:
+            self._store(table, key, _Entry(records, len(payload), expires, fields))
+            if self._disk is not None:
+                self._disk.put(table, key, payload, expires, fields)
+
+    def get_or_fetch(
+        self,
+        table: str,
+        formula: str | Node,
+        fetch: Callable[[str, str | Node], Records],
+        ttl: float | None = None,
+    ) -> Records:
+        """Return cached records, calling `fetch(table, formula)` only on a miss."""
+        records = self.get(table, formula)
+        if records is None:
+            records = fetch(table, formula)
+            self.put(table, formula, records, ttl=ttl)
+        return records
+
+    def invalidate_fields(self, table: str, fields: Iterable[str]) -> int:
+        """Drop entries whose formulas reference any of `fields`. Returns the number dropped."""
+        fields = list(fields)
+        with self._lock:
+            keys: set[str] = set()
+            for field in fields:
+                keys |= self._by_field.get((table, field), set())
+            if self._disk is not None:
+                keys |= self._disk.keys_for_fields(table, fields)
+                self._disk.delete(table, keys)
+            for key in keys:
+                self._remove(table, key)
+            return len(keys)
+
+    def invalidate_table(self, table: str) -> None:
+        with self._lock:
+            for entry_table, key in list(self._entries):
+                if entry_table == table:
+                    self._remove(entry_table, key)
+            if self._disk is not None:
+                self._disk.delete_table(table)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_field.clear()
+            self._bytes = 0
+            if self._disk is not None:
+                self._disk.delete_table(None)
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+
+    def _store(self, table: str, key: str, entry: _Entry) -> None:
+        self._remove(table, key)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[(table, key)] = entry
+        self._bytes += entry.size
+        for field in entry.fields:
+            self._by_field.setdefault((table, field), set()).add(key)
+        while self._bytes > self.max_bytes:
+            (old_table, old_key), _ = next(iter(self._entries.items()))
+            self._remove(old_table, old_key)
+
+    def _remove(self, table: str, key: str) -> None:
+        entry = self._entries.pop((table, key), None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for field in entry.fields:
+            keys = self._by_field.get((table, field))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_field[(table, field)]
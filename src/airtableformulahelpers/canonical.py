@@ -0,0 +1,112 @@
+"""Canonical form and fingerprints, so formulas that mean the same thing compare equal.
+
+The canonical tree sorts the arguments of commutative operations, flattens and deduplicates
+nested AND/OR, always quotes strings with double quotes, writes integral numbers without a
+fraction and renders with a single spacing style. Each node is hashed once from its children's
+digests, so both functions run in a single pass over the tree.
+"""
+
+from collections.abc import Iterator
+from functools import lru_cache
+from hashlib import blake2b
+
+from .formula import (
+    BinOp,
+    Call,
+    FieldRef,
+    Members,
+    Name,
+    Neg,
+    Node,
+    Num,
+    Str,
+    render,
+    to_node,
+)
+
+DIGEST_SIZE = 16
+
+_COMMUTATIVE_CALLS = frozenset(("AND", "OR", "XOR"))
+_IDEMPOTENT_CALLS = frozenset(("AND", "OR"))
+_COMMUTATIVE_OPS = frozenset(("=", "!=", "+", "*"))
+_MIRRORED_OPS = {"<": ">", ">": "<", "<=": ">=", ">=": "<="}
+
+
+def _digest(*parts: bytes) -> bytes:
+    return blake2b(b"".join(parts), digest_size=DIGEST_SIZE).digest()
+
+
+def _number(value: float) -> int | float:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _flatten(name: str, args: tuple[Node, ...]) -> Iterator[Node]:
+    for arg in args:
+        if isinstance(arg, Call) and arg.name == name:
+            yield from _flatten(name, arg.args)
+        else:
+            yield arg
+
+
+def _canonical(node: Node) -> tuple[Node, bytes]:
+    if isinstance(node, FieldRef):
+        return node, _digest(b"F", node.name.encode())
+    if isinstance(node, Str):
+        return Str(node.value), _digest(b"S", node.value.encode())
+    if isinstance(node, Num):
+        value = _number(node.value)
+        return Num(value), _digest(b"N", repr(value).encode())
+    if isinstance(node, Name):
+        return node, _digest(b"I", node.name.encode())
+    if isinstance(node, Neg):
+        operand, digest = _canonical(node.operand)
+        return Neg(operand), _digest(b"-", digest)
+    if isinstance(node, Call):
+        if node.name in _IDEMPOTENT_CALLS:
+            unique: dict[bytes, Node] = {}
+            for arg in _flatten(node.name, node.args):
+                arg, digest = _canonical(arg)
+                unique.setdefault(digest, arg)
+            args = [(arg, digest) for digest, arg in unique.items()]
+        else:
+            args = [_canonical(arg) for arg in node.args]
+        if node.name in _COMMUTATIVE_CALLS:
+            args.sort(key=lambda pair: pair[1])
+        name = node.name.encode()
+        return (
+            Call(node.name, tuple(arg for arg, _ in args)),
+            _digest(b"C", name, b"\0", *(digest for _, digest in args)),
+        )
+    if isinstance(node, BinOp):
+        op = node.op
+        (left, left_digest), (right, right_digest) = _canonical(node.left), _canonical(node.right)
+        swap = left_digest > right_digest and (op in _COMMUTATIVE_OPS or op in _MIRRORED_OPS)
+        if swap:
+            op = _MIRRORED_OPS.get(op, op)
+            left, right, left_digest, right_digest = right, left, right_digest, left_digest
+        return BinOp(op, left, right), _digest(b"B", op.encode(), b"\0", left_digest, right_digest)
+    if isinstance(node, Members):
+        return _canonical(node.expand())
+    raise TypeError(f"Not a formula node: {node!r}")
+
+
+@lru_cache(maxsize=4096)
+def _cached(formula: str | Node) -> tuple[Node, bytes]:
+    return _canonical(to_node(formula))
+
+
+def canonical_node(formula: str | Node) -> Node:
+    """The canonical tree of a formula."""
+    return _cached(formula)[0]
+
+
+def canonicalize(formula: str | Node) -> str:
+    """Render a formula in canonical form, so `AND(a,b)` and `AND(b, a)` give the same string."""
+    return render(_cached(formula)[0])
+
+
+def fingerprint(formula: str | Node) -> str:
+    """A 128-bit hash of the canonical tree, as 32 hex characters."""
+    return _cached(formula)[1].hex()
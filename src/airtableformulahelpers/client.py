@@ -0,0 +1,170 @@
+"""Async execution of formulas as `filterByFormula` list requests.
+
+Needs the optional `httpx` dependency: `pip install airtableformulahelpers[async]`.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import Any
+from urllib.parse import quote
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - exercised only without the extra installed
+    httpx = None  # type: ignore[assignment]
+
+from .formula import Node, render
+from .split import DEFAULT_BUDGET, merge_records, split_formula
+
+API_URL = "https://api.airtable.com/v0"
+
+Record = dict[str, Any]
+Query = tuple[str, str | Node]
+
+
+def _require_httpx() -> None:
+    if httpx is None:
+        raise ImportError(
+            "The async client needs httpx: pip install 'airtableformulahelpers[async]'"
+        )
+
+
+class AsyncClient:
+    """Runs formulas against one base over a pooled HTTP connection.
+
+    At most `max_concurrency` page requests are in flight at once, however many formulas run
+    concurrently. Records stream back as pages arrive rather than being buffered.
+    """
+
+    def __init__(
+        self,
+        base_id: str,
+        token: str,
+        max_concurrency: int = 5,
+        page_size: int = 100,
+        base_url: str = API_URL,
+        http: "httpx.AsyncClient | None" = None,
+    ):
+        _require_httpx()
+        self.base_id = base_id
+        self.page_size = page_size
+        self.requests = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._owns_http = http is None
+        self._http = http or httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(
+                max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+            ),
+            timeout=30.0,
+        )
+        self._http.headers["Authorization"] = f"Bearer {token}"
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._owns_http:
+            await self._http.aclose()
+
+    async def fetch_page(
+        self,
+        table: str,
+        formula: str | Node,
+        offset: str | None = None,
+        fields: Iterable[str] = (),
+    ) -> Mapping[str, Any]:
+        """One page of a list request; the response carries `records` and maybe `offset`."""
+        params: list[tuple[str, str]] = [
+            ("filterByFormula", formula if isinstance(formula, str) else render(formula)),
+            ("pageSize", str(self.page_size)),
+        ]
+        params.extend(("fields[]", field) for field in fields)
+        if offset is not None:
+            params.append(("offset", offset))
+        async with self._semaphore:
+            self.requests += 1
+            path = f"/{quote(self.base_id, safe='')}/{quote(table, safe='')}"
+            response = await self._http.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def records(
+        self, table: str, formula: str | Node, fields: Iterable[str] = ()
+    ) -> AsyncIterator[Record]:
+        """Stream every record matching `formula`, following pagination offsets."""
+        fields = tuple(fields)
+        offset: str | None = None
+        while True:
+            page = await self.fetch_page(table, formula, offset, fields)
+            for record in page.get("records", []):
+                yield record
+            offset = page.get("offset")
+            if not offset:
+                return
+
+    async def fetch_all(
+        self, table: str, formula: str | Node, fields: Iterable[str] = ()
+    ) -> list[Record]:
+        return [record async for record in self.records(table, formula, fields)]
+
+    async def fetch_split(
+        self,
+        table: str,
+        formula: str | Node,
+        fields: Iterable[str] = (),
+        budget: int = DEFAULT_BUDGET,
+    ) -> list[Record]:
+        """Like `fetch_all`, but splits a formula over the URL budget into concurrent queries.
+
+        Records matched by more than one of the queries are returned once.
+        """
+        queries = {str(i): (table, part) for i, part in enumerate(split_formula(formula, budget))}
+        results: dict[str, list[Record]] = {name: [] for name in queries}
+        async for name, record in self.records_many(queries, fields):
+            results[name].append(record)
+        return merge_records(results.values())  # type: ignore[return-value]
+
+    async def records_many(
+        self, queries: Mapping[str, Query], fields: Iterable[str] = (), buffer: int = 1000
+    ) -> AsyncIterator[tuple[str, Record]]:
+        """Run named `(table, formula)` queries concurrently, yielding `(name, record)` pairs.
+
+        Records arrive in the order pages complete. At most `buffer` records wait unconsumed;
+        beyond that the queries pause, so memory stays bounded.
+        """
+        fields = tuple(fields)
+        queue: asyncio.Queue[tuple[str, Record] | Exception | None] = asyncio.Queue(buffer)
+
+        async def run(name: str, table: str, formula: str | Node) -> None:
+            try:
+                async for record in self.records(table, formula, fields):
+                    await queue.put((name, record))
+            except Exception as error:  # noqa: BLE001 - re-raised in the consumer
+                # Cancellation is left to propagate: the consumer has stopped reading, so a put
+                # into a full queue would never return.
+                await queue.put(error)
+            else:
+                await queue.put(None)
+
+        tasks = [
+            asyncio.create_task(run(name, table, formula))
+            for name, (table, formula) in queries.items()
+        ]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,156 @@
+"""Generate a Python package of typed field constants from a base schema.
+
+Each table becomes a module holding a class whose attributes are ready-made field objects::
+
+    from basefields import Jobs
+
+    Jobs.DUE_DATE.is_before().days_ago(7)
+
+The package imports without reading the schema, and editors can complete the names. Each module
+records a hash of its table's schema, so regenerating rewrites only tables that changed.
+"""
+
+import hashlib
+import json
+import keyword
+import os
+import re
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from .schema import field_class
+
+# Bump when the generated code changes shape, so existing modules are rewritten.
+GENERATOR_VERSION = 1
+_HASH_LINE = re.compile(r"^# schema-hash: ([0-9a-f]+)$", re.MULTILINE)
+
+
+def _words(name: str) -> list[str]:
+    return re.findall(r"[A-Za-z0-9]+", name)
+
+
+def _unique(candidate: str, taken: set[str]) -> str:
+    name, n = candidate, 2
+    while name in taken:
+        name, n = f"{candidate}_{n}", n + 1
+    taken.add(name)
+    return name
+
+
+def constant_name(field_name: str) -> str:
+    """`"Due Date"` -> `DUE_DATE`."""
+    name = "_".join(_words(field_name)).upper() or "FIELD"
+    if name[0].isdigit():
+        return f"F_{name}"
+    return f"{name}_" if keyword.iskeyword(name) else name
+
+
+def class_name(table_name: str) -> str:
+    """`"work orders"` -> `WorkOrders`; `"None"` -> `None_`."""
+    name = "".join(word[:1].upper() + word[1:] for word in _words(table_name)) or "Table"
+    if name[0].isdigit():
+        return f"T{name}"
+    return f"{name}_" if keyword.iskeyword(name) else name
+
+
+def module_name(table_name: str) -> str:
+    """`"Work Orders"` -> `work_orders`."""
+    name = "_".join(_words(table_name)).lower() or "table"
+    if name[0].isdigit() or keyword.iskeyword(name):
+        name = f"t_{name}"
+    return name
+
+
+def table_hash(table: Mapping[str, Any]) -> str:
+    material = json.dumps([GENERATOR_VERSION, table], sort_keys=True)
+    return hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+
+
+def render_table(table: Mapping[str, Any], cls: str | None = None) -> str:
+    """The source of a table's module."""
+    cls = cls or class_name(table["name"])
+    taken: set[str] = set()
+    lines, used = [], set()
+    for field in table.get("fields", ()):
+        helper = field_class(field).__name__
+        used.add(helper)
+        constant = _unique(constant_name(field["name"]), taken)
+        lines.append(f"    {constant} = {helper}(name={json.dumps(field['name'])})")
+    described = table["name"] + (f" ({table['id']})" if table.get("id") else "")
+    header = [
+        "# Generated by airtableformulahelpers.codegen; do not edit.",
+        f"# schema-hash: {table_hash(table)}",
+    ]
+    if used:
+        header.append(f"from airtableformulahelpers import {', '.join(sorted(used))}")
+    body = [f"class {cls}:", f'    """Fields of the {described} table."""']
+    if lines:
+        body += ["", *lines]
+    return "\n".join([*header, "", "", *body]) + "\n"
+
+
+def _write_if_changed(path: Path, source: str) -> bool:
+    if path.exists() and path.read_text() == source:
+        return False
+    scratch = path.with_name(path.name + ".tmp")
+    scratch.write_text(source)
+    os.replace(scratch, path)
+    return True
+
+
+def _existing_hash(path: Path) -> str | None:
+    try:
+        with open(path) as f:
+            match = _HASH_LINE.search(f.read(256))
+    except FileNotFoundError:
+        return None
+    return match.group(1) if match else None
+
+
+def generate_package(
+    schema: Mapping[str, Any] | str | os.PathLike, directory: str | os.PathLike
+) -> list[Path]:
+    """Write or update the package in `directory`, returning the files it rewrote.
+
+    `schema` is the metadata API response or the path of a file holding it. Modules of tables
+    that are no longer in the schema are deleted.
+    """
+    if not isinstance(schema, Mapping):
+        schema = json.loads(Path(schema).read_text())
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    written: list[Path] = []
+    modules: dict[str, str] = {}
+    taken_modules: set[str] = {"__init__"}
+    taken_classes: set[str] = set()
+    for table in schema.get("tables", ()):
+        module = _unique(module_name(table["name"]), taken_modules)
+        cls = _unique(class_name(table["name"]), taken_classes)
+        modules[module] = cls
+        path = directory / f"{module}.py"
+        if _existing_hash(path) == table_hash(table) and f"class {cls}:" in path.read_text():
+            continue
+        if _write_if_changed(path, render_table(table, cls)):
+            written.append(path)
+
+    for stale in _generated_modules(directory, keep=modules):
+        stale.unlink()
+        written.append(stale)
+
+    init = ["# Generated by airtableformulahelpers.codegen; do not edit."]
+    init += [f"from .{module} import {cls}" for module, cls in modules.items()]
+    init += ["", f"__all__ = {json.dumps(sorted(modules.values()))}"]
+    if _write_if_changed(directory / "__init__.py", "\n".join(init) + "\n"):
+        written.append(directory / "__init__.py")
+    return written
+
+
+def _generated_modules(directory: Path, keep: Iterable[str]) -> list[Path]:
+    keep = set(keep)
+    return [
+        path
+        for path in directory.glob("*.py")
+        if path.stem not in keep and path.stem != "__init__" and _existing_hash(path)
+    ]
@@ -0,0 +1,103 @@
+"""Which fields a formula references, and the minimal `fields[]` projection for a list request."""
+
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+
+from .formula import FieldRef, Node, walk
+
+# String literals are matched first so a `{...}` inside quotes is not taken for a field.
+_FIELD_OR_STRING = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|\{([^}]*)\}""")
+
+
+@lru_cache(maxsize=4096)
+def _scan(formula: str) -> frozenset[str]:
+    return frozenset(name for name in _FIELD_OR_STRING.findall(formula) if name)
+
+
+def referenced_fields(formula: str | Node) -> frozenset[str]:
+    """Names of the `{Field}` references in a formula.
+
+    Strings are scanned without building a tree, so this is cheap enough for every request.
+    """
+    if isinstance(formula, str):
+        return _scan(formula)
+    return frozenset(node.name for node in walk(formula) if isinstance(node, FieldRef))
+
+
+def referenced_fields_many(formulas: Iterable[str | Node]) -> frozenset[str]:
+    """Union of the fields referenced by a batch of formulas."""
+    fields: set[str] = set()
+    for formula in formulas:
+        fields |= referenced_fields(formula)
+    return frozenset(fields)
+
+
+class DependencyIndex:
+    """Maps registered formulas to the fields they reference, and each field back to formulas."""
+
+    def __init__(self) -> None:
+        self._fields: dict[str, frozenset[str]] = {}
+        self._formulas: dict[str, set[str]] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def add(self, key: str, formula: str | Node) -> frozenset[str]:
+        self.remove(key)
+        fields = referenced_fields(formula)
+        self._fields[key] = fields
+        for field in fields:
+            self._formulas.setdefault(field, set()).add(key)
+        return fields
+
+    def remove(self, key: str) -> None:
+        for field in self._fields.pop(key, ()):
+            keys = self._formulas[field]
+            keys.discard(key)
+            if not keys:
+                del self._formulas[field]
+
+    def fields(self, key: str) -> frozenset[str]:
+        return self._fields[key]
+
+    def affected(self, changed_fields: Iterable[str]) -> set[str]:
+        """Keys of the formulas that reference any of `changed_fields`."""
+        keys: set[str] = set()
+        for field in changed_fields:
+            keys |= self._formulas.get(field, set())
+        return keys
+
+
+def fields_projection(
+    formulas: str | Node | Iterable[str | Node],
+    output_fields: Iterable[str] = (),
+    include_filter_fields: bool = True,
+) -> list[str]:
+    """The `fields[]` to request: the output fields, then the fields the filters reference.
+
+    Filter fields are included by default so results can be re-checked locally; pass
+    `include_filter_fields=False` when only the output is needed.
+    """
+    projection = list(dict.fromkeys(output_fields))
+    if include_filter_fields:
+        if isinstance(formulas, str) or not isinstance(formulas, Iterable):
+            formulas = [formulas]
+        seen = set(projection)
+        projection.extend(sorted(referenced_fields_many(formulas) - seen))  # type: ignore[arg-type]
+    return projection
+
+
+def list_request_params(
+    formula: str, output_fields: Iterable[str] = (), include_filter_fields: bool = True
+) -> list[tuple[str, str]]:
+    """Query parameters for a list request that filters by `formula` and projects its fields."""
+    params = [("filterByFormula", formula)]
+    params.extend(
+        ("fields[]", field)
+        for field in fields_projection(formula, output_fields, include_filter_fields)
+    )
+    return params
@@ -0,0 +1,446 @@
+"""Local evaluation of formulas against record fields, following Airtable's semantics.
+
+Blank values are `None`, `""` or `[]`; they are falsy along with `0` and `FALSE()`. Linked
+records, lookups and attachments are lists; `LEN` of a list counts its items, which is how
+`AttachmentsField.count_is` reads it.
+"""
+
+import math
+import re
+from collections.abc import Callable, Mapping
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from .formula import BinOp, Call, FieldRef, Members, Name, Neg, Node, Num, Str, to_node
+
+
+class EvaluationError(ValueError):
+    """Raised when a formula uses something the local evaluator cannot compute."""
+
+
+class Row:
+    """What a formula can see while it is evaluated: the record's fields, its id and the time."""
+
+    __slots__ = ("fields", "now", "record_id")
+
+    def __init__(
+        self,
+        fields: Mapping[str, Any],
+        record_id: str | None = None,
+        now: datetime | None = None,
+    ):
+        self.fields = fields
+        self.record_id = record_id
+        self.now = now
+
+
+Evaluator = Callable[[Row], Any]
+# Wraps the evaluator compiled for each node, e.g. to count and time it in `explain`.
+Probe = Callable[[Node, Evaluator], Evaluator]
+
+
+def is_blank(value: Any) -> bool:
+    return value is None or value == "" or value == []
+
+
+def is_truthy(value: Any) -> bool:
+    if isinstance(value, (list, str)):
+        return len(value) > 0
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return bool(value)
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return ", ".join(_text(item) for item in value)
+    if isinstance(value, dict):
+        for key in ("name", "filename", "email", "url", "id"):
+            if key in value:
+                return _text(value[key])
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _number(value: Any) -> float | int | None:
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, list):
+        return _number(value[0]) if len(value) == 1 else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime_text(text: str) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        import dateparser
+
+        parsed = dateparser.parse(text)
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _datetime(value: Any) -> datetime | None:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    if isinstance(value, list):
+        return _datetime(value[0]) if len(value) == 1 else None
+    if isinstance(value, str) and value:
+        return _parse_datetime_text(value)
+    return None
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equals(left: Any, right: Any) -> bool:
+    if isinstance(left, bool) or isinstance(right, bool):
+        return is_truthy(left) == is_truthy(right)
+    if is_blank(left) or is_blank(right):
+        return is_blank(left) and is_blank(right)
+    if _is_number(left) or _is_number(right):
+        a, b = _number(left), _number(right)
+        return a is not None and b is not None and a == b
+    if isinstance(left, datetime) or isinstance(right, datetime):
+        a, b = _datetime(left), _datetime(right)
+        return a is not None and a == b
+    return _text(left) == _text(right)
+
+
+def _order(left: Any, right: Any) -> tuple[Any, Any] | None:
+    """Coerce both sides to comparable values, or None when they cannot be compared."""
+    if isinstance(left, datetime) or isinstance(right, datetime):
+        a, b = _datetime(left), _datetime(right)
+        return None if a is None or b is None else (a, b)
+    if isinstance(left, str) and isinstance(right, str) and left and right:
+        return left, right
+    a, b = _number(left), _number(right)
+    return None if a is None or b is None else (a, b)
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if op == "=":
+        return _equals(left, right)
+    if op == "!=":
+        return not _equals(left, right)
+    pair = _order(left, right)
+    if pair is None:
+        return False
+    a, b = pair
+    if op == ">":
+        return a > b
+    if op == "<":
+        return a < b
+    if op == ">=":
+        return a >= b
+    return a <= b
+
+
+def _arithmetic(op: str, left: Any, right: Any) -> Any:
+    if op == "&":
+        return _text(left) + _text(right)
+    if op == "-" and isinstance(left, datetime) and isinstance(right, datetime):
+        return (left - right).total_seconds() / 86400
+    a, b = _number(left), _number(right)
+    if a is None or b is None:
+        return None
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if b == 0:
+        return None
+    return a / b
+
+
+_UNITS = {
+    "milliseconds": 0.001,
+    "ms": 0.001,
+    "seconds": 1,
+    "s": 1,
+    "minutes": 60,
+    "m": 60,
+    "hours": 3600,
+    "h": 3600,
+    "days": 86400,
+    "d": 86400,
+    "weeks": 604800,
+    "w": 604800,
+}
+_MONTH_UNITS = {"months": 1, "M": 1, "quarters": 3, "Q": 3, "years": 12, "y": 12}
+
+
+def _unit(name: Any) -> str:
+    unit = _text(name) or "seconds"
+    if unit in _UNITS or unit in _MONTH_UNITS:
+        return unit
+    plural = unit + "s"
+    return plural if plural in _UNITS or plural in _MONTH_UNITS else unit
+
+
+def datetime_diff(left: Any, right: Any, unit: Any = "seconds") -> int | None:
+    """Whole `unit`s from `right` to `left`, as `DATETIME_DIFF`; None when either is blank."""
+    a, b = _datetime(left), _datetime(right)
+    if a is None or b is None:
+        return None
+    unit = _unit(unit)
+    if unit in _MONTH_UNITS:
+        months = (a.year - b.year) * 12 + a.month - b.month
+        later, earlier = (a, b) if months >= 0 else (b, a)
+        if (later.day, later.time()) < (earlier.day, earlier.time()):
+            months += -1 if months > 0 else 1 if months < 0 else 0
+        return int(months / _MONTH_UNITS[unit])
+    if unit not in _UNITS:
+        raise EvaluationError(f"Unknown DATETIME_DIFF unit: {unit}")
+    return int((a - b).total_seconds() / _UNITS[unit])
+
+
+def _datetime_add(value: Any, count: Any, unit: Any) -> datetime | None:
+    moment, amount = _datetime(value), _number(count)
+    if moment is None or amount is None:
+        return None
+    unit = _unit(unit)
+    if unit in _MONTH_UNITS:
+        months = moment.month - 1 + int(amount) * _MONTH_UNITS[unit]
+        year, month = moment.year + months // 12, months % 12 + 1
+        return moment.replace(year=year, month=month, day=min(moment.day, _month_days(year, month)))
+    return moment + timedelta(seconds=amount * _UNITS[unit])
+
+
+def _month_days(year: int, month: int) -> int:
+    following = date(year + month // 12, month % 12 + 1, 1)
+    return (following - timedelta(days=1)).day
+
+
+def _find(needle: Any, haystack: Any, start: Any = 0) -> int:
+    offset = max(int(_number(start) or 1) - 1, 0)
+    return _text(haystack).find(_text(needle), offset) + 1
+
+
+def _search(needle: Any, haystack: Any, start: Any = 0) -> int | None:
+    return _find(needle, haystack, start) or None
+
+
+@lru_cache(maxsize=1024)
+def _regex(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
+def _round(value: Any, digits: Any = 0) -> float | int | None:
+    number, places = _number(value), int(_number(digits) or 0)
+    if number is None:
+        return None
+    scale = 10**places
+    rounded = math.floor(abs(number) * scale + 0.5) / scale
+    rounded = math.copysign(rounded, number)
+    return int(rounded) if places <= 0 else rounded
+
+
+def _value(value: Any) -> float | int | None:
+    if _is_number(value):
+        return value
+    cleaned = re.sub(r"[^0-9.\-eE]", "", _text(value))
+    try:
+        number = float(cleaned)
+    except ValueError:
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def _mid(text: Any, start: Any, count: Any) -> str:
+    begin = max(int(_number(start) or 1) - 1, 0)
+    return _text(text)[begin : begin + max(int(_number(count) or 0), 0)]
+
+
+def _xor(*values: Any) -> bool:
+    return sum(1 for value in values if is_truthy(value)) % 2 == 1
+
+
+FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "TRUE": lambda: True,
+    "FALSE": lambda: False,
+    "BLANK": lambda: None,
+    "NOT": lambda value: not is_truthy(value),
+    "XOR": _xor,
+    "FIND": _find,
+    "SEARCH": _search,
+    "LOWER": lambda value: _text(value).lower(),
+    "UPPER": lambda value: _text(value).upper(),
+    "TRIM": lambda value: _text(value).strip(),
+    "LEN": lambda value: len(value) if isinstance(value, list) else len(_text(value)),
+    "CONCATENATE": lambda *values: "".join(_text(value) for value in values),
+    "LEFT": lambda text, count: _text(text)[: max(int(_number(count) or 0), 0)],
+    "RIGHT": lambda text, count: _text(text)[len(_text(text)) - max(int(_number(count) or 0), 0) :],
+    "MID": _mid,
+    "SUBSTITUTE": lambda text, old, new: _text(text).replace(_text(old), _text(new)),
+    "REGEX_MATCH": lambda text, pattern: _regex(_text(pattern)).search(_text(text)) is not None,
+    "ARRAYJOIN": lambda values, separator=", ": _text(separator).join(
+        _text(value) for value in (values if isinstance(values, list) else [values])
+    ),
+    "VALUE": _value,
+    "ROUND": _round,
+    "ABS": lambda value: abs(_number(value) or 0),
+    "INT": lambda value: math.floor(_number(value) or 0),
+    "DATETIME_PARSE": lambda value, *_: _datetime(value),
+    "DATETIME_DIFF": datetime_diff,
+    "DATEADD": _datetime_add,
+    "IS_BEFORE": lambda left, right: _compare("<", _datetime(left), _datetime(right)),
+    "IS_AFTER": lambda left, right: _compare(">", _datetime(left), _datetime(right)),
+}
+
+
+def _now(row: Row) -> datetime:
+    return row.now or datetime.now(timezone.utc)
+
+
+def _compile_call(node: Call, probe: Probe | None = None) -> Evaluator:
+    args = [_compile(arg, probe) for arg in node.args]
+    name = node.name
+    if name == "AND":
+        return lambda row: all(is_truthy(arg(row)) for arg in args)
+    if name == "OR":
+        return lambda row: any(is_truthy(arg(row)) for arg in args)
+    if name == "IF":
+        if not 2 <= len(args) <= 3:
+            raise EvaluationError(f"IF takes 2 or 3 arguments, got {len(args)}")
+        condition, when_true = args[0], args[1]
+        when_false = args[2] if len(args) == 3 else (lambda row: None)
+        return lambda row: when_true(row) if is_truthy(condition(row)) else when_false(row)
+    if name == "SWITCH":
+        return _compile_switch(args)
+    if name == "NOW":
+        return _now
+    if name == "TODAY":
+        return lambda row: _now(row).replace(hour=0, minute=0, second=0, microsecond=0)
+    if name == "RECORD_ID":
+        return lambda row: row.record_id
+    function = FUNCTIONS.get(name)
+    if function is None:
+        raise EvaluationError(f"Function {name}() is not supported locally")
+    if not args:
+        constant = function()
+        return lambda row: constant
+    if len(args) == 1:
+        (only,) = args
+        return lambda row: function(only(row))
+    return lambda row: function(*(arg(row) for arg in args))
+
+
+def _compile_switch(args: list[Evaluator]) -> Evaluator:
+    if len(args) < 3:
+        raise EvaluationError("SWITCH needs an expression and at least one pattern and result")
+    expression, pairs = args[0], args[1:]
+    default = pairs.pop() if len(pairs) % 2 else (lambda row: None)
+
+    def switch(row: Row) -> Any:
+        value = expression(row)
+        for i in range(0, len(pairs), 2):
+            if _equals(value, pairs[i](row)):
+                return pairs[i + 1](row)
+        return default(row)
+
+    return switch
+
+
+def _compile(node: Node, probe: Probe | None = None) -> Evaluator:
+    evaluator = _compile_node(node, probe)
+    return evaluator if probe is None else probe(node, evaluator)
+
+
+def _compile_node(node: Node, probe: Probe | None) -> Evaluator:
+    if isinstance(node, FieldRef):
+        name = node.name
+        return lambda row: row.fields.get(name)
+    if isinstance(node, (Str, Num)):
+        constant = node.value
+        return lambda row: constant
+    if isinstance(node, Call):
+        return _compile_call(node, probe)
+    if isinstance(node, BinOp):
+        left, right, op = _compile(node.left, probe), _compile(node.right, probe), node.op
+        if op in ("=", "!=", ">", "<", ">=", "<="):
+            return lambda row: _compare(op, left(row), right(row))
+        return lambda row: _arithmetic(op, left(row), right(row))
+    if isinstance(node, Neg):
+        operand = _compile(node.operand, probe)
+
+        def negate(row: Row) -> Any:
+            value = _number(operand(row))
+            return None if value is None else -value
+
+        return negate
+    if isinstance(node, Members):
+        return _compile_members(node, _compile(node.target, probe))
+    if isinstance(node, Name):
+        raise EvaluationError(f"Unknown identifier {node.name!r}")
+    raise TypeError(f"Not a formula node: {node!r}")
+
+
+def _compile_members(node: Members, target: Evaluator) -> Evaluator:
+    values = node.values
+
+    def member(row: Row) -> bool:
+        value = target(row)
+        if isinstance(value, str) and value:
+            return value in values
+        if is_blank(value):
+            return "" in values
+        # Numbers, dates and lists compare as `=` would; these are rare in id or text
+        # sets, so the linear scan is acceptable.
+        return any(_equals(value, candidate) for candidate in values)
+
+    return member
+
+
+@lru_cache(maxsize=1024)
+def _compiled(formula: str | Node) -> Evaluator:
+    return _compile(to_node(formula))
+
+
+def compile_formula(formula: str | Node) -> Evaluator:
+    """Compile a formula once into a function of a `Row`, for evaluating many records."""
+    return _compiled(formula)
+
+
+def evaluate(
+    formula: str | Node,
+    fields: Mapping[str, Any],
+    record_id: str | None = None,
+    now: datetime | None = None,
+) -> Any:
+    """The value of a formula for one record."""
+    return _compiled(formula)(Row(fields, record_id, now))
+
+
+def matches(
+    formula: str | Node,
+    fields: Mapping[str, Any],
+    record_id: str | None = None,
+    now: datetime | None = None,
+) -> bool:
+    """Whether a record passes a `filterByFormula` condition."""
+    return is_truthy(_compiled(formula)(Row(fields, record_id, now)))
@@ -0,0 +1,91 @@
+"""Profile a formula against a local sample of records, node by node.
+
+    report = explain(formula, records)
+    for step in report.walk():
+        print(step.text, step.matched, step.evaluated, step.seconds)
+
+Every subexpression is counted and timed as the sample is evaluated. `evaluated` is how many
+records reached the node, fewer than the sample where `AND`, `OR` or `IF` short-circuited;
+`matched` is how many of those gave a truthy value; `seconds` includes the node's children.
+A condition that runs often, matches rarely and takes long is the one to move or rewrite.
+"""
+
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from .evaluate import Evaluator, Row, _compile, is_truthy
+from .formula import Node, children, render, to_node
+from .stream import Item, to_row
+
+
+@dataclass(eq=False)
+class Step:
+    """Counters for one node of the formula."""
+
+    node: Node
+    children: list["Step"] = field(default_factory=list)
+    evaluated: int = 0
+    matched: int = 0
+    seconds: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return render(self.node)
+
+    @property
+    def selectivity(self) -> float | None:
+        """The share of records reaching this node that it matched."""
+        return self.matched / self.evaluated if self.evaluated else None
+
+    @property
+    def self_seconds(self) -> float:
+        """Time spent in this node, not counting its children."""
+        return self.seconds - sum(child.seconds for child in self.children)
+
+    def walk(self) -> Iterator["Step"]:
+        """This step and every step below it, parents first."""
+        stack = [self]
+        while stack:
+            step = stack.pop()
+            yield step
+            stack.extend(reversed(step.children))
+
+
+def _probe(built: list[Step]):
+    """A probe collecting steps; children are compiled first, so they are on top of `built`."""
+
+    def probe(node: Node, evaluator: Evaluator) -> Evaluator:
+        count = len(children(node))
+        below = built[len(built) - count :] if count else []
+        del built[len(built) - count :]
+        step = Step(node, below)
+        built.append(step)
+
+        def counted(row: Row) -> Any:
+            start = time.perf_counter()
+            value = evaluator(row)
+            step.seconds += time.perf_counter() - start
+            step.evaluated += 1
+            if is_truthy(value):
+                step.matched += 1
+            return value
+
+        return counted
+
+    return probe
+
+
+def explain(formula: str | Node, records: Iterable[Item], now: datetime | None = None) -> Step:
+    """Evaluate `formula` for every record, returning the counters of its root node.
+
+    `records` are NDJSON lines or mappings, as `stream.filter_items` takes them.
+    """
+    built: list[Step] = []
+    evaluator = _compile(to_node(formula), _probe(built))
+    for record in records:
+        evaluator(to_row(record, now))
+    (report,) = built
+    return report
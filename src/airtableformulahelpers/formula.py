@@ -0,0 +1,546 @@
+"""Formula trees: parse the strings built by the helpers back into nodes and render them again."""
+
+import re
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Literal, overload
+
+
+class FormulaSyntaxError(ValueError):
+    """Raised when a formula string cannot be parsed."""
+
+
+@dataclass(frozen=True, slots=True)
+class FieldRef:
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class Str:
+    value: str
+    quote: str = '"'
+
+
+@dataclass(frozen=True, slots=True)
+class Num:
+    value: int | float
+
+
+@dataclass(frozen=True, slots=True)
+class Name:
+    """A bare identifier such as `cond1`, kept as an opaque atom."""
+
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class Call:
+    name: str
+    args: tuple["Node", ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class BinOp:
+    op: str
+    left: "Node"
+    right: "Node"
+
+
+@dataclass(frozen=True, slots=True)
+class Neg:
+    operand: "Node"
+
+
+class LiteralList:
+    """An immutable list of strings packed into one UTF-8 buffer.
+
+    Values are stored `\\0`-separated with an array of end offsets, a few bytes per value
+    instead of a `str` object each. `in` uses an index of the values' hashes, sorted with their
+    positions, built on first use: 12 bytes per value rather than a set of strings.
+    """
+
+    __slots__ = ("_data", "_ends", "_hashes", "_order")
+
+    def __init__(self, values: Iterable[str] = ()):
+        data = bytearray()
+        ends = array("Q")
+        for value in values:
+            encoded = value.encode()
+            if b"\0" in encoded:
+                raise ValueError(f"Literal contains a NUL character: {value!r}")
+            if ends:
+                data += b"\0"
+            data += encoded
+            ends.append(len(data))
+        self._data = bytes(data)
+        self._ends = array("I", ends) if len(data) < 2**32 else ends
+        self._hashes: array | None = None
+        self._order: array | None = None
+
+    @classmethod
+    def from_buffers(cls, data: bytes, ends: array) -> "LiteralList":
+        """A list over an existing buffer and end offsets, as returned by `buffers()`."""
+        if ends and (ends[-1] != len(data) or any(a >= b for a, b in zip(ends, ends[1:]))):
+            raise ValueError("End offsets do not match the buffer")
+        values = cls()
+        values._data, values._ends = data, ends
+        return values
+
+    def buffers(self) -> tuple[bytes, array]:
+        """The packed buffer and its end offsets."""
+        return self._data, self._ends
+
+    def __reduce__(self):
+        # String hashes differ between processes, so the index is rebuilt after unpickling.
+        return (LiteralList.from_buffers, (self._data, self._ends))
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+    @overload
+    def __getitem__(self, index: slice) -> "LiteralList": ...
+    def __getitem__(self, index: int | slice) -> "str | LiteralList":
+        if isinstance(index, slice):
+            return LiteralList(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        end = self._ends[index]  # raises IndexError
+        start = self._ends[index - 1] + 1 if index else 0
+        return self._data[start:end].decode()
+
+    def __iter__(self) -> Iterator[str]:
+        view, start = memoryview(self._data), 0
+        for end in self._ends:
+            yield str(view[start:end], "utf-8")
+            start = end + 1
+
+    def _build_index(self) -> tuple[array, array]:
+        hashes = array("q", map(hash, self))
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+        self._order = array("I" if len(order) < 2**32 else "Q", order)
+        self._hashes = array("q", (hashes[i] for i in self._order))
+        return self._hashes, self._order
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, str):
+            return False
+        hashes, order = (
+            (self._hashes, self._order) if self._hashes is not None else self._build_index()
+        )
+        key = hash(value)
+        i = bisect_left(hashes, key)
+        while i < len(hashes) and hashes[i] == key:
+            if self[order[i]] == value:
+                return True
+            i += 1
+        return False
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LiteralList):
+            return NotImplemented
+        return len(self) == len(other) and self._data == other._data
+
+    def __hash__(self) -> int:
+        return hash((len(self), self._data))
+
+    def __repr__(self) -> str:
+        preview = ", ".join(repr(value) for value in self[:3])
+        return f"LiteralList([{preview}{', ...' if len(self) > 3 else ''}], {len(self)} values)"
+
+    def joined(self) -> str:
+        """Every value in one string, separated by `\\0`."""
+        return self._data.decode()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the buffer, offsets and index."""
+        index = (self._hashes, self._order) if self._hashes is not None else ()
+        return len(self._data) + sum(a.itemsize * len(a) for a in (self._ends, *index))
+
+
+@dataclass(frozen=True, slots=True)
+class Members:
+    """`OR(target=v1, target=v2, ...)` over a packed list of text values.
+
+    Stands in for the `OR` of equalities that `id_equals` batches and equality sets produce,
+    rendering straight from the buffer and evaluating with a hash lookup.
+    """
+
+    target: "Node"
+    values: LiteralList
+    quote: str = '"'
+
+    @classmethod
+    def record_ids(cls, ids: Iterable[str]) -> "Members":
+        """Records whose id is one of `ids`, like an `OR` of `id_equals`."""
+        return cls(Call("RECORD_ID"), LiteralList(ids), "'")
+
+    @classmethod
+    def field_equals(cls, name: str, values: Iterable[str]) -> "Members":
+        """Records whose field `name` equals one of `values`."""
+        return cls(FieldRef(name), LiteralList(values))
+
+    def expand(self) -> "Call":
+        """The equivalent `OR` call, with one node per value."""
+        return Call(
+            "OR", tuple(BinOp("=", self.target, Str(value, self.quote)) for value in self.values)
+        )
+
+
+Node = FieldRef | Str | Num | Name | Call | BinOp | Neg | Members
+
+COMPARISONS = frozenset(("=", "!=", ">", "<", ">=", "<="))
+ARITHMETIC = frozenset(("+", "-", "*", "/"))
+LOGICAL = frozenset(("AND", "OR", "XOR", "NOT"))
+
+# Deepest nesting of calls, parentheses and negations `parse` accepts. Parsing, evaluating and
+# compiling recurse once or more per level, so deeper formulas would exhaust Python's recursion
+# limit part way through; Airtable's own formulas stay far shallower.
+MAX_DEPTH = 100
+
+_PRECEDENCE = {
+    "=": 1,
+    "!=": 1,
+    ">": 1,
+    "<": 1,
+    ">=": 1,
+    "<=": 1,
+    "&": 2,
+    "+": 3,
+    "-": 3,
+    "*": 4,
+    "/": 4,
+}
+
+_TOKEN = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<field>\{[^}]*\})
+    |(?P<str>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+    |(?P<num>\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+    |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<op>!=|>=|<=|=|>|<|&|\+|-|\*|/)
+    |(?P<punct>[(),])
+    """,
+    re.VERBOSE,
+)
+
+_ESCAPES = {'"': '"', "'": "'", "\\": "\\", "n": "\n", "t": "\t"}
+_ESCAPABLE = frozenset(_ESCAPES)
+
+
+def _unescape(body: str) -> str:
+    if "\\" not in body:
+        return body
+    out: list[str] = []
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if char == "\\" and i + 1 < len(body) and body[i + 1] in _ESCAPES:
+            out.append(_ESCAPES[body[i + 1]])
+            i += 2
+        else:
+            out.append(char)
+            i += 1
+    return "".join(out)
+
+
+def _escape(value: str, quote: str) -> str:
+    """Escape only what would otherwise be misread, so regex patterns like `\\d` survive."""
+    if "\\" not in value and quote not in value and "\n" not in value and "\t" not in value:
+        return value
+    out: list[str] = []
+    for i, char in enumerate(value):
+        if char == "\\":
+            following = value[i + 1] if i + 1 < len(value) else ""
+            out.append("\\\\" if following == "" or following in _ESCAPABLE else "\\")
+        elif char == quote:
+            out.append("\\" + quote)
+        elif char == "\n":
+            out.append("\\n")
+        elif char == "\t":
+            out.append("\\t")
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def _tokenize(formula: str) -> list[tuple[str, str]]:
+    tokens: list[tuple[str, str]] = []
+    pos = 0
+    length = len(formula)
+    while pos < length:
+        match = _TOKEN.match(formula, pos)
+        if match is None:
+            raise FormulaSyntaxError(f"Unexpected character {formula[pos]!r} at {pos}: {formula}")
+        kind = match.lastgroup
+        if kind != "ws":
+            tokens.append((kind, match.group()))  # type: ignore[arg-type]
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, formula: str):
+        self.formula = formula
+        self.tokens = _tokenize(formula)
+        self.pos = 0
+        self.depth = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise FormulaSyntaxError(f"Unexpected end of formula: {self.formula}")
+        self.pos += 1
+        return token
+
+    def expect(self, text: str) -> None:
+        _, value = self.take()
+        if value != text:
+            raise FormulaSyntaxError(f"Expected {text!r} but found {value!r}: {self.formula}")
+
+    def nest(self) -> None:
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise FormulaSyntaxError(f"Formula nests more than {MAX_DEPTH} levels deep")
+
+    def expression(self, min_precedence: int = 1) -> Node:
+        left = self.unary()
+        while True:
+            token = self.peek()
+            if token is None or token[0] != "op":
+                return left
+            precedence = _PRECEDENCE[token[1]]
+            if precedence < min_precedence:
+                return left
+            self.pos += 1
+            right = self.expression(precedence + 1)
+            left = BinOp(token[1], left, right)
+
+    def unary(self) -> Node:
+        token = self.peek()
+        if token == ("op", "-"):
+            self.pos += 1
+            self.nest()
+            operand = self.unary()
+            self.depth -= 1
+            if isinstance(operand, Num):
+                return Num(-operand.value)
+            return Neg(operand)
+        return self.atom()
+
+    def atom(self) -> Node:
+        kind, value = self.take()
+        if kind == "field":
+            return FieldRef(value[1:-1])
+        if kind == "str":
+            return Str(_unescape(value[1:-1]), value[0])
+        if kind == "num":
+            if "." in value or "e" in value or "E" in value:
+                return Num(float(value))
+            return Num(int(value))
+        if kind == "name":
+            if self.peek() == ("punct", "("):
+                self.pos += 1
+                self.nest()
+                args: list[Node] = []
+                if self.peek() != ("punct", ")"):
+                    args.append(self.expression())
+                    while self.peek() == ("punct", ","):
+                        self.pos += 1
+                        args.append(self.expression())
+                self.expect(")")
+                self.depth -= 1
+                return Call(value.upper(), tuple(args))
+            return Name(value)
+        if value == "(":
+            self.nest()
+            inner = self.expression()
+            self.expect(")")
+            self.depth -= 1
+            return inner
+        raise FormulaSyntaxError(f"Unexpected {value!r}: {self.formula}")
+
+
+def parse(formula: str) -> Node:
+    """Parse a formula string into a tree, nested at most `MAX_DEPTH` levels deep."""
+    parser = _Parser(formula)
+    node = parser.expression()
+    if parser.peek() is not None:
+        raise FormulaSyntaxError(f"Unexpected {parser.peek()[1]!r}: {formula}")  # type: ignore[index]
+    return node
+
+
+def to_node(formula: "str | Node") -> Node:
+    return parse(formula) if isinstance(formula, str) else formula
+
+
+RenderMode = Literal["default", "compact", "pretty"]
+
+
+def _format_number(value: float) -> str:
+    return str(value)
+
+
+def _compact_number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e16:
+        return str(int(value))
+    text = repr(value)
+    return text.replace("e+", "e").replace("e-0", "e-")
+
+
+def _quoted(node: Str, compact: bool) -> str:
+    if not compact:
+        return f"{node.quote}{_escape(node.value, node.quote)}{node.quote}"
+    double, single = _escape(node.value, '"'), _escape(node.value, "'")
+    if len(single) < len(double):
+        return f"'{single}'"
+    return f'"{double}"'
+
+
+def _render(node: Node, out: list[str], compact: bool = False) -> None:
+    if isinstance(node, FieldRef):
+        out.append(f"{{{node.name}}}")
+    elif isinstance(node, Str):
+        out.append(_quoted(node, compact))
+    elif isinstance(node, Num):
+        out.append(_compact_number(node.value) if compact else _format_number(node.value))
+    elif isinstance(node, Name):
+        out.append(node.name)
+    elif isinstance(node, Call):
+        separator = "," if compact or node.name in LOGICAL else ", "
+        out.append(node.name)
+        out.append("(")
+        for i, arg in enumerate(node.args):
+            if i:
+                out.append(separator)
+            _render(arg, out, compact)
+        out.append(")")
+    elif isinstance(node, BinOp):
+        precedence = _PRECEDENCE[node.op]
+        if compact:
+            spaced = False
+        elif node.op in COMPARISONS:
+            spaced = any(
+                isinstance(side, BinOp) and side.op in ARITHMETIC
+                for side in (node.left, node.right)
+            )
+        else:
+            spaced = True
+        _render_operand(node.left, precedence, out, compact)
+        out.append(f" {node.op} " if spaced else node.op)
+        _render_operand(node.right, precedence + 1, out, compact)
+    elif isinstance(node, Neg):
+        out.append("-")
+        _render_operand(node.operand, 5, out, compact)
+    elif isinstance(node, Members):
+        _render_members(node, out, compact)
+    else:
+        raise TypeError(f"Not a formula node: {node!r}")
+
+
+def _render_members(node: Members, out: list[str], compact: bool) -> None:
+    if not node.values:
+        out.append("FALSE()")
+        return
+    target: list[str] = []
+    _render_operand(node.target, 2, target, compact)
+    prefix = "".join(target) + "="
+    text = node.values.joined()
+    quote = node.quote
+    if compact and text.count("'") < text.count('"'):
+        quote = "'"
+    elif compact and text.count('"') < text.count("'"):
+        quote = '"'
+    if "\\" in text or quote in text or "\n" in text or "\t" in text:
+        body = f"{quote},{prefix}{quote}".join(_escape(value, quote) for value in node.values)
+    else:
+        # One pass over the buffer, with no object per value.
+        body = text.replace("\0", f"{quote},{prefix}{quote}")
+    out.append(f"OR({prefix}{quote}{body}{quote})")
+
+
+def _render_operand(node: Node, min_precedence: int, out: list[str], compact: bool = False) -> None:
+    if isinstance(node, BinOp) and _PRECEDENCE[node.op] < min_precedence:
+        out.append("(")
+        _render(node, out, compact)
+        out.append(")")
+    else:
+        _render(node, out, compact)
+
+
+def _pretty(node: Node, depth: int, width: int, out: list[str]) -> None:
+    """Break calls that do not fit in `width` into one argument per line."""
+    if isinstance(node, Members):
+        node = node.expand()
+    indent = "  " * depth
+    flat = render(node)
+    if not isinstance(node, Call) or not node.args or len(indent) + len(flat) <= width:
+        out.append(flat)
+        return
+    out.append(f"{node.name}(\n")
+    for i, arg in enumerate(node.args):
+        out.append(indent + "  ")
+        _pretty(arg, depth + 1, width, out)
+        out.append(",\n" if i < len(node.args) - 1 else "\n")
+    out.append(f"{indent})")
+
+
+def render(node: Node, mode: RenderMode = "default", width: int = 80) -> str:
+    """Render a tree.
+
+    - `default`: the same style the helpers produce;
+    - `compact`: the fewest bytes, for `filterByFormula` URLs: no optional whitespace, the
+      quote needing fewer escapes and numbers without a redundant `.0` or exponent padding;
+    - `pretty`: for reading, with calls longer than `width` split one argument per line.
+
+    All three parse back to the same tree, apart from the quote character in `compact`.
+    """
+    out: list[str] = []
+    if mode == "default":
+        _render(node, out)
+    elif mode == "compact":
+        _render(node, out, compact=True)
+    elif mode == "pretty":
+        _pretty(node, 0, width, out)
+    else:
+        raise ValueError(f"Unknown render mode {mode!r}")
+    return "".join(out)
+
+
+def compact(formula: "str | Node") -> str:
+    """The shortest rendering of a formula, e.g. `IF({A}, 1, 2)` -> `IF({A},1,2)`."""
+    return render(to_node(formula), "compact")
+
+
+def pretty(formula: "str | Node", width: int = 80) -> str:
+    """An indented, multi-line rendering of a formula for debugging."""
+    return render(to_node(formula), "pretty", width)
+
+
+def children(node: Node) -> tuple[Node, ...]:
+    if isinstance(node, Call):
+        return node.args
+    if isinstance(node, BinOp):
+        return (node.left, node.right)
+    if isinstance(node, Neg):
+        return (node.operand,)
+    if isinstance(node, Members):
+        return (node.target,)
+    return ()
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """Yield every node of the tree, parents before children."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(reversed(children(current)))
@@ -0,0 +1,232 @@
+"""Opt-in counters and timers for the formula helpers.
+
+    with instrumented() as metrics:
+        run_generator_job()
+    print(metrics.snapshot())
+
+While enabled, every public helper records its calls, the bytes of formula text it returned
+and the time it took; helper objects (`THEN`, `ELSE`, fields, date comparisons) count as nodes
+created; `_parse_date` is timed separately, since `dateparser` is usually what makes a job
+slow; and the hit rates of the evaluation and analysis caches are reported.
+
+Nothing is measured while disabled: `enable()` swaps wrappers onto the helper classes and the
+package's functions, and `disable()` puts the originals back. Class methods are wrapped for
+every caller, but `AND`, `OR`, `XOR`, `NOT`, `IF` and `id_equals` imported with
+`from airtableformulahelpers import ...` before enabling keep their unwrapped function; set
+`AIRTABLEFORMULAHELPERS_METRICS=1` to enable instrumentation as the package is imported.
+"""
+
+import functools
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import airtableformulahelpers as _package
+
+Snapshot = dict[str, Any]
+Exporter = Callable[[Snapshot], None]
+
+_FUNCTIONS = ("AND", "OR", "XOR", "NOT", "IF", "id_equals")
+_CLASSES = (
+    "THEN",
+    "ELSE",
+    "Field",
+    "TextField",
+    "TextListField",
+    "NumberField",
+    "BooleanField",
+    "AttachmentsField",
+    "DateComparison",
+    "DateField",
+)
+# lru_cache'd functions reported under "caches", by module; modules not yet imported are skipped.
+_CACHES = {
+    "airtableformulahelpers.evaluate": ("_compiled", "_parse_datetime_text", "_regex"),
+    "airtableformulahelpers.canonical": ("_cached",),
+    "airtableformulahelpers.dependencies": ("_scan",),
+}
+
+
+class Metrics:
+    """Counters collected while instrumentation is enabled."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.helpers: dict[str, list[float]] = {}  # name -> [calls, bytes, seconds]
+        self.nodes: dict[str, int] = {}
+        self.parse_date = [0, 0.0]
+        self._cache_base = _cache_counts()
+
+    def snapshot(self) -> Snapshot:
+        """A JSON-ready copy of the counters; cache figures count from the last reset."""
+        caches = {}
+        for name, (hits, misses) in _cache_counts().items():
+            base_hits, base_misses = self._cache_base.get(name, (0, 0))
+            hits, misses = hits - base_hits, misses - base_misses
+            total = hits + misses
+            caches[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / total if total else None,
+            }
+        return {
+            "helpers": {
+                name: {"calls": int(calls), "bytes": int(size), "seconds": seconds}
+                for name, (calls, size, seconds) in sorted(self.helpers.items())
+            },
+            "nodes": dict(sorted(self.nodes.items())),
+            "parse_date": {"calls": self.parse_date[0], "seconds": self.parse_date[1]},
+            "caches": caches,
+        }
+
+
+def _cache_counts() -> dict[str, tuple[int, int]]:
+    counts = {}
+    for module_name, names in _CACHES.items():
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        for name in names:
+            info = getattr(module, name).cache_info()
+            counts[f"{module_name.rsplit('.', 1)[1]}.{name}"] = (info.hits, info.misses)
+    return counts
+
+
+metrics = Metrics()
+_exporters: list[Exporter] = []
+_originals: list[tuple[Any, str, Any]] = []  # (owner, attribute, original) to restore
+
+
+def _helper(name: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        entry = metrics.helpers.get(name)
+        if entry is None:
+            entry = metrics.helpers[name] = [0, 0, 0.0]
+        entry[0] += 1
+        entry[2] += elapsed
+        if isinstance(result, str):
+            entry[1] += len(result.encode())
+        return result
+
+    return wrapper
+
+
+def _constructor(name: str, init: Callable) -> Callable:
+    @functools.wraps(init)
+    def wrapper(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        metrics.nodes[name] = metrics.nodes.get(name, 0) + 1
+
+    return wrapper
+
+
+def _timed_parse_date(func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(date):
+        start = time.perf_counter()
+        try:
+            return func(date)
+        finally:
+            metrics.parse_date[0] += 1
+            metrics.parse_date[1] += time.perf_counter() - start
+
+    return wrapper
+
+
+_INHERITED = object()
+
+
+def _patch(owner: Any, attribute: str, replacement: Any) -> None:
+    _originals.append((owner, attribute, owner.__dict__.get(attribute, _INHERITED)))
+    setattr(owner, attribute, replacement)
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def enable() -> Metrics:
+    """Start recording into `metrics`, from zero. Enabling twice is a no-op."""
+    if is_enabled():
+        return metrics
+    metrics.reset()
+    package_modules = [
+        module
+        for name, module in list(sys.modules.items())
+        if name == _package.__name__ or name.startswith(_package.__name__ + ".")
+    ]
+    for name in _FUNCTIONS:
+        original = getattr(_package, name)
+        wrapper = _helper(name, original)
+        # Rebind the package's own modules too, e.g. `spec` and `synthetic`.
+        for module in package_modules:
+            if module.__dict__.get(name) is original:
+                _patch(module, name, wrapper)
+    _patch(_package, "_parse_date", _timed_parse_date(_package._parse_date))
+    # Look every constructor up before patching any, so a subclass does not wrap its parent's
+    # wrapper and count each node twice.
+    classes = {name: getattr(_package, name) for name in _CLASSES}
+    inits = {name: cls.__init__ for name, cls in classes.items()}
+    for class_name, cls in classes.items():
+        _patch(cls, "__init__", _constructor(class_name, inits[class_name]))
+        for attribute, value in list(vars(cls).items()):
+            if callable(value) and not attribute.startswith("_"):
+                _patch(cls, attribute, _helper(f"{class_name}.{attribute}", value))
+    return metrics
+
+
+def disable() -> None:
+    """Restore the unwrapped helpers; the counters are kept for `snapshot()`."""
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        if original is _INHERITED:
+            delattr(owner, attribute)
+        else:
+            setattr(owner, attribute, original)
+
+
+def snapshot() -> Snapshot:
+    return metrics.snapshot()
+
+
+def add_exporter(exporter: Exporter) -> Exporter:
+    """Register a callback that `export()` hands each snapshot to, e.g. a statsd client."""
+    _exporters.append(exporter)
+    return exporter
+
+
+def remove_exporter(exporter: Exporter) -> None:
+    _exporters.remove(exporter)
+
+
+def export() -> Snapshot:
+    """Send a snapshot to every registered exporter and return it."""
+    data = metrics.snapshot()
+    for exporter in _exporters:
+        exporter(data)
+    return data
+
+
+@contextmanager
+def instrumented(export_on_exit: bool = True) -> Iterator[Metrics]:
+    """Record for the duration of the block, then export the snapshot and disable.
+
+    If instrumentation was already enabled, it is left enabled and its counters are not reset.
+    """
+    was_enabled = is_enabled()
+    enable()
+    try:
+        yield metrics
+    finally:
+        if not was_enabled:
+            disable()
+        if export_on_exit:
+            export()
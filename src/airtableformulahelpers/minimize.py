@@ -0,0 +1,294 @@
+"""Boolean minimization of AND/OR/NOT condition trees.
+
+Every leaf condition (`TextField.equals`, `NumberField.greater_than`, ...) is treated as an atom.
+`{x}!=v` is read as the negation of `{x}=v` so the two can cancel out.
+"""
+
+from collections import Counter
+
+from .formula import BinOp, Call, Node, render, to_node
+
+Literal_ = tuple[int, bool]
+Cube = frozenset[Literal_]
+
+# ("lit", index, positive) | ("const", value) | ("and", [exprs]) | ("or", [exprs])
+Expr = tuple[str, int, bool] | tuple[str, bool] | tuple[str, list]
+
+TRUE: Expr = ("const", True)
+FALSE: Expr = ("const", False)
+
+
+class _Atoms:
+    def __init__(self) -> None:
+        self.nodes: list[Node] = []
+        self.index: dict[str, int] = {}
+
+    def add(self, node: Node) -> int:
+        key = render(node)
+        found = self.index.get(key)
+        if found is None:
+            found = self.index[key] = len(self.nodes)
+            self.nodes.append(node)
+        return found
+
+
+def _simplify_inside(node: Node, max_atoms: int, max_terms: int) -> Node:
+    """Minimize the boolean arguments of an atom, e.g. the condition of an IF."""
+    if not isinstance(node, Call):
+        return node
+    if node.name == "IF" and node.args:
+        condition = _minimize(node.args[0], max_atoms, max_terms)
+        return Call(node.name, (condition, *node.args[1:]))
+    if node.name == "XOR":
+        return Call(node.name, tuple(_minimize(arg, max_atoms, max_terms) for arg in node.args))
+    return node
+
+
+def _nnf(node: Node, negate: bool, atoms: _Atoms, max_atoms: int, max_terms: int) -> Expr:
+    if isinstance(node, Call):
+        if node.name in ("AND", "OR"):
+            op = node.name.lower()
+            if negate:
+                op = "or" if op == "and" else "and"
+            if not node.args:
+                return ("const", (op == "and"))
+            return (op, [_nnf(arg, negate, atoms, max_atoms, max_terms) for arg in node.args])
+        if node.name == "NOT" and len(node.args) == 1:
+            return _nnf(node.args[0], not negate, atoms, max_atoms, max_terms)
+        if node.name in ("TRUE", "FALSE") and not node.args:
+            return ("const", (node.name == "TRUE") != negate)
+    if isinstance(node, BinOp) and node.op == "!=":
+        return ("lit", atoms.add(BinOp("=", node.left, node.right)), negate)
+    return ("lit", atoms.add(_simplify_inside(node, max_atoms, max_terms)), not negate)
+
+
+def _absorb(cubes: set[Cube]) -> set[Cube]:
+    kept: list[Cube] = []
+    for cube in sorted(cubes, key=len):
+        if not any(k <= cube for k in kept):
+            kept.append(cube)
+    return set(kept)
+
+
+def _contradictory(cube: Cube) -> bool:
+    return any((var, not positive) in cube for var, positive in cube)
+
+
+def _dnf(expr: Expr, max_terms: int) -> set[Cube] | None:
+    """Sum-of-products form, or None when it would exceed `max_terms` cubes."""
+    kind = expr[0]
+    if kind == "lit":
+        return {frozenset(((expr[1], expr[2]),))}  # type: ignore[misc]
+    if kind == "const":
+        return {frozenset()} if expr[1] else set()
+    parts = []
+    for child in expr[1]:  # type: ignore[union-attr]
+        part = _dnf(child, max_terms)
+        if part is None:
+            return None
+        parts.append(part)
+    if kind == "or":
+        result: set[Cube] = set().union(*parts)
+    else:
+        result = {frozenset()}
+        for part in parts:
+            result = {a | b for a in result for b in part}
+            result = _absorb({cube for cube in result if not _contradictory(cube)})
+            if len(result) > max_terms:
+                return None
+    result = _absorb(result)
+    return result if len(result) <= max_terms else None
+
+
+def _consensus(a: Cube, b: Cube) -> Cube | None:
+    opposed = [var for var, positive in a if (var, not positive) in b]
+    if len(opposed) != 1:
+        return None
+    var = opposed[0]
+    return (a | b) - {(var, True), (var, False)}
+
+
+def _reduce(cubes: set[Cube], complete: bool, max_terms: int) -> set[Cube]:
+    """Iterated consensus with absorption.
+
+    With `complete` every consensus term is added, yielding all prime implicants (Blake canonical
+    form). Otherwise only consensus terms that absorb an existing cube are kept, so the cover never
+    grows.
+    """
+    cubes = _absorb(cubes)
+    changed = True
+    while changed:
+        changed = False
+        ordered = sorted(cubes, key=_cube_key)
+        for i, a in enumerate(ordered):
+            for b in ordered[i + 1 :]:
+                term = _consensus(a, b)
+                if term is None or any(k <= term for k in cubes):
+                    continue
+                absorbed = {k for k in cubes if term <= k}
+                if not complete and not absorbed:
+                    continue
+                if complete and len(cubes) - len(absorbed) + 1 > max_terms:
+                    return cubes
+                cubes = (cubes - absorbed) | {term}
+                changed = True
+                break
+            if changed:
+                break
+    return cubes
+
+
+def _covers(cube: Cube, minterm: int) -> bool:
+    return all(bool(minterm >> var & 1) == positive for var, positive in cube)
+
+
+def _select_cover(primes: set[Cube], variables: list[int]) -> set[Cube]:
+    """Quine–McCluskey style prime implicant chart: essential primes first, then greedy."""
+    remap = {var: bit for bit, var in enumerate(variables)}
+    local = {prime: frozenset((remap[v], p) for v, p in prime) for prime in primes}
+    coverage = {
+        prime: {m for m in range(1 << len(variables)) if _covers(cube, m)}
+        for prime, cube in local.items()
+    }
+    uncovered: set[int] = set().union(*coverage.values()) if coverage else set()
+    chosen: set[Cube] = set()
+    owners: dict[int, list[Cube]] = {}
+    for prime, minterms in coverage.items():
+        for minterm in minterms:
+            owners.setdefault(minterm, []).append(prime)
+    for minterm, candidates in owners.items():
+        if len(candidates) == 1:
+            chosen.add(candidates[0])
+    for prime in chosen:
+        uncovered -= coverage[prime]
+    remaining = sorted(primes - chosen, key=_cube_key)
+    while uncovered:
+        best = max(remaining, key=lambda p: (len(coverage[p] & uncovered), -len(p)))
+        chosen.add(best)
+        remaining.remove(best)
+        uncovered -= coverage[best]
+    return chosen
+
+
+def _cube_key(cube: Cube) -> tuple:
+    return (len(cube), sorted((var, not positive) for var, positive in cube))
+
+
+def _literal(literal: Literal_) -> Expr:
+    return ("lit", literal[0], literal[1])
+
+
+def _factor(cubes: set[Cube]) -> Expr:
+    """Pull shared literals out of a sum of products: OR(AND(a,b),AND(a,c)) -> AND(a,OR(b,c))."""
+    if not cubes:
+        return FALSE
+    if frozenset() in cubes:
+        return TRUE
+    if len(cubes) == 1:
+        (cube,) = cubes
+        return ("and", [_literal(lit) for lit in sorted(cube, key=lambda x: (x[0], not x[1]))])
+    common = frozenset.intersection(*cubes)
+    if common:
+        rest = _factor({cube - common for cube in cubes})
+        literals = [_literal(lit) for lit in sorted(common, key=lambda x: (x[0], not x[1]))]
+        return ("and", literals + ([] if rest == TRUE else [rest]))
+    counts = Counter(lit for cube in cubes for lit in cube)
+    literal, count = min(counts.items(), key=lambda item: (-item[1], item[0][0], not item[0][1]))
+    if count < 2:
+        return ("or", [_factor({cube}) for cube in sorted(cubes, key=_cube_key)])
+    with_literal = {cube for cube in cubes if literal in cube}
+    without = cubes - with_literal
+    return ("or", [_factor(with_literal), _factor(without)])
+
+
+def _key(expr: Expr) -> tuple:
+    if expr[0] in ("and", "or"):
+        return (expr[0], tuple(sorted(_key(child) for child in expr[1])))  # type: ignore[union-attr]
+    return expr
+
+
+def _algebraic(expr: Expr) -> Expr:
+    """Flatten, deduplicate, fold constants, cancel complements and apply absorption."""
+    kind = expr[0]
+    if kind not in ("and", "or"):
+        return expr
+    identity, annihilator = (TRUE, FALSE) if kind == "and" else (FALSE, TRUE)
+    flat: list[Expr] = []
+    for child in expr[1]:  # type: ignore[union-attr]
+        child = _algebraic(child)
+        if child[0] == kind:
+            flat.extend(child[1])  # type: ignore[arg-type]
+        else:
+            flat.append(child)
+    unique: dict[tuple, Expr] = {}
+    for child in flat:
+        if child == annihilator:
+            return annihilator
+        if child != identity:
+            unique.setdefault(_key(child), child)
+    literals = {(c[1], c[2]) for c in unique.values() if c[0] == "lit"}
+    if any((var, not positive) in literals for var, positive in literals):
+        return annihilator
+    keys = set(unique)
+    dual = "or" if kind == "and" else "and"
+    result = []
+    for child in unique.values():
+        # a OR AND(a, b) -> a ; a AND OR(a, b) -> a
+        if child[0] == dual and any(_key(grand) in keys for grand in child[1]):  # type: ignore[union-attr]
+            continue
+        result.append(child)
+    if not result:
+        return identity
+    if len(result) == 1:
+        return result[0]
+    return (kind, result)
+
+
+def _to_node(expr: Expr, atoms: _Atoms) -> Node:
+    kind = expr[0]
+    if kind == "const":
+        return Call("TRUE" if expr[1] else "FALSE")
+    if kind == "lit":
+        atom = atoms.nodes[expr[1]]  # type: ignore[index]
+        if expr[2]:
+            return atom
+        if isinstance(atom, BinOp) and atom.op == "=":
+            return BinOp("!=", atom.left, atom.right)
+        return Call("NOT", (atom,))
+    args: list[Node] = []
+    for child in expr[1]:  # type: ignore[union-attr]
+        node = _to_node(child, atoms)
+        if isinstance(node, Call) and node.name == kind.upper():
+            args.extend(node.args)
+        else:
+            args.append(node)
+    if len(args) == 1:
+        return args[0]
+    return Call(kind.upper(), tuple(args))
+
+
+def _minimize(node: Node, max_atoms: int, max_terms: int) -> Node:
+    atoms = _Atoms()
+    expr = _nnf(node, False, atoms, max_atoms, max_terms)
+    candidates = [node, _to_node(_algebraic(expr), atoms)]
+    cubes = _dnf(expr, max_terms)
+    if cubes is not None:
+        variables = sorted({var for cube in cubes for var, _ in cube})
+        if len(variables) <= max_atoms:
+            primes = _reduce(cubes, complete=True, max_terms=max_terms)
+            cubes = _select_cover(primes, variables)
+        else:
+            cubes = _reduce(cubes, complete=False, max_terms=max_terms)
+        candidates.append(_to_node(_algebraic(_factor(cubes)), atoms))
+    return min(candidates, key=lambda candidate: len(render(candidate)))
+
+
+def minimize(formula: str | Node, max_atoms: int = 12, max_terms: int = 256) -> str:
+    """Remove logically redundant structure from a condition.
+
+    Applies double negation, absorption and consensus, then picks a minimal prime implicant cover
+    when the condition has at most `max_atoms` distinct atoms. Conditions whose sum-of-products form
+    would exceed `max_terms` terms fall back to the algebraic rules only. The result is never longer
+    than the input.
+    """
+    return render(_minimize(to_node(formula), max_atoms, max_terms))
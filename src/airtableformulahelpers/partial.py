@@ -0,0 +1,167 @@
+"""Partial evaluation: specialize a formula for fields whose values are already known."""
+
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+
+from .evaluate import EvaluationError, evaluate, is_truthy
+from .formula import BinOp, Call, FieldRef, Members, Neg, Node, Num, Str, render, to_node
+
+_VOLATILE = frozenset(("NOW", "TODAY", "RECORD_ID"))
+_CONSTANT_CALLS = frozenset(("TRUE", "FALSE", "BLANK"))
+
+
+def _literal(value: Any) -> Node | None:
+    """A node that evaluates to `value`, or None when a formula cannot spell it."""
+    if value is None:
+        return Call("BLANK")
+    if isinstance(value, bool):
+        return Call("TRUE" if value else "FALSE")
+    if isinstance(value, (int, float)):
+        return Num(value)
+    if isinstance(value, str):
+        return Str(value)
+    if isinstance(value, datetime):
+        return Call("DATETIME_PARSE", (Str(value.strftime("%Y-%m-%d %H:%M:%S"), "'"),))
+    return None
+
+
+class _Specializer:
+    def __init__(self, known: Mapping[str, Any]):
+        self.known = known
+
+    def is_constant(self, node: Node) -> bool:
+        if isinstance(node, (Str, Num)):
+            return True
+        if isinstance(node, FieldRef):
+            return node.name in self.known
+        if isinstance(node, Call):
+            return (
+                node.name in _CONSTANT_CALLS
+                and not node.args
+                or (
+                    node.name == "DATETIME_PARSE"
+                    and len(node.args) == 1
+                    and isinstance(node.args[0], Str)
+                )
+            )
+        return False
+
+    def value(self, node: Node) -> Any:
+        return evaluate(node, self.known)
+
+    def truth(self, node: Node) -> bool:
+        return is_truthy(self.value(node))
+
+    def constant(self, node: Node, boolean: bool) -> Node:
+        """Replace a fully known node by its value, keeping it when the value has no literal
+        or the local evaluator cannot compute it.
+        """
+        try:
+            value = self.value(node)
+        except EvaluationError:
+            return node
+        if boolean:
+            return Call("TRUE" if is_truthy(value) else "FALSE")
+        literal = _literal(value)
+        return node if literal is None else literal
+
+    def fold(self, node: Node, boolean: bool = False) -> Node:
+        if isinstance(node, FieldRef):
+            if node.name not in self.known:
+                return node
+            literal = _literal(self.known[node.name])
+            return node if literal is None else literal
+        if isinstance(node, Call):
+            if node.name in ("AND", "OR"):
+                return self.fold_junction(node, boolean)
+            if node.name == "IF" and len(node.args) in (2, 3):
+                return self.fold_if(node, boolean)
+            if node.name == "NOT" and len(node.args) == 1:
+                operand = self.fold(node.args[0], boolean=True)
+                if self.is_constant(operand):
+                    return Call("FALSE" if self.truth(operand) else "TRUE")
+                return Call("NOT", (operand,))
+            if node.name == "XOR":
+                return self.fold_xor(node, boolean)
+            args = tuple(self.fold(arg) for arg in node.args)
+            rebuilt = Call(node.name, args)
+            if node.name in _VOLATILE or not all(self.is_constant(arg) for arg in args):
+                return rebuilt
+            if self.is_constant(rebuilt):
+                return rebuilt
+            return self.constant(rebuilt, boolean)
+        if isinstance(node, BinOp):
+            left, right = self.fold(node.left), self.fold(node.right)
+            rebuilt = BinOp(node.op, left, right)
+            if self.is_constant(left) and self.is_constant(right):
+                return self.constant(rebuilt, boolean)
+            return rebuilt
+        if isinstance(node, Neg):
+            operand = self.fold(node.operand)
+            if self.is_constant(operand):
+                return self.constant(Neg(operand), boolean)
+            return Neg(operand)
+        if isinstance(node, Members):
+            members = Members(self.fold(node.target), node.values, node.quote)
+            if self.is_constant(members.target):
+                return self.constant(members, boolean)
+            return members
+        return node
+
+    def fold_junction(self, node: Call, boolean: bool) -> Node:
+        is_and = node.name == "AND"
+        remaining: list[Node] = []
+        for arg in node.args:
+            folded = self.fold(arg, boolean=True)
+            if self.is_constant(folded):
+                if self.truth(folded) != is_and:
+                    return Call("FALSE" if is_and else "TRUE")
+                continue
+            if isinstance(folded, Call) and folded.name == node.name:
+                remaining.extend(folded.args)
+            else:
+                remaining.append(folded)
+        if not remaining:
+            return Call("TRUE" if is_and else "FALSE")
+        if len(remaining) == 1 and boolean:
+            return remaining[0]
+        return Call(node.name, tuple(remaining))
+
+    def fold_if(self, node: Call, boolean: bool) -> Node:
+        condition = self.fold(node.args[0], boolean=True)
+        if self.is_constant(condition):
+            if self.truth(condition):
+                return self.fold(node.args[1], boolean)
+            if len(node.args) == 3:
+                return self.fold(node.args[2], boolean)
+            return Call("BLANK")
+        branches = tuple(self.fold(arg, boolean) for arg in node.args[1:])
+        return Call("IF", (condition, *branches))
+
+    def fold_xor(self, node: Call, boolean: bool) -> Node:
+        parity = False
+        remaining: list[Node] = []
+        for arg in node.args:
+            folded = self.fold(arg, boolean=True)
+            if self.is_constant(folded):
+                parity ^= self.truth(folded)
+            else:
+                remaining.append(folded)
+        if not remaining:
+            return Call("TRUE" if parity else "FALSE")
+        result: Node = (
+            remaining[0] if len(remaining) == 1 and boolean else Call("XOR", tuple(remaining))
+        )
+        return Call("NOT", (result,)) if parity else result
+
+
+def specialize(formula: str | Node, known: Mapping[str, Any]) -> str:
+    """Fold the conditions decided by `known` field values and return the residual formula.
+
+    `known` maps field names to values, e.g. `{"Region": "EU"}` for a per-tenant formula.
+    Decided conditions collapse to `TRUE()`/`FALSE()` and the surrounding `AND`/`OR`/`IF`/`XOR`
+    is simplified; conditions on other fields are kept. The result is meant to be computed once
+    per tenant and reused.
+    """
+    return render(_Specializer(known).fold(to_node(formula), boolean=True))
@@ -0,0 +1,257 @@
+"""Rate-limit-aware scheduling of formula queries.
+
+Each base gets a token bucket (Airtable allows about 5 requests per second per base) and
+priority lanes. A 429 halves the base's rate and pauses it before the query is retried;
+every success creeps the rate back up. Identical queries already in flight, compared by
+canonical fingerprint, share one request.
+
+A paginated scheduler fetches each query page by page and takes a token for every page, so a
+query spanning ten pages costs ten requests against the limit, as it does on the server.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from .canonical import fingerprint
+from .formula import Node
+
+Execute = Callable[[str, str, str | Node], Awaitable[Any]]
+# (base, table, formula, offset) -> a list response page, with `records` and maybe `offset`.
+FetchPage = Callable[[str, str, str | Node, str | None], Awaitable[Mapping[str, Any]]]
+Priority = Literal["high", "normal", "low"]
+
+PRIORITIES: dict[str, int] = {"high": 0, "normal": 1, "low": 2}
+
+
+class RateLimitedError(Exception):
+    """Raised by an executor when the API answers 429 Too Many Requests."""
+
+    def __init__(self, retry_after: float | None = None):
+        super().__init__(f"Rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """A token bucket whose rate adapts: halved on 429, increased additively on success."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        min_rate: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.capacity = capacity if capacity is not None else rate
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available, taking the token when it already is."""
+        now = self.clock()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, pause: float) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+        self.paused_until = max(self.paused_until, self.clock() + pause)
+
+    def reward(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    sequence: int
+    base: str = field(compare=False)
+    table: str = field(compare=False)
+    formula: str | Node = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+    # Progress of a paginated query, kept so a rate-limited page resumes where it stopped.
+    offset: str | None = field(default=None, compare=False)
+    records: list[Any] = field(default_factory=list, compare=False)
+
+
+class _Lane:
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.heap: list[_Job] = []
+        self.ready = asyncio.Condition()
+        self.workers: list[asyncio.Task] = []
+
+    async def push(self, job: _Job) -> None:
+        async with self.ready:
+            heapq.heappush(self.heap, job)
+            self.ready.notify()
+
+    async def pop(self) -> _Job:
+        async with self.ready:
+            await self.ready.wait_for(lambda: bool(self.heap))
+            return heapq.heappop(self.heap)
+
+
+@dataclass
+class SchedulerStats:
+    submitted: int = 0
+    executed: int = 0
+    coalesced: int = 0
+    rate_limited: int = 0
+
+
+class Scheduler:
+    """Runs queries through `execute(base, table, formula)` within each base's rate limit.
+
+    With `paginated=True`, `execute` is a `FetchPage` called once per page with the offset
+    of the previous page, and a query's result is the list of records of all its pages.
+    """
+
+    def __init__(
+        self,
+        execute: Execute | FetchPage,
+        rate: float = 5.0,
+        burst: float | None = None,
+        max_in_flight: int = 4,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        paginated: bool = False,
+    ):
+        self.execute: Callable[..., Awaitable[Any]] = execute
+        self.paginated = paginated
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = SchedulerStats()
+        self._lanes: dict[str, _Lane] = {}
+        self._in_flight: dict[tuple[str, str, str], asyncio.Future] = {}
+        self._sequence = itertools.count()
+
+    def bucket(self, base: str) -> TokenBucket:
+        return self._lane(base).bucket
+
+    async def submit(
+        self, base: str, table: str, formula: str | Node, priority: Priority = "normal"
+    ) -> Any:
+        """Queue a query and wait for its result, sharing it with identical queries in flight."""
+        self.stats.submitted += 1
+        key = (base, table, fingerprint(formula))
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        job = _Job(PRIORITIES[priority], next(self._sequence), base, table, formula, future)
+        await self._lane(base).push(job)
+        return await asyncio.shield(future)
+
+    async def aclose(self) -> None:
+        tasks = [task for lane in self._lanes.values() for task in lane.workers]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._lanes.clear()
+
+    async def __aenter__(self) -> "Scheduler":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    def _lane(self, base: str) -> _Lane:
+        lane = self._lanes.get(base)
+        if lane is None:
+            lane = self._lanes[base] = _Lane(TokenBucket(self.rate, self.burst))
+            lane.workers = [
+                asyncio.get_running_loop().create_task(self._work(lane))
+                for _ in range(self.max_in_flight)
+            ]
+        return lane
+
+    async def _work(self, lane: _Lane) -> None:
+        while True:
+            job = await lane.pop()
+            try:
+                result = await self._run(lane, job)
+            except RateLimitedError as error:
+                self.stats.rate_limited += 1
+                job.attempts += 1
+                if job.attempts > self.max_retries:
+                    job.future.set_exception(error)
+                    continue
+                pause = error.retry_after
+                if pause is None:
+                    pause = min(self.max_backoff, self.backoff * 2 ** (job.attempts - 1))
+                lane.bucket.penalize(pause)
+                await lane.push(job)
+            except Exception as error:  # noqa: BLE001 - handed to the waiting callers
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    async def _run(self, lane: _Lane, job: _Job) -> Any:
+        """Execute a job, taking a token for every request it makes."""
+        if not self.paginated:
+            await lane.bucket.acquire()
+            self.stats.executed += 1
+            result = await self.execute(job.base, job.table, job.formula)
+            lane.bucket.reward()
+            return result
+        while True:
+            await lane.bucket.acquire()
+            self.stats.executed += 1
+            page = await self.execute(job.base, job.table, job.formula, job.offset)
+            lane.bucket.reward()
+            job.records.extend(page.get("records", []))
+            job.offset = page.get("offset")
+            if not job.offset:
+                return job.records
+
+
+def client_executor(clients: Mapping[str, Any]) -> FetchPage:
+    """A page fetcher over `client.AsyncClient` instances keyed by base id, for a scheduler
+    with `paginated=True`; 429 becomes `RateLimitedError`.
+    """
+    import httpx
+
+    async def fetch_page(
+        base: str, table: str, formula: str | Node, offset: str | None
+    ) -> Mapping[str, Any]:
+        try:
+            return await clients[base].fetch_page(table, formula, offset)
+        except httpx.HTTPStatusError as error:
+            if error.response.status_code != 429:
+                raise
+            retry_after = error.response.headers.get("Retry-After")
+            raise RateLimitedError(float(retry_after) if retry_after else None) from error
+
+    return fetch_page
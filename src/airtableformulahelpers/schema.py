@@ -0,0 +1,167 @@
+"""Field objects typed from an Airtable base schema.
+
+Load the JSON returned by the metadata API (`GET /v0/meta/bases/{baseId}/tables`), saved to a
+file, and look fields up by name or id::
+
+    schema = load_schema("schema.json")
+    jobs = schema["Jobs"]
+    jobs["Due Date"].is_before().days_ago(7)
+
+Field objects are only built on first access and then reused, so a schema with thousands of
+fields costs a dict of names until fields are actually used.
+"""
+
+import json
+import os
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any, TypeVar
+
+from . import (
+    AttachmentsField,
+    BooleanField,
+    DateField,
+    Field,
+    NumberField,
+    TextField,
+    TextListField,
+)
+
+F = TypeVar("F", bound=Field)
+
+# Airtable field types by the helper class that builds formulas for them. Types not listed,
+# such as collaborators and buttons, are treated as text.
+FIELD_TYPES: dict[str, type[Field]] = {
+    **dict.fromkeys(
+        ("number", "currency", "percent", "duration", "rating", "autoNumber", "count"),
+        NumberField,
+    ),
+    **dict.fromkeys(("date", "dateTime", "createdTime", "lastModifiedTime"), DateField),
+    **dict.fromkeys(
+        (
+            "multipleSelects",
+            "multipleRecordLinks",
+            "multipleLookupValues",
+            "multipleCollaborators",
+        ),
+        TextListField,
+    ),
+    "checkbox": BooleanField,
+    "multipleAttachments": AttachmentsField,
+}
+
+
+class UnknownFieldError(KeyError):
+    """Raised when a schema has no field or table by the given name or id."""
+
+
+def field_class(spec: Mapping[str, Any]) -> type[Field]:
+    """The helper class for a schema field; computed fields use their result type."""
+    kind = spec.get("type")
+    if kind in ("formula", "rollup", "lookup"):
+        result = (spec.get("options") or {}).get("result")
+        if isinstance(result, Mapping):
+            return field_class(result)
+    return FIELD_TYPES.get(kind, TextField)
+
+
+class TableSchema:
+    """One table's fields, looked up by name or field id."""
+
+    def __init__(self, spec: Mapping[str, Any]):
+        self.id: str = spec.get("id", "")
+        self.name: str = spec["name"]
+        self.primary_field_id: str | None = spec.get("primaryFieldId")
+        self._specs: dict[str, Mapping[str, Any]] = {}
+        self._names: dict[str, str] = {}
+        for field in spec.get("fields", ()):
+            self._specs[field["name"]] = field
+            self._names[field["name"]] = field["name"]
+            if "id" in field:
+                self._names[field["id"]] = field["name"]
+        self._fields: dict[str, Field] = {}
+
+    def __repr__(self) -> str:
+        return f"TableSchema({self.name!r}, {len(self)} fields)"
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._names
+
+    def __getitem__(self, key: str) -> Field:
+        return self.field(key)
+
+    def name_of(self, key: str) -> str:
+        try:
+            return self._names[key]
+        except KeyError:
+            raise UnknownFieldError(f"Table {self.name!r} has no field {key!r}") from None
+
+    def spec(self, key: str) -> Mapping[str, Any]:
+        return self._specs[self.name_of(key)]
+
+    def field(self, key: str, expected: type[F] = Field) -> F:
+        """The field object for a field name or id, checked to be an `expected` instance.
+
+        `table.field("Due", DateField)` raises `TypeError` if "Due" is not a date field, before
+        a formula comparing it as one is ever sent.
+        """
+        name = self.name_of(key)
+        field = self._fields.get(name)
+        if field is None:
+            field = self._fields[name] = field_class(self._specs[name])(name=name)
+        if not isinstance(field, expected):
+            raise TypeError(
+                f"{self.name}.{name} is a {type(field).__name__}, not a {expected.__name__}"
+            )
+        return field
+
+    @property
+    def primary_field(self) -> Field | None:
+        return self.field(self.primary_field_id) if self.primary_field_id else None
+
+
+class BaseSchema:
+    """The tables of a base, looked up by name or table id and parsed on first access."""
+
+    def __init__(self, spec: Mapping[str, Any]):
+        self._specs: dict[str, Mapping[str, Any]] = {}
+        self._names: dict[str, str] = {}
+        for table in spec.get("tables", ()):
+            self._specs[table["name"]] = table
+            self._names[table["name"]] = table["name"]
+            if "id" in table:
+                self._names[table["id"]] = table["name"]
+        self._tables: dict[str, TableSchema] = {}
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._names
+
+    def __getitem__(self, key: str) -> TableSchema:
+        return self.table(key)
+
+    def table(self, key: str) -> TableSchema:
+        try:
+            name = self._names[key]
+        except KeyError:
+            raise UnknownFieldError(f"The base has no table {key!r}") from None
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = TableSchema(self._specs[name])
+        return table
+
+
+def load_schema(path: str | os.PathLike) -> BaseSchema:
+    """Read a base schema saved from the metadata API."""
+    return BaseSchema(json.loads(Path(path).read_text()))
@@ -0,0 +1,441 @@
+"""A columnar, memory-mapped snapshot of a table for local evaluation.
+
+A snapshot is a directory holding `manifest.json` and a few files per field:
+
+- `number` columns are float64 values, NaN meaning empty;
+- `bool` columns are int8 values, -1 meaning empty;
+- `date` columns are int64 epoch milliseconds, the smallest int64 meaning empty;
+- `text` and `json` columns are int32 indexes (-1 meaning empty) into a string pool of UTF-8
+  bytes plus int64 offsets, so repeated values such as single selects are stored once.
+
+Readers map the files and cast them to typed `memoryview`s; nothing is decoded until a value is
+read. Appends only ever grow the files and rewrite the manifest last, so a reader that opened
+the previous manifest is unaffected and an interrupted append is discarded by the next one.
+Rows appended for an existing record id supersede the earlier row.
+"""
+
+import json
+import math
+import mmap
+import os
+import re
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from .evaluate import Row, compile_formula, is_truthy
+from .formula import Node
+
+Record = Mapping[str, Any]
+
+FORMAT = 1
+MANIFEST = "manifest.json"
+COLUMN_TYPES = ("number", "bool", "date", "text", "json")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NO_DATE = -(2**63)
+_CODES = {"number": "d", "bool": "b", "date": "q", "text": "i", "json": "i"}
+_POOLED = ("text", "json")
+_COLUMN_FILE = re.compile(r"c\d+\.(data|pool|offsets)")
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:\d{2})?)?")
+
+
+class SnapshotError(ValueError):
+    """Raised for a malformed snapshot or a value that does not fit its column's type."""
+
+
+def infer_type(values: Iterable[Any]) -> str:
+    """The narrowest column type holding every non-empty value."""
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            kinds.add("bool")
+        elif isinstance(value, (int, float)):
+            kinds.add("number")
+        elif isinstance(value, str):
+            kinds.add("date" if _ISO_DATE.fullmatch(value) else "text")
+        else:
+            kinds.add("json")
+    if kinds == {"date", "text"}:
+        return "text"
+    return kinds.pop() if len(kinds) == 1 else ("json" if kinds else "text")
+
+
+def _to_epoch_ms(value: Any) -> int:
+    if isinstance(value, str) and _ISO_DATE.fullmatch(value):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if not isinstance(value, datetime):
+        raise TypeError(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(milliseconds=1)
+
+
+def _column_file(directory: Path, index: int, suffix: str) -> Path:
+    return directory / f"c{index}.{suffix}"
+
+
+class _PoolWriter:
+    """Interns strings into a column's pool, appending new ones to its files."""
+
+    def __init__(self, directory: Path, index: int, size: int):
+        self.data_path = _column_file(directory, index, "pool")
+        self.offsets_path = _column_file(directory, index, "offsets")
+        self.ids: dict[str, int] = {}
+        self.offsets = array("q", [0])
+        if size:
+            self.offsets = array("q")
+            with open(self.offsets_path, "rb") as f:
+                self.offsets.fromfile(f, size + 1)
+            with open(self.data_path, "rb") as f:
+                data = f.read(self.offsets[-1])
+            for i in range(size):
+                self.ids[data[self.offsets[i] : self.offsets[i + 1]].decode()] = i
+        self.written = len(self.offsets)
+        self.new = bytearray()
+
+    def intern(self, text: str) -> int:
+        index = self.ids.get(text)
+        if index is None:
+            index = self.ids[text] = len(self.ids)
+            encoded = text.encode()
+            self.new += encoded
+            self.offsets.append(self.offsets[-1] + len(encoded))
+        return index
+
+    def flush(self) -> int:
+        committed = self.written
+        if committed == 1:
+            _append(self.offsets_path, self.offsets.tobytes(), 0)
+        else:
+            _append(self.offsets_path, self.offsets[committed:].tobytes(), committed * 8)
+        _append(self.data_path, bytes(self.new), self.offsets[committed - 1])
+        return len(self.offsets) - 1
+
+
+def _append(path: Path, data: bytes, keep: int) -> None:
+    """Cut `path` back to its `keep` committed bytes, then append `data`."""
+    with open(path, "ab") as f:
+        f.truncate(keep)
+        f.write(data)
+
+
+class _ColumnWriter:
+    def __init__(self, directory: Path, index: int, name: str, type: str, pool_size: int = 0):
+        if type not in COLUMN_TYPES:
+            raise SnapshotError(f"Unknown column type {type!r} for field {name!r}")
+        self.path = _column_file(directory, index, "data")
+        self.name = name
+        self.type = type
+        self.values = array(_CODES[type])
+        self.pool = _PoolWriter(directory, index, pool_size) if type in _POOLED else None
+
+    def add(self, value: Any) -> None:
+        try:
+            self.values.append(self.encode(value))
+        except (TypeError, ValueError, OverflowError) as error:
+            raise SnapshotError(
+                f"Field {self.name!r} has a {self.type} column but got {value!r}"
+            ) from error
+
+    def encode(self, value: Any) -> Any:
+        kind = self.type
+        if kind == "number":
+            if value is None:
+                return math.nan
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise TypeError(value)
+            return value
+        if kind == "bool":
+            if value is None:
+                return -1
+            if not isinstance(value, bool):
+                raise TypeError(value)
+            return int(value)
+        if kind == "date":
+            return _NO_DATE if value is None else _to_epoch_ms(value)
+        if value is None:
+            return -1
+        assert self.pool is not None
+        if kind == "text":
+            if not isinstance(value, str):
+                raise TypeError(value)
+            return self.pool.intern(value)
+        return self.pool.intern(json.dumps(value, separators=(",", ":")))
+
+    def flush(self, rows: int) -> dict[str, Any]:
+        _append(self.path, self.values.tobytes(), rows * self.values.itemsize)
+        column: dict[str, Any] = {"name": self.name, "type": self.type}
+        if self.pool is not None:
+            column["pool_size"] = self.pool.flush()
+        return column
+
+
+def _read_manifest(directory: Path) -> dict[str, Any]:
+    try:
+        manifest = json.loads((directory / MANIFEST).read_text())
+    except FileNotFoundError:
+        raise SnapshotError(f"No snapshot at {directory}") from None
+    if manifest.get("format") != FORMAT:
+        raise SnapshotError(f"Unsupported snapshot format {manifest.get('format')!r}")
+    if manifest.get("byteorder") != sys.byteorder:
+        raise SnapshotError(f"Snapshot was written on a {manifest.get('byteorder')}-endian host")
+    return manifest
+
+
+def _write(
+    directory: Path,
+    records: Iterable[Record],
+    manifest: dict[str, Any],
+    types: Mapping[str, str],
+) -> None:
+    records = list(records)
+    rows = manifest["rows"]
+    columns: list[dict[str, Any]] = manifest["columns"]
+    writers = [
+        _ColumnWriter(directory, i, column["name"], column["type"], column.get("pool_size", 0))
+        for i, column in enumerate(columns)
+    ]
+    known = {column["name"] for column in columns[1:]}
+    new_fields: dict[str, None] = {}
+    for record in records:
+        for name in record.get("fields", {}):
+            if name not in known:
+                new_fields[name] = None
+    for name in new_fields:
+        kind = types.get(name) or infer_type(r.get("fields", {}).get(name) for r in records)
+        writer = _ColumnWriter(directory, len(writers), name, kind)
+        for _ in range(rows):
+            writer.add(None)
+        writers.append(writer)
+
+    ids = writers[0]
+    for record in records:
+        ids.add(record["id"])
+        fields = record.get("fields", {})
+        for writer in writers[1:]:
+            writer.add(fields.get(writer.name))
+
+    manifest["columns"] = [
+        writer.flush(0 if i >= len(columns) else rows) for i, writer in enumerate(writers)
+    ]
+    manifest["rows"] = rows + len(records)
+    scratch = directory / f"{MANIFEST}.tmp"
+    scratch.write_text(json.dumps(manifest, indent=1))
+    os.replace(scratch, directory / MANIFEST)
+
+
+def write_snapshot(
+    path: str | os.PathLike, records: Iterable[Record], types: Mapping[str, str] | None = None
+) -> "Snapshot":
+    """Write Airtable-style records (`{"id": ..., "fields": {...}}`) as a new snapshot.
+
+    Column types are inferred from the values unless `types` names them, e.g.
+    `{"Notes": "text"}` for a text field whose values all happen to look like dates.
+    An existing snapshot at `path` is replaced; any other non-empty directory is refused.
+    """
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    if (directory / MANIFEST).exists():
+        for stale in directory.iterdir():
+            if _COLUMN_FILE.fullmatch(stale.name):
+                stale.unlink()
+    elif any(directory.iterdir()):
+        raise SnapshotError(f"{directory} is not empty and holds no snapshot")
+    manifest = {
+        "format": FORMAT,
+        "byteorder": sys.byteorder,
+        "rows": 0,
+        "columns": [{"name": "id", "type": "text", "pool_size": 0}],
+    }
+    _write(directory, records, manifest, types or {})
+    return Snapshot(directory)
+
+
+def append_snapshot(
+    path: str | os.PathLike, records: Iterable[Record], types: Mapping[str, str] | None = None
+) -> "Snapshot":
+    """Append synced records; a record already in the snapshot is superseded by its new row.
+
+    Fields seen for the first time get a new column, empty for the earlier rows.
+    """
+    directory = Path(path)
+    _write(directory, records, _read_manifest(directory), types or {})
+    return Snapshot(directory)
+
+
+class Column:
+    """One field's values, read from the mapped files on access."""
+
+    def __init__(self, name: str, type: str, values: memoryview, pool: "_Pool | None"):
+        self.name = name
+        self.type = type
+        self.values = values
+        self._pool = pool
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, row: int) -> Any:
+        raw = self.values[row]
+        kind = self.type
+        if kind == "number":
+            return None if math.isnan(raw) else (int(raw) if raw.is_integer() else raw)
+        if kind == "bool":
+            return None if raw < 0 else bool(raw)
+        if kind == "date":
+            return None if raw == _NO_DATE else _EPOCH + timedelta(milliseconds=raw)
+        if raw < 0:
+            return None
+        assert self._pool is not None
+        text = self._pool[raw]
+        return text if kind == "text" else json.loads(text)
+
+
+class _Pool:
+    def __init__(self, data: memoryview, offsets: memoryview):
+        self.data = data
+        self.offsets = offsets
+        self._decoded: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        text = self._decoded.get(index)
+        if text is None:
+            start, end = self.offsets[index], self.offsets[index + 1]
+            text = self._decoded[index] = str(self.data[start:end], "utf-8")
+        return text
+
+
+class _Fields(Mapping[str, Any]):
+    """A record's fields as a read-only mapping over the snapshot's columns."""
+
+    __slots__ = ("_columns", "_row")
+
+    def __init__(self, columns: Mapping[str, Column], row: int):
+        self._columns = columns
+        self._row = row
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._columns[name][self._row]
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        column = self._columns.get(name)
+        value = None if column is None else column[self._row]
+        return default if value is None else value
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, column in self._columns.items() if column[self._row] is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class Snapshot:
+    """A read-only view of a snapshot directory as of the manifest it was opened with."""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        manifest = _read_manifest(self.path)
+        self.rows: int = manifest["rows"]
+        self._maps: list[mmap.mmap] = []
+        self._views: list[memoryview] = []
+        columns = [self._column(i, column) for i, column in enumerate(manifest["columns"])]
+        self.ids = columns[0]
+        self.columns: dict[str, Column] = {column.name: column for column in columns[1:]}
+        self._latest: dict[str, int] | None = None
+
+    def _map(self, path: Path, code: str, length: int) -> memoryview:
+        if length == 0:
+            return memoryview(b"").cast("B").cast(code)
+        size = length * array(code).itemsize
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < size:
+                raise SnapshotError(f"{path} is shorter than the {size} bytes the manifest needs")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        raw = memoryview(mapped)
+        self._views.append(raw)
+        # Only the committed bytes are cast: an interrupted append can leave a partial item.
+        committed = raw[:size]
+        self._views.append(committed)
+        if code == "B":
+            return committed
+        view = committed.cast(code)
+        self._views.append(view)
+        return view
+
+    def _column(self, index: int, column: Mapping[str, Any]) -> Column:
+        kind = column["type"]
+        values = self._map(_column_file(self.path, index, "data"), _CODES[kind], self.rows)
+        pool = None
+        if kind in _POOLED:
+            size = column["pool_size"]
+            offsets = self._map(
+                _column_file(self.path, index, "offsets"), "q", size + 1 if size else 0
+            )
+            end = offsets[size] if size else 0
+            pool = _Pool(self._map(_column_file(self.path, index, "pool"), "B", end), offsets)
+        return Column(column["name"], kind, values, pool)
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the files; columns and rows read from this snapshot are unusable afterwards."""
+        for view in reversed(self._views):
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views.clear()
+        self._maps.clear()
+
+    def __len__(self) -> int:
+        """The number of current records, not counting superseded rows."""
+        return len(self._latest_rows())
+
+    def _latest_rows(self) -> dict[str, int]:
+        if self._latest is None:
+            self._latest = {self.ids[row]: row for row in range(self.rows)}
+        return self._latest
+
+    def live_rows(self) -> Iterator[int]:
+        """Row numbers of the current version of each record, in row order."""
+        if len(self._latest_rows()) == self.rows:
+            return iter(range(self.rows))
+        return iter(sorted(self._latest_rows().values()))
+
+    def fields(self, row: int) -> Mapping[str, Any]:
+        return _Fields(self.columns, row)
+
+    def get(self, record_id: str) -> Record | None:
+        row = self._latest_rows().get(record_id)
+        return None if row is None else self.record(row)
+
+    def record(self, row: int) -> dict[str, Any]:
+        """The row as an Airtable-style record; dates come back as UTC datetimes."""
+        return {"id": self.ids[row], "fields": dict(self.fields(row))}
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return (self.record(row) for row in self.live_rows())
+
+    def filter(self, formula: str | Node, now: datetime | None = None) -> Iterator[str]:
+        """Ids of the current records matching `formula`, evaluated locally."""
+        check = compile_formula(formula)
+        for row in self.live_rows():
+            record_id = self.ids[row]
+            if is_truthy(check(Row(_Fields(self.columns, row), record_id, now))):
+                yield record_id
@@ -0,0 +1,198 @@
+"""Build formulas from declarative specs (JSON or YAML) instead of Python code.
+
+A spec declares field types and named conditions::
+
+    fields:
+      Status: text
+      Due: date
+    formulas:
+      open: {field: Status, op: equals, value: Open}
+      overdue:
+        and:
+          - {field: Status, op: not_equals, value: Done}
+          - {field: Due, op: is_after, days_ago: 7}
+
+A condition is a raw formula string, `{formula: ...}`, `{id: ...}`, a field comparison
+(`field`, `op`, optionally `value`, a `*_ago` amount for relative dates and keyword options such
+as `case_sensitive`), or a combination: `and`/`or`/`xor` (lists), `not`, or
+`if`/`then`/`else` with an optional `string` flag for the branch values.
+"""
+
+import json
+import os
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+
+from . import (
+    AND,
+    IF,
+    NOT,
+    OR,
+    XOR,
+    AttachmentsField,
+    BooleanField,
+    DateComparison,
+    DateField,
+    Field,
+    NumberField,
+    TextField,
+    TextListField,
+    id_equals,
+)
+
+FIELD_TYPES: dict[str, type[Field]] = {
+    "text": TextField,
+    "text_list": TextListField,
+    "number": NumberField,
+    "boolean": BooleanField,
+    "attachments": AttachmentsField,
+    "date": DateField,
+}
+_JUNCTIONS = {"and": AND, "or": OR, "xor": XOR}
+_COMPARISON_KEYS = ("field", "type", "op", "value")
+# Below this many entries a process pool costs more to start than it saves.
+_POOL_THRESHOLD = 64
+
+Entry = tuple[str, Any, Mapping[str, str]]
+
+
+class SpecError(ValueError):
+    """Raised for a spec that does not describe a formula."""
+
+
+def load_spec(path: str | os.PathLike) -> dict[str, Any]:
+    """Read a JSON or YAML spec, YAML needing the optional `pyyaml` package."""
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError(
+                "YAML specs need pyyaml: pip install 'airtableformulahelpers[yaml]'"
+            ) from None
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    if not isinstance(spec, Mapping) or not isinstance(spec.get("formulas", {}), Mapping):
+        raise SpecError(f"{path}: expected a mapping with a `formulas` mapping")
+    return dict(spec)
+
+
+def build(condition: Any, fields: Mapping[str, str] | None = None) -> str:
+    """The formula for one condition, with field types looked up in `fields` (default text)."""
+    fields = fields or {}
+    if isinstance(condition, str):
+        return condition
+    if not isinstance(condition, Mapping):
+        raise SpecError(f"Expected a condition, got {condition!r}")
+    if "formula" in condition:
+        return str(condition["formula"])
+    if "id" in condition:
+        return id_equals(condition["id"])
+    for key, junction in _JUNCTIONS.items():
+        if key in condition:
+            parts = condition[key]
+            if not isinstance(parts, list):
+                raise SpecError(f"`{key}` expects a list of conditions")
+            return junction(*(build(part, fields) for part in parts))
+    if "not" in condition:
+        return NOT(build(condition["not"], fields))
+    if "if" in condition:
+        string = bool(condition.get("string", False))
+        return (
+            IF(build(condition["if"], fields))
+            .THEN(_branch(condition.get("then", ""), fields, string), string=string)
+            .ELSE(_branch(condition.get("else", ""), fields, string), string=string)
+        )
+    if "field" in condition:
+        return _comparison(condition, fields)
+    raise SpecError(f"Unrecognised condition {dict(condition)!r}")
+
+
+def _branch(value: Any, fields: Mapping[str, str], string: bool) -> str:
+    if isinstance(value, Mapping):
+        return build(value, fields)
+    return str(value) if string or isinstance(value, str) else json.dumps(value)
+
+
+def _comparison(condition: Mapping[str, Any], fields: Mapping[str, str]) -> str:
+    name = condition["field"]
+    kind = condition.get("type") or fields.get(name, "text")
+    field_type = FIELD_TYPES.get(kind)
+    if field_type is None:
+        raise SpecError(f"Unknown field type {kind!r} for {name!r}")
+    op = condition.get("op")
+    method = getattr(field_type, op, None) if isinstance(op, str) else None
+    if method is None or op.startswith("_"):
+        raise SpecError(f"{field_type.__name__} has no operation {op!r}")
+    ago = {key: value for key, value in condition.items() if key.endswith("_ago")}
+    options = {
+        key: value
+        for key, value in condition.items()
+        if key not in _COMPARISON_KEYS and key not in ago
+    }
+    args = (condition["value"],) if "value" in condition else ()
+    try:
+        result = method(field_type(name=name), *args, **options)
+        if isinstance(result, DateComparison):
+            if len(ago) != 1:
+                raise SpecError(f"{name}.{op} needs a `value` or one `*_ago` amount")
+            ((unit, amount),) = ago.items()
+            result = getattr(result, unit)(amount)
+    except (TypeError, ValueError, AttributeError) as error:
+        if isinstance(error, SpecError):
+            raise
+        detail = error.errors()[0]["msg"] if isinstance(error, ValidationError) else error
+        raise SpecError(f"{name}.{op}: {detail}") from error
+    return result
+
+
+def spec_formula(spec: Mapping[str, Any], name: str | None = None) -> str:
+    """The formula called `name` in a loaded spec; `name` may be omitted when there is one."""
+    formulas = spec.get("formulas", {})
+    if name is None:
+        if len(formulas) != 1:
+            raise SpecError(f"Pick one of the spec's formulas: {', '.join(formulas)}")
+        (name,) = formulas
+    if name not in formulas:
+        raise SpecError(f"No formula named {name!r} in the spec")
+    return build(formulas[name], spec.get("fields"))
+
+
+def spec_entries(spec: Mapping[str, Any]) -> list[Entry]:
+    """`(name, condition, fields)` for every formula in a loaded spec, in spec order."""
+    fields = spec.get("fields") or {}
+    return [(name, condition, fields) for name, condition in spec.get("formulas", {}).items()]
+
+
+def compile_entry(entry: Entry) -> dict[str, str]:
+    """`{"name", "formula"}` for an entry, or `{"name", "error"}` when it does not build."""
+    name, condition, fields = entry
+    try:
+        return {"name": name, "formula": build(condition, fields)}
+    except SpecError as error:
+        return {"name": name, "error": str(error)}
+
+
+def compile_entries(
+    entries: Iterable[Entry], workers: int | None = None
+) -> Iterator[dict[str, str]]:
+    """Compile entries, yielding results in input order as they become available.
+
+    `workers` processes share the work; by default a pool of up to one process per CPU is used
+    once there are enough entries to pay for starting it.
+    """
+    entries = list(entries)
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(entries) // _POOL_THRESHOLD) or 1
+    if workers <= 1:
+        yield from map(compile_entry, entries)
+        return
+    chunksize = max(1, len(entries) // (workers * 4))
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(compile_entry, entries, chunksize=chunksize)
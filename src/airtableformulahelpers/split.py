@@ -0,0 +1,180 @@
+"""Split an over-length `OR` filter into several queries that each fit a length budget.
+
+Airtable rejects list requests whose URL is longer than 16,000 characters, which a faceted search
+ORing hundreds of values reaches quickly. `split_formula` breaks the disjunction into as few
+filters under the budget as it can, carrying any surrounding `AND` context into each:
+
+    AND({Active}, OR({Tag}="a", {Tag}="b", ...))  ->  AND({Active}, OR({Tag}="a", ...)), ...
+
+Run each filter and combine the results with `merge_records`, which drops records that more than
+one sub-query returned.
+"""
+
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+from urllib.parse import quote
+
+from .formula import Call, LiteralList, Members, Node, RenderMode, render, to_node, walk
+
+# Leaves room in Airtable's 16,000 character URL limit for the base, table and other parameters.
+DEFAULT_BUDGET = 15_000
+
+Wrap = Callable[[list[Node]], Node]
+
+
+class SplitError(ValueError):
+    """Raised when a formula cannot be split into filters under the budget."""
+
+
+def url_length(formula: str) -> int:
+    """Characters `formula` takes up once URL-encoded as a query parameter."""
+    return len(quote(formula, safe=""))
+
+
+def _disjuncts(node: Node, origins: dict[int, Members]) -> list[Node]:
+    """The arguments of an `OR`, with nested `OR`s and membership lists flattened into it.
+
+    Each comparison expanded from a `Members` is recorded in `origins` by id, for `_or`.
+    """
+    if isinstance(node, Call) and node.name == "OR":
+        return [part for arg in node.args for part in _disjuncts(arg, origins)]
+    if isinstance(node, Members):
+        parts = list(node.expand().args)
+        for part in parts:
+            origins[id(part)] = node
+        return parts
+    return [node]
+
+
+def _or(origins: dict[int, Members]) -> Wrap:
+    """An `OR` of chosen disjuncts, packing those of each membership list back into a `Members`."""
+
+    def wrap(chosen: list[Node]) -> Node:
+        packed: list[Node | list[Node]] = []
+        groups: dict[int, list[Node]] = {}
+        for part in chosen:
+            source = origins.get(id(part))
+            if source is None:
+                packed.append(part)
+            elif id(source) in groups:
+                groups[id(source)].append(part)
+            else:
+                packed.append(groups.setdefault(id(source), [part]))
+        parts = [_members(item, origins) if isinstance(item, list) else item for item in packed]
+        return parts[0] if len(parts) == 1 else Call("OR", tuple(parts))
+
+    return wrap
+
+
+def _members(parts: list[Node], origins: dict[int, Members]) -> Node:
+    if len(parts) == 1:
+        return parts[0]
+    source = origins[id(parts[0])]
+    values = LiteralList(part.right.value for part in parts)  # type: ignore[union-attr]
+    return Members(source.target, values, source.quote)
+
+
+def _decompose(node: Node) -> tuple[Wrap, list[Node]] | None:
+    """Split `node` into a rebuild function and the disjuncts it can be rebuilt from.
+
+    `OR` splits into its arguments and a membership list into its values. `AND` splits on its
+    largest splittable argument, the other arguments being repeated around every part:
+    `AND(x, OR(a, b))` is `AND(x, a) OR AND(x, b)`.
+    """
+    if (isinstance(node, Call) and node.name == "OR" and len(node.args) > 1) or (
+        isinstance(node, Members) and len(node.values) > 1
+    ):
+        origins: dict[int, Members] = {}
+        return _or(origins), _disjuncts(node, origins)
+    if isinstance(node, Call) and node.name == "AND":
+        candidates = []
+        for i, arg in enumerate(node.args):
+            inner = _decompose(arg)
+            if inner is not None:
+                candidates.append((len(inner[1]), len(render(arg, "compact")), i, inner))
+        if not candidates:
+            return None
+        *_, index, (inner_wrap, parts) = max(candidates, key=lambda c: c[:3])
+        before, after = node.args[:index], node.args[index + 1 :]
+
+        def wrap(chosen: list[Node]) -> Node:
+            return Call("AND", (*before, inner_wrap(chosen), *after))
+
+        return wrap, parts
+    return None
+
+
+def split_formula(
+    formula: str | Node,
+    budget: int = DEFAULT_BUDGET,
+    size: Callable[[str], int] = url_length,
+    mode: RenderMode = "compact",
+) -> list[str]:
+    """Filters, each at most `budget` by `size`, that together match what `formula` matches.
+
+    A formula already under the budget is returned alone. Otherwise the disjuncts are packed
+    first-fit-decreasing by size, which needs close to the fewest queries possible; each query
+    keeps its disjuncts in their original order. `size` defaults to the URL-encoded length, and
+    `len` measures the raw formula instead.
+    """
+    node = to_node(formula)
+    whole = render(node, mode)
+    if size(whole) <= budget:
+        return [whole]
+    decomposed = _decompose(node)
+    if decomposed is None:
+        raise SplitError(f"Formula is {size(whole)} long, over {budget}, and has no OR to split")
+    wrap, parts = decomposed
+
+    rendered = [render(part, mode) for part in parts]
+    costs = [size(text) for text in rendered]
+    # Sizes add up over concatenation, so a query costs its fixed wrapping plus its parts and
+    # separators; the wrapping is measured around a two-part OR, the most expensive shape.
+    separator = size(",")
+    pair = size(render(wrap(parts[:2]), mode))
+    overhead = pair - costs[0] - costs[1] - separator
+    # A membership list packed next to other disjuncts is an `OR` nested in the query's `OR`.
+    lists = sum(isinstance(inner, Members) for inner in walk(node))
+    overhead += lists * (size("OR()") + separator)
+    capacity = budget - overhead
+
+    bins: list[list[int]] = []
+    free: list[int] = []
+    for i in sorted(range(len(parts)), key=lambda i: -costs[i]):
+        cost = costs[i] + separator
+        if cost > capacity + separator:
+            raise SplitError(f"A single condition does not fit in {budget}: {rendered[i][:200]}")
+        for slot, room in enumerate(free):
+            if cost <= room:
+                bins[slot].append(i)
+                free[slot] -= cost
+                break
+        else:
+            bins.append([i])
+            free.append(capacity + separator - cost)
+
+    # A packed membership list renders every value with one shared quote, escaping the other, so
+    # a query can come out longer than its parts measured alone; such a query is halved again.
+    queries = []
+    pending = [sorted(members) for members in reversed(bins)]
+    while pending:
+        members = pending.pop()
+        query = render(wrap([parts[i] for i in members]), mode)
+        if size(query) > budget and len(members) > 1:
+            half = len(members) // 2
+            pending += (members[half:], members[:half])
+        else:
+            queries.append(query)
+    return queries
+
+
+def merge_records(results: Iterable[Iterable[Mapping[str, Any]]]) -> list[Mapping[str, Any]]:
+    """Records from several sub-query results, each record id once, in first-seen order."""
+    seen: set[str] = set()
+    merged = []
+    for records in results:
+        for record in records:
+            if record["id"] not in seen:
+                seen.add(record["id"])
+                merged.append(record)
+    return merged
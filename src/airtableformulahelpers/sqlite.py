@@ -0,0 +1,337 @@
+"""Compile formulas into parameterized SQLite expressions for a local replica of a base.
+
+The replica is expected to hold one table per Airtable table, one column per field (named
+after the field unless `columns` says otherwise), the record id in `id` and dates as ISO 8601
+text. `REGEX_MATCH` and calendar-unit `DATETIME_DIFF` need the functions installed by
+`register_functions`.
+
+Blanks follow the evaluator in `evaluate`: an empty column is 0 in arithmetic and in ordering
+comparisons against numbers, and false where a truth value is compared, so `{Done}=FALSE()`
+selects unchecked rows and `{Count}<10` selects rows without a count.
+"""
+
+import re
+import sqlite3
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from .evaluate import datetime_diff
+from .formula import BinOp, Call, FieldRef, Members, Name, Neg, Node, Num, Str, to_node
+
+
+class SqlTranslationError(ValueError):
+    """Raised when a formula uses something that has no SQLite translation."""
+
+
+# julianday() differences are in days; multiply to get the unit.
+_DAY_FACTORS = {
+    "milliseconds": 86400000,
+    "ms": 86400000,
+    "seconds": 86400,
+    "s": 86400,
+    "minutes": 1440,
+    "m": 1440,
+    "hours": 24,
+    "h": 24,
+    "days": 1,
+    "d": 1,
+    "weeks": 1 / 7,
+    "w": 1 / 7,
+}
+_SIMPLE_FUNCTIONS = {"LOWER": "lower", "UPPER": "upper", "TRIM": "trim", "ABS": "abs"}
+_COMPARISONS = {"=": "IS", "!=": "IS NOT", ">": ">", "<": "<", ">=": ">=", "<=": "<="}
+_ARITHMETIC = ("+", "-", "*", "/")
+_BOOLEAN_CALLS = (
+    "TRUE",
+    "FALSE",
+    "AND",
+    "OR",
+    "NOT",
+    "XOR",
+    "REGEX_MATCH",
+    "IS_BEFORE",
+    "IS_AFTER",
+)
+_NUMERIC_CALLS = ("LEN", "FIND", "ABS", "DATETIME_DIFF")
+_MOMENT_CALLS = ("DATETIME_PARSE", "NOW", "TODAY")
+# Calls whose translation is never NULL, so they need no COALESCE.
+_NOT_NULL_CALLS = ("LEN", "FIND", "TRUE", "FALSE")
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+@dataclass
+class SqliteQuery:
+    """A WHERE expression with its `?` parameters and the fields it reads."""
+
+    where: str
+    params: list[Any]
+    fields: set[str] = field(default_factory=set)
+    # (field, expression) pairs worth indexing, e.g. ("Due", 'julianday("Due")').
+    indexable: list[tuple[str, str]] = field(default_factory=list)
+
+    def select(self, table: str, columns: str = "*") -> tuple[str, list[Any]]:
+        return f"SELECT {columns} FROM {quote_identifier(table)} WHERE {self.where}", self.params
+
+
+class _Compiler:
+    def __init__(self, columns: Mapping[str, str], id_column: str):
+        self.columns = columns
+        self.id_column = id_column
+        self.query = SqliteQuery("", [])
+
+    def column(self, name: str) -> str:
+        self.query.fields.add(name)
+        return quote_identifier(self.columns.get(name, name))
+
+    def param(self, value: Any) -> str:
+        self.query.params.append(value)
+        return "?"
+
+    def condition(self, node: Node) -> str:
+        """SQL that is 1 when the node is truthy in Airtable terms, and 0 or NULL otherwise."""
+        if _is_boolean(node):
+            return self.value(node)
+        return f"(COALESCE({self.value(node)}, '') NOT IN ('', 0))"
+
+    def flag(self, node: Node) -> str:
+        """SQL that is 1 when the node is truthy and 0 otherwise, never NULL."""
+        sql = self.condition(node)
+        return sql if not _is_boolean(node) else f"COALESCE({sql}, 0)"
+
+    def number(self, node: Node) -> str:
+        """The node as a number, blank counting as 0."""
+        sql = self.value(node)
+        if isinstance(node, Num) or isinstance(node, Call) and node.name in _NOT_NULL_CALLS:
+            return sql
+        return f"COALESCE({sql}, 0)"
+
+    def text(self, node: Node) -> str:
+        sql = self.value(node)
+        return sql if isinstance(node, Str) else f"COALESCE({sql}, '')"
+
+    def moment(self, node: Node) -> str:
+        """A julianday number for a date argument."""
+        if isinstance(node, Call) and node.name in ("DATETIME_PARSE", "NOW", "TODAY"):
+            return self.value(node)
+        return f"julianday({self.value(node)})"
+
+    def value(self, node: Node) -> str:
+        if isinstance(node, FieldRef):
+            return self.column(node.name)
+        if isinstance(node, (Str, Num)):
+            return self.param(node.value)
+        if isinstance(node, Neg):
+            return f"-({self.number(node.operand)})"
+        if isinstance(node, BinOp):
+            return self.binary(node)
+        if isinstance(node, Call):
+            return self.call(node)
+        if isinstance(node, Members):
+            return self.value(node.expand())
+        if isinstance(node, Name):
+            raise SqlTranslationError(f"Unknown identifier {node.name!r}")
+        raise TypeError(f"Not a formula node: {node!r}")
+
+    def binary(self, node: BinOp) -> str:
+        if node.op == "&":
+            return f"({self.text(node.left)} || {self.text(node.right)})"
+        if node.op in _ARITHMETIC:
+            return f"({self.number(node.left)} {node.op} {self.number(node.right)})"
+        if node.op in ("=", "!=") and (_is_boolean(node.left) or _is_boolean(node.right)):
+            return self.truth_equals(node)
+        if node.op in ("=", "!="):
+            # The evaluator treats NULL and "" alike, so comparing with either is a blank check.
+            for side, other in ((node.left, node.right), (node.right, node.left)):
+                if _is_blank(other):
+                    return f"(COALESCE({self.value(side)}, '') {node.op} '')"
+        sides = (node.left, node.right)
+        # Ordering against a number treats blank as 0; equality and dates keep blanks apart.
+        if (
+            node.op not in ("=", "!=")
+            and any(map(_is_numeric, sides))
+            and not any(map(_is_moment, sides))
+        ):
+            left, right = self.number(node.left), self.number(node.right)
+        else:
+            left, right = self.value(node.left), self.value(node.right)
+        self.note_indexable(node.left, node.right, left)
+        self.note_indexable(node.right, node.left, right)
+        return f"({left} {_COMPARISONS[node.op]} {right})"
+
+    def truth_equals(self, node: BinOp) -> str:
+        """`=`/`!=` against a truth value compares truthiness, as checkbox fields need."""
+        for side, other in ((node.left, node.right), (node.right, node.left)):
+            if isinstance(other, Call) and other.name in ("TRUE", "FALSE") and not other.args:
+                if (other.name == "TRUE") == (node.op == "="):
+                    return self.condition(side)
+                return f"(NOT {self.flag(side)})"
+        op = "=" if node.op == "=" else "!="
+        return f"({self.flag(node.left)} {op} {self.flag(node.right)})"
+
+    def note_indexable(self, side: Node, other: Node, sql: str) -> None:
+        if isinstance(other, FieldRef) or (
+            isinstance(other, Call) and other.name == "DATETIME_PARSE" and _field_arg(other)
+        ):
+            return
+        if isinstance(side, FieldRef):
+            self.query.indexable.append((side.name, sql))
+        elif isinstance(side, Call) and side.name == "DATETIME_PARSE" and _field_arg(side):
+            self.query.indexable.append((side.args[0].name, sql))  # type: ignore[union-attr]
+
+    def call(self, node: Call) -> str:
+        name, args = node.name, node.args
+        if name == "TRUE":
+            return "1"
+        if name == "FALSE":
+            return "0"
+        if name == "BLANK":
+            return "NULL"
+        if name == "AND" or name == "OR":
+            if not args:
+                return "1" if name == "AND" else "0"
+            return "(" + f" {name} ".join(self.condition(arg) for arg in args) + ")"
+        if name == "NOT":
+            return f"(NOT {self.flag(args[0])})"
+        if name == "XOR":
+            return "((" + " + ".join(self.flag(arg) for arg in args) + ") % 2 = 1)"
+        if name == "IF":
+            # Parameters are appended as compiled, so build the parts in SQL order.
+            when, then = self.condition(args[0]), self.value(args[1])
+            otherwise = self.value(args[2]) if len(args) > 2 else "NULL"
+            return f"(CASE WHEN {when} THEN {then} ELSE {otherwise} END)"
+        if name == "FIND":
+            return self.find(args)
+        if name in _SIMPLE_FUNCTIONS:
+            return f"{_SIMPLE_FUNCTIONS[name]}({self.value(args[0])})"
+        if name == "LEN":
+            return f"length({self.text(args[0])})"
+        if name == "CONCATENATE":
+            return "(" + " || ".join(self.text(arg) for arg in args) + ")"
+        if name == "REGEX_MATCH":
+            return f"regex_match({self.text(args[0])}, {self.value(args[1])})"
+        if name == "RECORD_ID":
+            return quote_identifier(self.id_column)
+        if name == "NOW":
+            return "julianday('now')"
+        if name == "TODAY":
+            return "julianday('now', 'start of day')"
+        if name == "DATETIME_PARSE":
+            return f"julianday({self.value(args[0])})"
+        if name == "IS_BEFORE" or name == "IS_AFTER":
+            op = "<" if name == "IS_BEFORE" else ">"
+            return f"({self.moment(args[0])} {op} {self.moment(args[1])})"
+        if name == "DATETIME_DIFF":
+            return self.datetime_diff(args)
+        raise SqlTranslationError(f"Function {name}() has no SQLite translation")
+
+    def find(self, args: tuple[Node, ...]) -> str:
+        if len(args) < 3:
+            needle, haystack = self.text(args[0]), self.text(args[1])
+            return f"instr({haystack}, {needle})"
+
+        # Search from `start`, counted from 1 like the evaluator, then shift the position back
+        # into the whole text. The arguments are compiled once per use to keep parameters in order.
+        def start() -> str:
+            return f"max(CAST({self.number(args[2])} AS INTEGER), 1)"
+
+        def found() -> str:
+            haystack = self.text(args[1])
+            return f"instr(substr({haystack}, {start()}), {self.text(args[0])})"
+
+        first = found()
+        within = f"{start()} <= length({self.text(args[1])}) + 1"
+        position = f"{found()} + {start()} - 1"
+        return f"(CASE WHEN {first} > 0 AND {within} THEN {position} ELSE 0 END)"
+
+    def datetime_diff(self, args: tuple[Node, ...]) -> str:
+        unit = args[2].value if len(args) > 2 and isinstance(args[2], Str) else "seconds"
+        left, right = self.moment(args[0]), self.moment(args[1])
+        factor = _DAY_FACTORS.get(unit) or _DAY_FACTORS.get(f"{unit}s")
+        if factor is None:
+            return f"datetime_diff({left}, {right}, {self.param(unit)})"
+        return f"CAST(({left} - {right}) * {factor} AS INTEGER)"
+
+
+def _is_boolean(node: Node) -> bool:
+    if isinstance(node, Call):
+        return node.name in _BOOLEAN_CALLS
+    return isinstance(node, BinOp) and node.op in _COMPARISONS
+
+
+def _is_blank(node: Node) -> bool:
+    if isinstance(node, Call):
+        return node.name == "BLANK" and not node.args
+    return isinstance(node, Str) and node.value == ""
+
+
+def _is_numeric(node: Node) -> bool:
+    if isinstance(node, (Num, Neg)):
+        return True
+    if isinstance(node, BinOp):
+        return node.op in _ARITHMETIC or node.op in _COMPARISONS
+    return isinstance(node, Call) and (node.name in _NUMERIC_CALLS or node.name in _BOOLEAN_CALLS)
+
+
+def _is_moment(node: Node) -> bool:
+    return isinstance(node, Call) and node.name in _MOMENT_CALLS
+
+
+def _field_arg(node: Call) -> bool:
+    return len(node.args) == 1 and isinstance(node.args[0], FieldRef)
+
+
+def to_sqlite(
+    formula: str | Node, columns: Mapping[str, str] | None = None, id_column: str = "id"
+) -> SqliteQuery:
+    """Compile a formula into a SQLite WHERE expression with `?` parameters."""
+    compiler = _Compiler(columns or {}, id_column)
+    compiler.query.where = compiler.condition(to_node(formula))
+    return compiler.query
+
+
+def suggest_indexes(
+    formula: str | Node, table: str, columns: Mapping[str, str] | None = None
+) -> list[str]:
+    """`CREATE INDEX` statements for the fields the formula compares against constants.
+
+    Fields only reached through `FIND`/`LOWER`/`TRIM` are scanned anyway, so they get none.
+    """
+    statements: list[str] = []
+    seen: set[str] = set()
+    for field_name, expression in to_sqlite(formula, columns).indexable:
+        if expression in seen:
+            continue
+        seen.add(expression)
+        suffix = "_jd" if expression.startswith("julianday") else ""
+        slug = re.sub(r"\W+", "_", f"{table}_{field_name}").strip("_").lower()
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS {quote_identifier(f'idx_{slug}{suffix}')} "
+            f"ON {quote_identifier(table)} ({expression})"
+        )
+    return statements
+
+
+def _regex_match(text: str | None, pattern: str | None) -> int:
+    return int(re.search(pattern or "", text or "") is not None)
+
+
+def register_functions(connection: sqlite3.Connection) -> None:
+    """Install `regex_match` and `datetime_diff` (calendar units) on a connection."""
+    connection.create_function("regex_match", 2, _regex_match, deterministic=True)
+    connection.create_function(
+        "datetime_diff",
+        3,
+        lambda left, right, unit: datetime_diff(_from_julian(left), _from_julian(right), unit),
+        deterministic=True,
+    )
+
+
+def _from_julian(day: float | None) -> datetime | None:
+    if day is None:
+        return None
+    return datetime(2000, 1, 1, 12, tzinfo=timezone.utc) + timedelta(days=day - 2451545.0)
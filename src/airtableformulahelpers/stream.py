@@ -0,0 +1,142 @@
+"""Filter NDJSON or CSV record streams locally, one chunk at a time.
+
+NDJSON lines may be Airtable-style records (`{"id": ..., "fields": {...}}`) or flat objects of
+field values; CSV rows are flat, with the record id in an `id` column when there is one.
+Matching items are passed through untouched, so output has the input's format.
+"""
+
+import csv
+import itertools
+import json
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Literal, TextIO
+
+from .evaluate import Evaluator, Row, compile_formula, is_truthy
+from .formula import Node, render
+
+Format = Literal["ndjson", "csv"]
+Item = str | Mapping[str, str]
+
+FORMATS: tuple[Format, ...] = ("ndjson", "csv")
+
+
+def detect_format(filename: str | None, default: Format = "ndjson") -> Format:
+    """The format implied by a file name's suffix."""
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    if filename and filename.lower().endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return default
+
+
+def read_items(stream: TextIO, format: Format) -> tuple[Iterator[Item], list[str] | None]:
+    """Lazily read NDJSON lines (without their newline) or CSV rows from a text stream.
+
+    Also returns the CSV header, which is read straight away, or None for NDJSON.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        return iter(reader), list(reader.fieldnames or [])
+    return _lines(stream), None
+
+
+def _lines(stream: TextIO) -> Iterator[str]:
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            yield line
+
+
+def to_row(item: Item, now: datetime | None = None) -> Row:
+    if isinstance(item, str):
+        record = json.loads(item)
+        fields = record.get("fields")
+        if isinstance(fields, Mapping):
+            return Row(fields, record.get("id"), now)
+        return Row(record, record.get("id"), now)
+    return Row(item, item.get("id"), now)
+
+
+def _matches(check: Evaluator, chunk: list[Item], now: datetime | None) -> list[bool]:
+    return [is_truthy(check(to_row(item, now))) for item in chunk]
+
+
+_worker: tuple[Evaluator, datetime | None] | None = None
+
+
+def _start_worker(formula: str, now: datetime | None) -> None:
+    global _worker
+    _worker = (compile_formula(formula), now)
+
+
+def _worker_matches(chunk: list[Item]) -> list[bool]:
+    assert _worker is not None
+    check, now = _worker
+    return _matches(check, chunk, now)
+
+
+def _chunks(items: Iterable[Item], size: int) -> Iterator[list[Item]]:
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def filter_items(
+    items: Iterable[Item],
+    formula: str | Node,
+    chunk_size: int = 1000,
+    workers: int = 1,
+    now: datetime | None = None,
+) -> Iterator[Item]:
+    """Yield the items whose record matches `formula`, in input order.
+
+    Items are evaluated `chunk_size` at a time against the compiled formula. With `workers`
+    above one, chunks are spread over that many processes; at most two chunks per worker are
+    pending at once, so memory stays bounded however long the input is.
+    """
+    if chunk_size < 1 or workers < 1:
+        raise ValueError("chunk_size and workers must be at least 1")
+    if workers == 1:
+        check = compile_formula(formula)
+        for chunk in _chunks(items, chunk_size):
+            hits = _matches(check, chunk, now)
+            yield from (item for item, hit in zip(chunk, hits) if hit)
+        return
+
+    text = formula if isinstance(formula, str) else render(formula)
+    with ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(text, now)) as pool:
+        pending: deque[tuple[list[Item], Future[list[bool]]]] = deque()
+        for chunk in _chunks(items, chunk_size):
+            pending.append((chunk, pool.submit(_worker_matches, chunk)))
+            if len(pending) >= 2 * workers:
+                yield from _drain(pending.popleft())
+        while pending:
+            yield from _drain(pending.popleft())
+
+
+def _drain(entry: tuple[list[Item], Future[list[bool]]]) -> Iterator[Item]:
+    chunk, future = entry
+    return (item for item, hit in zip(chunk, future.result()) if hit)
+
+
+def write_items(
+    stream: TextIO, items: Iterable[Item], format: Format, fieldnames: list[str] | None = None
+) -> int:
+    """Write items as they arrive, returning how many were written."""
+    count = 0
+    if format == "csv":
+        writer = csv.DictWriter(stream, fieldnames or [])
+        if fieldnames:
+            writer.writeheader()
+        for item in items:
+            writer.writerow(item)
+            count += 1
+        return count
+    for item in items:
+        stream.write(item)
+        stream.write("\n")
+        count += 1
+    return count
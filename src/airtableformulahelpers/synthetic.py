@@ -0,0 +1,212 @@
+"""Seeded synthetic formulas and records for load-testing formula pipelines.
+
+`Workload` builds random formula trees with the library's own helpers, so they have the shape
+of generated production formulas, and records whose values are drawn from the same vocabulary
+and ranges, so a useful share of them match. The same seed and settings always give the same
+output; formulas, records and the schema use separate random streams, so asking for more
+records does not change the formulas.
+"""
+
+import random
+import string
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from . import (
+    AND,
+    IF,
+    NOT,
+    OR,
+    XOR,
+    AttachmentsField,
+    BooleanField,
+    DateField,
+    Field,
+    NumberField,
+    TextField,
+    TextListField,
+)
+
+FIELD_MIX: dict[str, float] = {
+    "text": 0.35,
+    "number": 0.25,
+    "date": 0.15,
+    "boolean": 0.1,
+    "text_list": 0.1,
+    "attachments": 0.05,
+}
+_CLASSES: dict[str, type[Field]] = {
+    "text": TextField,
+    "number": NumberField,
+    "date": DateField,
+    "boolean": BooleanField,
+    "text_list": TextListField,
+    "attachments": AttachmentsField,
+}
+# Airtable types used when the workload is exported as a base schema.
+_SCHEMA_TYPES = {
+    "text": "singleLineText",
+    "number": "number",
+    "date": "dateTime",
+    "boolean": "checkbox",
+    "text_list": "multipleSelects",
+    "attachments": "multipleAttachments",
+}
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_DATE_UNITS = ("days_ago", "weeks_ago", "months_ago", "hours_ago")
+
+
+@dataclass
+class Workload:
+    """Settings for a synthetic workload.
+
+    - `depth`: levels of `AND`/`OR`/`XOR`/`NOT`/`IF` above the comparisons;
+    - `fanout`: inclusive range of arguments per `AND`/`OR`;
+    - `fields` and `field_mix`: how many fields, and the relative weight of each type;
+    - `literal_size`: inclusive range of characters in text literals, `list_size` of values in
+      `contains_any`;
+    - `relative_dates`: share of date comparisons written as `*_ago` rather than absolute;
+    - `vocabulary`: distinct text values shared by formulas and records;
+    - `blank_rate`: share of record fields left empty.
+    """
+
+    seed: int = 0
+    depth: int = 3
+    fanout: tuple[int, int] = (2, 4)
+    fields: int = 20
+    field_mix: Mapping[str, float] = field(default_factory=lambda: dict(FIELD_MIX))
+    literal_size: tuple[int, int] = (3, 12)
+    list_size: tuple[int, int] = (2, 5)
+    relative_dates: float = 0.5
+    vocabulary: int = 200
+    blank_rate: float = 0.1
+
+    def __post_init__(self) -> None:
+        unknown = set(self.field_mix) - set(_CLASSES)
+        if unknown:
+            raise ValueError(f"Unknown field types in field_mix: {', '.join(sorted(unknown))}")
+        if not any(weight > 0 for weight in self.field_mix.values()):
+            raise ValueError("field_mix needs at least one positive weight")
+        rng = self._random("schema")
+        kinds = [kind for kind, weight in self.field_mix.items() if weight > 0]
+        weights = [self.field_mix[kind] for kind in kinds]
+        self.field_types: dict[str, str] = {
+            f"{kind.replace('_', ' ').title()} {i}": kind
+            for i, kind in enumerate(rng.choices(kinds, weights, k=self.fields))
+        }
+        self._objects = {name: _CLASSES[kind](name=name) for name, kind in self.field_types.items()}
+        low, high = self.literal_size
+        self.words = sorted(
+            {
+                "".join(rng.choices(string.ascii_lowercase, k=rng.randint(low, high)))
+                for _ in range(self.vocabulary)
+            }
+        )
+
+    def _random(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+    def schema(self, table: str = "Synthetic") -> dict[str, Any]:
+        """The fields as a metadata-API base schema, for `schema.load_schema` and codegen."""
+        fields = [
+            {"id": f"fld{i:014d}", "name": name, "type": _SCHEMA_TYPES[kind]}
+            for i, (name, kind) in enumerate(self.field_types.items())
+        ]
+        return {"tables": [{"id": "tblSynthetic000", "name": table, "fields": fields}]}
+
+    def formulas(self, count: int) -> Iterator[str]:
+        """`count` random formulas; the sequence only depends on the settings."""
+        rng = self._random("formulas")
+        for _ in range(count):
+            yield self._condition(rng, self.depth)
+
+    def formula(self, index: int = 0) -> str:
+        """The `index`-th formula of `formulas()`."""
+        for i, formula in enumerate(self.formulas(index + 1)):
+            if i == index:
+                return formula
+        raise IndexError(index)
+
+    def _condition(self, rng: random.Random, depth: int) -> str:
+        if depth <= 0 or rng.random() < 0.15:
+            return self._comparison(rng)
+        roll = rng.random()
+        if roll < 0.7:
+            junction = AND if rng.random() < 0.5 else OR
+            count = rng.randint(*self.fanout)
+            return junction(*(self._condition(rng, depth - 1) for _ in range(count)))
+        if roll < 0.8:
+            return NOT(self._condition(rng, depth - 1))
+        if roll < 0.9:
+            return XOR(self._condition(rng, depth - 1), self._condition(rng, depth - 1))
+        condition = self._condition(rng, depth - 1)
+        return (
+            IF(condition)
+            .THEN(self._condition(rng, depth - 1))
+            .ELSE(self._condition(rng, depth - 1))
+        )
+
+    def _comparison(self, rng: random.Random) -> str:
+        name = rng.choice(list(self.field_types))
+        kind, field_object = self.field_types[name], self._objects[name]
+        if kind == "text":
+            assert isinstance(field_object, TextField)
+            op = rng.choice(("equals", "not_equals", "contains", "starts_with", "ends_with"))
+            if rng.random() < 0.1:
+                return rng.choice((field_object.is_empty, field_object.is_not_empty))()
+            return getattr(field_object, op)(self._word(rng))
+        if kind == "number":
+            op = rng.choice(
+                ("equals", "not_equals", "greater_than", "less_than", "greater_than_or_equals")
+            )
+            return getattr(field_object, op)(rng.randint(0, 100))
+        if kind == "boolean":
+            assert isinstance(field_object, BooleanField)
+            return field_object.is_true() if rng.random() < 0.5 else field_object.is_false()
+        if kind == "text_list":
+            assert isinstance(field_object, TextListField)
+            if rng.random() < 0.5:
+                return field_object.contains(self._word(rng))
+            words = [self._word(rng) for _ in range(rng.randint(*self.list_size))]
+            return field_object.contains_any(words)
+        if kind == "attachments":
+            assert isinstance(field_object, AttachmentsField)
+            return field_object.count_is(rng.randint(0, 3))
+        assert isinstance(field_object, DateField)
+        op = rng.choice(("is_after", "is_before", "is_on_or_after", "is_on_or_before"))
+        if rng.random() < self.relative_dates:
+            return getattr(getattr(field_object, op)(), rng.choice(_DATE_UNITS))(rng.randint(1, 90))
+        # Absolute dates are passed as datetimes so generating them never calls dateparser.
+        moment = _EPOCH + timedelta(days=rng.randint(-365, 365))
+        return getattr(field_object, op)(moment.replace(tzinfo=None))
+
+    def _word(self, rng: random.Random) -> str:
+        return rng.choice(self.words)
+
+    def records(self, count: int) -> Iterator[dict[str, Any]]:
+        """Airtable-style records with values in the ranges the formulas compare against."""
+        rng = self._random("records")
+        for i in range(count):
+            fields = {}
+            for name, kind in self.field_types.items():
+                if rng.random() >= self.blank_rate:
+                    fields[name] = self._value(rng, kind)
+            yield {"id": f"rec{i:014d}", "fields": fields}
+
+    def _value(self, rng: random.Random, kind: str) -> Any:
+        if kind == "text":
+            return self._word(rng)
+        if kind == "number":
+            return rng.randint(0, 100)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        if kind == "text_list":
+            return [self._word(rng) for _ in range(rng.randint(1, 4))]
+        if kind == "attachments":
+            return [
+                {"url": f"https://example.com/{rng.random():.8f}"} for _ in range(rng.randint(1, 3))
+            ]
+        moment = _EPOCH + timedelta(days=rng.randint(-365, 365), seconds=rng.randint(0, 86399))
+        return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
@@ -0,0 +1,109 @@
+"""Incremental maintenance of locally mirrored views.
+
+Each view is a filter formula. A record change only re-evaluates the views whose formulas
+reference one of the changed fields, and reports the records that entered or left each view.
+"""
+
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
+
+from .dependencies import DependencyIndex
+from .evaluate import Row, compile_formula, is_truthy
+from .formula import Node
+
+
+@dataclass(frozen=True, slots=True)
+class ViewEvent:
+    view: str
+    record_id: str
+    kind: Literal["enter", "leave"]
+
+
+class ViewIndex:
+    """Tracks which mirrored records belong to which registered view."""
+
+    def __init__(self, now: Callable[[], datetime | None] = lambda: None):
+        self.now = now
+        self.evaluations = 0
+        self._dependencies = DependencyIndex()
+        self._formulas: dict[str, Callable[[Row], Any]] = {}
+        self._members: dict[str, set[str]] = {}
+        self._records: dict[str, dict[str, Any]] = {}
+
+    def register(self, view: str, formula: str | Node) -> list[ViewEvent]:
+        """Add or replace a view and evaluate it against the records already mirrored.
+
+        Replacing a view reports only the records whose membership the new formula changes.
+        """
+        self._dependencies.add(view, formula)
+        self._formulas[view] = compile_formula(formula)
+        self._members.setdefault(view, set())
+        events: list[ViewEvent] = []
+        for record_id, fields in self._records.items():
+            events.extend(self._check(view, record_id, fields))
+        return events
+
+    def unregister(self, view: str) -> None:
+        self._dependencies.remove(view)
+        self._formulas.pop(view, None)
+        self._members.pop(view, None)
+
+    def members(self, view: str) -> frozenset[str]:
+        return frozenset(self._members[view])
+
+    def load(self, records: Iterable[Mapping[str, Any]]) -> list[ViewEvent]:
+        """Mirror Airtable-style records (`{"id": ..., "fields": {...}}`) and evaluate all views."""
+        events: list[ViewEvent] = []
+        for record in records:
+            events.extend(self.apply(record["id"], record.get("fields", {})))
+        return events
+
+    def apply(self, record_id: str, changed: Mapping[str, Any]) -> list[ViewEvent]:
+        """Apply a change event and re-evaluate only the views that reference a changed field.
+
+        `changed` maps field names (`Field.name`) to their new values. A record seen for the
+        first time is checked against every view.
+        """
+        fields = self._records.get(record_id)
+        if fields is None:
+            fields = self._records[record_id] = dict(changed)
+            views: Iterable[str] = self._formulas
+        else:
+            fields.update(changed)
+            views = self._dependencies.affected(changed)
+        events: list[ViewEvent] = []
+        for view in sorted(views):
+            events.extend(self._check(view, record_id, fields))
+        return events
+
+    def remove(self, record_id: str) -> list[ViewEvent]:
+        """Forget a deleted record, leaving every view it was in."""
+        self._records.pop(record_id, None)
+        events = []
+        for view, members in sorted(self._members.items()):
+            if record_id in members:
+                members.discard(record_id)
+                events.append(ViewEvent(view, record_id, "leave"))
+        return events
+
+    def refresh(self) -> list[ViewEvent]:
+        """Re-evaluate every view, e.g. for time-based formulas that use `NOW()`."""
+        events: list[ViewEvent] = []
+        for record_id, fields in self._records.items():
+            for view in sorted(self._formulas):
+                events.extend(self._check(view, record_id, fields))
+        return events
+
+    def _check(self, view: str, record_id: str, fields: Mapping[str, Any]) -> list[ViewEvent]:
+        self.evaluations += 1
+        inside = is_truthy(self._formulas[view](Row(fields, record_id, self.now())))
+        members = self._members[view]
+        if inside and record_id not in members:
+            members.add(record_id)
+            return [ViewEvent(view, record_id, "enter")]
+        if not inside and record_id in members:
+            members.discard(record_id)
+            return [ViewEvent(view, record_id, "leave")]
+        return []
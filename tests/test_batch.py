@@ -0,0 +1,66 @@
+import pytest
+
+from airtableformulahelpers import AND, NumberField, TextField
+from airtableformulahelpers.batch import batch
+from airtableformulahelpers.evaluate import EvaluationError, evaluate
+
+status = TextField(name="Status")
+count = NumberField(name="Count")
+
+RECORDS = [
+    {"id": "rec1", "fields": {"Status": "Open", "Count": 1}},
+    {"id": "rec2", "fields": {"Status": "Closed", "Count": 20}},
+    {"id": "rec3", "fields": {"Status": "Open", "Count": 50}},
+]
+
+
+def _query():
+    return batch(
+        {
+            "open": status.equals("Open"),
+            "big": count.greater_than(10),
+            "open_big": AND(status.equals("Open"), count.greater_than(10)),
+            "big_again": count.greater_than(10.0),
+        }
+    )
+
+
+def test_batch_builds_one_filter():
+    """Test the combined filter is an OR of distinct sub-filters"""
+    query = _query()
+    assert query.filter == ('OR({Status}="Open",{Count}>10,AND({Status}="Open",{Count}>10))')
+    assert query.slot_of["big_again"] == query.slot_of["big"]
+
+
+def test_tag_formula_reports_matches():
+    """Test the tag formula gives one flag per slot"""
+    query = _query()
+    assert query.tag.startswith('IF({Status}="Open", "1", "0") & ')
+    assert evaluate(query.tag, RECORDS[2]["fields"]) == "111"
+    assert evaluate(query.tag, RECORDS[1]["fields"]) == "010"
+
+
+def test_demultiplex_locally():
+    """Test results are split per filter by local evaluation"""
+    split = _query().demultiplex(RECORDS)
+    assert [r["id"] for r in split["open"]] == ["rec1", "rec3"]
+    assert [r["id"] for r in split["big"]] == ["rec2", "rec3"]
+    assert [r["id"] for r in split["open_big"]] == ["rec3"]
+    assert split["big_again"] == split["big"]
+
+
+def test_demultiplex_with_tag_field():
+    """Test a tag field value from the base is used when present"""
+    records = [{"id": "rec9", "fields": {"Tag": "001"}}]
+    split = _query().demultiplex(records, tag_field="Tag")
+    assert [r["id"] for r in split["open_big"]] == ["rec9"]
+    assert split["open"] == []
+
+
+def test_tag_field_avoids_compiling_unsupported_slots():
+    """Test slots the evaluator cannot run are only compiled for records without a tag"""
+    query = batch({"sum": "SUM({A}, {B}) > 2", "open": status.equals("Open")})
+    split = query.demultiplex([{"id": "rec9", "fields": {"Tag": "10"}}], tag_field="Tag")
+    assert [r["id"] for r in split["sum"]] == ["rec9"]
+    with pytest.raises(EvaluationError):
+        query.demultiplex([{"id": "rec8", "fields": {}}], tag_field="Tag")
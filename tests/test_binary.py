@@ -0,0 +1,67 @@
+import pytest
+
+from airtableformulahelpers import AND, IF, OR, DateField, NumberField, TextField, id_equals
+from airtableformulahelpers.binary import MAGIC, BinaryFormatError, decode, encode
+from airtableformulahelpers.formula import (
+    MAX_DEPTH,
+    Call,
+    FieldRef,
+    Members,
+    Num,
+    parse,
+    render,
+)
+
+text = TextField(name="Email")
+number = NumberField(name="Count")
+formulas = [
+    text.ends_with(".com"),
+    text.regex_match(r"^\d{3}$"),
+    number.equals(-3),
+    number.greater_than(5.5),
+    number.less_than(2**80),
+    DateField(name="Due").is_before().days_ago(3),
+    IF(AND(text.equals("x"), number.less_than(2))).THEN("yes", string=True).ELSE("0"),
+    OR(id_equals("rec1"), text.is_empty(), "TRUE()", "cond1"),
+    "{A} - -{B} & 'it\\'s'",
+    'IF({Code}="063", "Product " & {Package} & "\\n", "")',
+]
+
+
+@pytest.mark.parametrize("formula", formulas)
+def test_round_trip(formula):
+    """Test decoding gives back the parsed tree, which renders to the same text"""
+    tree = parse(formula)
+    blob = encode(formula)
+    assert blob.startswith(MAGIC)
+    assert decode(blob) == tree
+    assert render(decode(memoryview(bytearray(blob)))) == render(tree)
+
+
+def test_strings_are_stored_once():
+    """Test repeated field names cost one string table entry"""
+    formula = OR(*(number.greater_than(i) for i in range(500)))
+    blob = encode(formula)
+    assert blob.count(b"Count") == 1
+    assert len(blob) < len(formula) / 1.5
+
+
+def test_members_and_deep_trees():
+    """Test membership nodes round-trip, and trees nested MAX_DEPTH deep decode"""
+    members = Call("AND", (FieldRef("Open"), Members.record_ids(["rec1", "", "ünï"])))
+    assert decode(encode(members)) == members
+    deep = Num(1)
+    for _ in range(MAX_DEPTH):
+        deep = Call("NOT", (deep,))
+    decoded = decode(encode(deep))
+    for _ in range(MAX_DEPTH):
+        decoded = decoded.args[0]
+    assert decoded == Num(1)
+
+
+def test_corrupt_data_raises():
+    """Test bad magic, truncation and trailing data raise BinaryFormatError"""
+    blob = encode(AND("{A}", "{B}=1"))
+    for bad in (b"nope" + blob[4:], blob[:-1], blob + b"\x01", MAGIC):
+        with pytest.raises(BinaryFormatError):
+            decode(bad)
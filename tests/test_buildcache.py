@@ -0,0 +1,86 @@
+import os
+from datetime import date
+
+from airtableformulahelpers import TextField, buildcache
+from airtableformulahelpers.buildcache import BuildCache, watch_files
+from airtableformulahelpers.spec import spec_entries
+
+SPEC = {
+    "fields": {"Status": "text", "Count": "number", "Due": "date"},
+    "formulas": {
+        "open": {"field": "Status", "op": "equals", "value": "Open"},
+        "big": {"field": "Count", "op": "greater_than", "value": 10},
+        "due": {"field": "Due", "op": "is_after", "value": "2024-01-01"},
+    },
+}
+
+
+def test_unchanged_entries_come_from_cache(tmp_path):
+    """Test a second build with the same spec compiles nothing"""
+    cache = BuildCache(tmp_path / "cache.json")
+    first = list(cache.compile(spec_entries(SPEC)))
+    cache.save()
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    reopened = BuildCache(tmp_path / "cache.json")
+    assert list(reopened.compile(spec_entries(SPEC))) == first
+    assert (reopened.hits, reopened.misses) == (3, 0)
+
+
+def test_edits_miss_only_affected_entries(tmp_path):
+    """Test changing a condition or a used field's type misses only its entries"""
+    cache = BuildCache(tmp_path / "cache.json")
+    list(cache.compile(spec_entries(SPEC)))
+    edited = {
+        "fields": {**SPEC["fields"], "Count": "text"},
+        "formulas": {**SPEC["formulas"], "open": {"field": "Status", "op": "is_empty"}},
+    }
+    results = list(cache.compile(spec_entries(edited)))
+    assert (cache.hits, cache.misses) == (1, 5)
+    assert results[0] == {"name": "open", "formula": TextField(name="Status").is_empty()}
+
+
+def test_settings_and_relative_dates_change_keys(tmp_path, monkeypatch):
+    """Test settings and, for dates in words, the current day are part of the key"""
+    entry = ("due", {"field": "Due", "op": "is_after", "value": "yesterday"}, SPEC["fields"])
+    plain = BuildCache(tmp_path / "a.json")
+    assert plain.key(entry) != BuildCache(tmp_path / "b.json", {"mode": "x"}).key(entry)
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date(2999, 1, 1)
+
+    before = plain.key(entry)
+    absolute = plain.key(spec_entries(SPEC)[2])
+    monkeypatch.setattr(buildcache, "date", Tomorrow)
+    assert plain.key(entry) != before
+    assert plain.key(spec_entries(SPEC)[2]) == absolute
+
+
+def test_errors_are_not_cached(tmp_path):
+    """Test entries that fail to build are retried on the next run"""
+    cache = BuildCache(tmp_path / "cache.json")
+    spec = {"formulas": {"bad": {"field": "A", "op": "explode"}}}
+    assert "error" in next(cache.compile(spec_entries(spec)))
+    assert len(cache) == 0
+
+
+def test_prune(tmp_path):
+    """Test pruning keeps only the given keys"""
+    cache = BuildCache(tmp_path / "cache.json")
+    entries = spec_entries(SPEC)
+    list(cache.compile(entries))
+    cache.prune([cache.key(entries[0])])
+    assert len(cache) == 1
+
+
+def test_watch_files(tmp_path):
+    """Test polling yields files whose contents changed"""
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    a.write_text("{}")
+    b.write_text("{}")
+    edits = iter([lambda: None, lambda: b.write_text('{"x": 1}'), lambda: os.remove(a)])
+    changes = watch_files([a, b], interval=0, sleep=lambda _: next(edits)())
+    assert next(changes) == [b]
+    assert next(changes) == [a]
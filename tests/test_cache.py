@@ -0,0 +1,110 @@
+from airtableformulahelpers import AND, NumberField, TextField
+from airtableformulahelpers.cache import ResultCache
+
+status = TextField(name="Status")
+count = NumberField(name="Count")
+
+
+class FakeAirtable:
+    """Local stand-in for the Airtable API that counts list requests"""
+
+    def __init__(self):
+        self.requests = 0
+
+    def fetch(self, table, formula):
+        self.requests += 1
+        return [{"id": f"rec{self.requests}", "fields": {"Table": table}}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_equivalent_formulas_share_an_entry():
+    """Test reordered formulas hit the same cache entry"""
+    api = FakeAirtable()
+    cache = ResultCache()
+    first = cache.get_or_fetch("Jobs", AND(status.equals("Open"), count.greater_than(1)), api.fetch)
+    second = cache.get_or_fetch(
+        "Jobs", AND(count.greater_than(1), status.equals("Open")), api.fetch
+    )
+    assert first == second
+    assert api.requests == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_tables_are_separate():
+    """Test the same formula on another table is a separate entry"""
+    api = FakeAirtable()
+    cache = ResultCache()
+    cache.get_or_fetch("Jobs", status.equals("Open"), api.fetch)
+    cache.get_or_fetch("Leads", status.equals("Open"), api.fetch)
+    assert api.requests == 2
+
+
+def test_entries_expire():
+    """Test entries are refetched after their TTL"""
+    api = FakeAirtable()
+    clock = FakeClock()
+    cache = ResultCache(ttl=10, clock=clock)
+    cache.get_or_fetch("Jobs", status.equals("Open"), api.fetch)
+    clock.now += 5
+    cache.get_or_fetch("Jobs", status.equals("Open"), api.fetch)
+    assert api.requests == 1
+    clock.now += 10
+    cache.get_or_fetch("Jobs", status.equals("Open"), api.fetch)
+    assert api.requests == 2
+
+
+def test_per_entry_ttl():
+    """Test a TTL passed to put overrides the default"""
+    clock = FakeClock()
+    cache = ResultCache(ttl=100, clock=clock)
+    cache.put("Jobs", status.equals("Open"), [], ttl=1)
+    clock.now += 2
+    assert cache.get("Jobs", status.equals("Open")) is None
+
+
+def test_lru_eviction_by_bytes():
+    """Test least recently used entries are evicted past the byte limit"""
+    cache = ResultCache(max_bytes=200)
+    records = [{"id": "rec1", "fields": {"Notes": "x" * 50}}]
+    cache.put("Jobs", "{A}", records)
+    cache.put("Jobs", "{B}", records)
+    cache.get("Jobs", "{A}")
+    cache.put("Jobs", "{C}", records)
+    assert cache.get("Jobs", "{A}") == records
+    assert cache.get("Jobs", "{B}") is None
+    assert cache.size <= 200
+
+
+def test_field_invalidation_is_targeted():
+    """Test only entries referencing a changed field are dropped"""
+    cache = ResultCache()
+    cache.put("Jobs", status.equals("Open"), [])
+    cache.put("Jobs", count.greater_than(1), [])
+    cache.put("Leads", status.equals("Open"), [])
+    assert cache.invalidate_fields("Jobs", ["Status"]) == 1
+    assert cache.get("Jobs", status.equals("Open")) is None
+    assert cache.get("Jobs", count.greater_than(1)) == []
+    assert cache.get("Leads", status.equals("Open")) == []
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    """Test the on-disk tier serves entries to a new cache instance"""
+    path = tmp_path / "cache.sqlite"
+    records = [{"id": "rec1", "fields": {"Status": "Open"}}]
+    cache = ResultCache(path=path)
+    cache.put("Jobs", status.equals("Open"), records)
+    cache.close()
+
+    reopened = ResultCache(path=path)
+    assert reopened.get("Jobs", status.equals("Open")) == records
+    reopened.invalidate_fields("Jobs", ["Status"])
+    reopened.close()
+
+    assert ResultCache(path=path).get("Jobs", status.equals("Open")) is None
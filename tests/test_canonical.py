@@ -0,0 +1,62 @@
+from airtableformulahelpers import AND, IF, OR, DateField, NumberField, TextField
+from airtableformulahelpers.canonical import canonical_node, canonicalize, fingerprint
+from airtableformulahelpers.formula import parse
+
+
+def test_commutative_arguments_are_sorted():
+    """Test argument order of AND/OR does not change the canonical form"""
+    a = TextField(name="Status").equals("Open")
+    b = NumberField(name="Count").greater_than(5)
+    assert canonicalize(AND(a, b)) == canonicalize(AND(b, a))
+    assert fingerprint(OR(a, b)) == fingerprint(OR(b, a))
+
+
+def test_nested_and_duplicate_arguments():
+    """Test nested AND is flattened and duplicates are dropped"""
+    assert canonicalize("AND(a,AND(b,a))") == canonicalize("AND(b,a)")
+
+
+def test_literal_quoting_is_normalized():
+    """Test single and double quoted strings are the same literal"""
+    assert canonicalize("RECORD_ID()='rec1'") == 'RECORD_ID()="rec1"'
+
+
+def test_number_formatting_is_normalized():
+    """Test integral floats from NumberField._compare match their int form"""
+    field = NumberField(name="Count")
+    assert fingerprint(field.equals(5.0)) == fingerprint(field.equals(5))
+    assert fingerprint(field.equals(5.5)) != fingerprint(field.equals(5))
+
+
+def test_whitespace_is_normalized():
+    """Test optional whitespace does not change the fingerprint"""
+    assert fingerprint('IF({A}, "x", "y")') == fingerprint('IF({A},"x","y")')
+    assert fingerprint('FIND("a",{B})>0') == fingerprint('FIND( "a" , {B} ) > 0')
+
+
+def test_comparisons_are_oriented():
+    """Test mirrored comparisons share a canonical form"""
+    assert fingerprint("{A}<1") == fingerprint("1>{A}")
+    assert fingerprint('{A}="x"') == fingerprint('"x"={A}')
+    assert fingerprint("{A}<1") != fingerprint("{A}>1")
+
+
+def test_non_commutative_order_is_kept():
+    """Test argument order of other functions is significant"""
+    assert fingerprint('FIND("a", {B})') != fingerprint('FIND({B}, "a")')
+    assert fingerprint(IF("{A}").THEN("1").ELSE("2")) != fingerprint(IF("{A}").THEN("2").ELSE("1"))
+
+
+def test_canonical_form_is_stable():
+    """Test canonicalizing twice gives the same result"""
+    date = DateField(name="Due")
+    formula = OR(date.is_before("2024-01-01"), TextField(name="Name").contains("x"))
+    once = canonicalize(formula)
+    assert canonicalize(once) == once
+    assert canonical_node(once) == parse(once)
+
+
+def test_fingerprint_is_128_bits():
+    """Test fingerprints are 32 hex characters"""
+    assert len(fingerprint("{A}")) == 32
+    assert fingerprint(parse("{A}")) == fingerprint("{A}")
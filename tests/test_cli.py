@@ -0,0 +1,136 @@
+import json
+
+from typer.testing import CliRunner
+
+from cli import app
+
+runner = CliRunner()
+
+NDJSON = "".join(
+    json.dumps({"id": f"rec{i}", "fields": {"Status": status, "Count": i}}) + "\n"
+    for i, status in enumerate(["Open", "Done", "Open", "Blocked"])
+)
+
+
+def test_example():
+    """Test the example command prints a formula"""
+    result = runner.invoke(app, ["example"])
+    assert result.exit_code == 0
+    assert "{Lab Code}" in result.output
+
+
+def test_filter_formula_from_stdin():
+    """Test filtering NDJSON from stdin with a raw formula"""
+    result = runner.invoke(app, ["filter", "-f", '{Status}="Open"'], input=NDJSON)
+    assert result.exit_code == 0, result.output
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    assert [json.loads(line)["id"] for line in lines] == ["rec0", "rec2"]
+
+
+def test_filter_spec_file_to_output(tmp_path):
+    """Test filtering a CSV file with a formula from a spec"""
+    (tmp_path / "jobs.csv").write_text("id,Status,Count\nrec1,Open,3\nrec2,Done,12\n")
+    (tmp_path / "spec.json").write_text(
+        json.dumps(
+            {
+                "fields": {"Count": "number"},
+                "formulas": {"big": {"field": "Count", "op": "greater_than", "value": 5}},
+            }
+        )
+    )
+    out = tmp_path / "out.csv"
+    result = runner.invoke(
+        app,
+        [
+            "filter",
+            str(tmp_path / "jobs.csv"),
+            "--spec",
+            str(tmp_path / "spec.json"),
+            "-o",
+            str(out),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert out.read_text().splitlines() == ["id,Status,Count", "rec2,Done,12"]
+
+
+def test_filter_needs_one_formula_source():
+    """Test --formula and --spec are mutually exclusive and one is required"""
+    assert runner.invoke(app, ["filter"], input=NDJSON).exit_code != 0
+    assert runner.invoke(app, ["filter", "-f", "{A}="], input=NDJSON).exit_code != 0
+
+
+def test_compile_streams_ndjson(tmp_path):
+    """Test compile writes one NDJSON line per formula in spec order"""
+    (tmp_path / "a.json").write_text(
+        json.dumps({"formulas": {"open": {"field": "Status", "op": "equals", "value": "Open"}}})
+    )
+    (tmp_path / "b.json").write_text(json.dumps({"formulas": {"raw": "{A}>1", "id": {"id": "r"}}}))
+    result = runner.invoke(app, ["compile", str(tmp_path / "a.json"), str(tmp_path / "b.json")])
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert [(line["spec"][-6:], line["name"]) for line in lines] == [
+        ("a.json", "open"),
+        ("b.json", "raw"),
+        ("b.json", "id"),
+    ]
+    assert lines[0]["formula"] == '{Status}="Open"'
+
+
+def test_compile_reports_errors(tmp_path):
+    """Test a formula that does not build is reported and fails the run"""
+    (tmp_path / "spec.json").write_text(json.dumps({"formulas": {"bad": {"field": "A"}}}))
+    result = runner.invoke(app, ["compile", str(tmp_path / "spec.json")])
+    assert result.exit_code == 1
+    assert '"error"' in result.stdout
+
+
+def test_compile_cache_and_watch(tmp_path, monkeypatch):
+    """Test cached builds and that --watch emits only the entries an edit touched"""
+    spec = tmp_path / "spec.json"
+    formulas = {"a": "{A}>1", "b": "{B}>2"}
+    spec.write_text(json.dumps({"formulas": formulas}))
+    args = ["compile", str(spec), "--cache-file", str(tmp_path / "cache.json")]
+    assert runner.invoke(app, args).exit_code == 0
+    assert "2 from cache" in runner.invoke(app, args).stderr
+
+    def one_edit(paths, interval):
+        spec.write_text(json.dumps({"formulas": {**formulas, "b": "{B}>3"}}))
+        yield [spec]
+
+    monkeypatch.setattr("cli.watch_files", one_edit)
+    result = runner.invoke(app, [*args, "--watch"])
+    lines = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert [(line["name"], line["formula"]) for line in lines] == [
+        ("a", "{A}>1"),
+        ("b", "{B}>2"),
+        ("b", "{B}>3"),
+    ]
+
+
+def test_synth_writes_formulas_records_and_schema(tmp_path):
+    """Test synth is deterministic and writes records and a schema on request"""
+    args = ["synth", "-n", "5", "--seed", "4", "--records", "3"]
+    args += ["--records-output", str(tmp_path / "records.ndjson")]
+    args += ["--schema-output", str(tmp_path / "schema.json")]
+    first = runner.invoke(app, args)
+    assert first.exit_code == 0, first.output
+    assert first.stdout == runner.invoke(app, args).stdout
+    lines = [json.loads(line) for line in first.stdout.splitlines() if line.startswith("{")]
+    assert [line["name"] for line in lines] == [f"synthetic_{i}" for i in range(5)]
+    assert len((tmp_path / "records.ndjson").read_text().splitlines()) == 3
+    assert json.loads((tmp_path / "schema.json").read_text())["tables"]
+    assert runner.invoke(app, ["synth", "--mix", "emoji=1"]).exit_code == 2
+
+
+def test_explain_prints_counts_per_node(tmp_path):
+    """Test explain shows match counts for each condition of the formula"""
+    records = tmp_path / "records.ndjson"
+    records.write_text(
+        "".join(json.dumps({"id": f"rec{i}", "fields": {"N": i}}) + "\n" for i in range(10))
+    )
+    result = runner.invoke(app, ["explain", str(records), "-f", "AND({N}>2,{N}<5)"])
+    assert result.exit_code == 0, result.output
+    assert "2/10" in result.stdout
+    assert "7/10" in result.stdout
+    assert "{N}<5" in result.stdout
@@ -0,0 +1,177 @@
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+from airtableformulahelpers import OR, NumberField, TextField
+from airtableformulahelpers.evaluate import matches
+
+httpx = pytest.importorskip("httpx")
+AsyncClient = pytest.importorskip("airtableformulahelpers.client").AsyncClient
+
+status = TextField(name="Status")
+count = NumberField(name="Count")
+
+
+class FakeServer:
+    """Local Airtable list endpoint that filters with the evaluator and paginates"""
+
+    def __init__(self, records, delay=0.0):
+        self.records = records
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.auth = set()
+
+    async def handle(self, request):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            self.auth.add(request.headers["Authorization"])
+            params = request.url.params
+            formula = params["filterByFormula"]
+            size = int(params["pageSize"])
+            start = int(params.get("offset", 0))
+            found = [r for r in self.records if matches(formula, r["fields"], r["id"])]
+            page = found[start : start + size]
+            body = {"records": page}
+            if start + size < len(found):
+                body["offset"] = str(start + size)
+            return httpx.Response(200, json=body)
+        finally:
+            self.in_flight -= 1
+
+
+def _records(n):
+    return [
+        {"id": f"rec{i}", "fields": {"Status": "Open" if i % 2 else "Closed", "Count": i}}
+        for i in range(n)
+    ]
+
+
+def _client(server, **kwargs):
+    http = httpx.AsyncClient(
+        transport=httpx.MockTransport(server.handle), base_url="https://fake.local/v0"
+    )
+    return AsyncClient("app1", "token", http=http, **kwargs)
+
+
+def test_records_follow_offsets():
+    """Test all pages of a query are streamed"""
+    server = FakeServer(_records(25))
+
+    async def run():
+        async with _client(server, page_size=10) as client:
+            records = await client.fetch_all("Jobs", status.equals("Open"))
+            return records, client.requests
+
+    records, requests = asyncio.run(run())
+    assert [r["id"] for r in records] == [f"rec{i}" for i in range(1, 25, 2)]
+    assert requests == 2
+    assert server.auth == {"Bearer token"}
+
+
+def test_records_many_runs_concurrently_with_bound():
+    """Test many formulas run concurrently without exceeding the concurrency limit"""
+    server = FakeServer(_records(40), delay=0.01)
+    queries = {f"gt{n}": ("Jobs", count.greater_than(n)) for n in range(0, 40, 5)}
+
+    async def run():
+        async with _client(server, max_concurrency=3, page_size=5) as client:
+            return [pair async for pair in client.records_many(queries)]
+
+    pairs = asyncio.run(run())
+    by_name = {}
+    for name, record in pairs:
+        by_name.setdefault(name, []).append(record["id"])
+    assert len(by_name["gt0"]) == 39
+    assert len(by_name["gt35"]) == 4
+    assert 1 < server.peak <= 3
+
+
+def test_errors_propagate():
+    """Test HTTP errors surface to the consumer"""
+
+    async def fail(request):
+        return httpx.Response(422, json={"error": "INVALID_FILTER_BY_FORMULA"})
+
+    async def run():
+        http = httpx.AsyncClient(transport=httpx.MockTransport(fail), base_url="https://x")
+        async with AsyncClient("app1", "token", http=http) as client:
+            async for _ in client.records_many({"bad": ("Jobs", "{A")}):
+                pass
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+
+def test_records_many_stops_early():
+    """Test leaving records_many early with a full buffer cancels the queries and returns"""
+    server = FakeServer(_records(50))
+    queries = {f"gt{n}": ("Jobs", count.greater_than(n)) for n in range(5)}
+
+    async def run():
+        async with _client(server, page_size=10) as client:
+            async with aclosing(client.records_many(queries, buffer=2)) as pairs:
+                async for pair in pairs:
+                    await asyncio.sleep(0.01)
+                    return pair
+
+    name, _ = asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert name in queries
+
+
+def test_table_names_are_quoted():
+    """Test table names with path and query characters stay one path segment"""
+    paths = []
+
+    async def handle(request):
+        paths.append(request.url.raw_path.split(b"?")[0])
+        return httpx.Response(200, json={"records": []})
+
+    async def run():
+        http = httpx.AsyncClient(transport=httpx.MockTransport(handle), base_url="https://x/v0")
+        async with AsyncClient("app1", "token", http=http) as client:
+            for table in ("Jobs/Archive", "Q&A #2", "What?"):
+                await client.fetch_all(table, "{A}")
+
+    asyncio.run(run())
+    assert paths == [
+        b"/v0/app1/Jobs%2FArchive",
+        b"/v0/app1/Q%26A%20%232",
+        b"/v0/app1/What%3F",
+    ]
+
+
+def test_fetch_split_runs_parts_and_merges():
+    """Test an over-budget OR is fetched as several queries with each record once"""
+    server = FakeServer(_records(60))
+    formula = OR(*(count.equals(i) for i in range(0, 60, 2)), status.equals("Open"))
+
+    async def run():
+        async with _client(server) as client:
+            found = await client.fetch_split("tbl", formula, budget=200)
+            return found, client.requests
+
+    found, requests = asyncio.run(run())
+    assert requests > 1
+    assert sorted(int(r["id"][3:]) for r in found) == list(range(60))
+
+
+def test_scheduler_client_executor_counts_pages():
+    """Test the scheduler takes a token for each page the client fetches"""
+    from airtableformulahelpers.scheduler import Scheduler, client_executor
+
+    server = FakeServer(_records(40))
+
+    async def run():
+        async with _client(server, page_size=5) as client:
+            executor = client_executor({"app1": client})
+            async with Scheduler(executor, rate=1000, paginated=True) as scheduler:
+                found = await scheduler.submit("app1", "Jobs", status.equals("Open"))
+                return found, client.requests, scheduler.stats
+
+    found, requests, stats = asyncio.run(run())
+    assert len(found) == 20
+    assert requests == stats.executed == 4
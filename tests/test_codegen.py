@@ -0,0 +1,92 @@
+import importlib
+import json
+import sys
+
+import pytest
+
+from airtableformulahelpers import BooleanField, DateField, NumberField, TextField
+from airtableformulahelpers.codegen import (
+    class_name,
+    constant_name,
+    generate_package,
+    module_name,
+)
+
+SCHEMA = {
+    "tables": [
+        {
+            "id": "tblJobs",
+            "name": "Work Orders",
+            "fields": [
+                {"id": "fld1", "name": "Due Date", "type": "dateTime"},
+                {"id": "fld2", "name": "due-date", "type": "number"},
+                {"id": "fld3", "name": "1st", "type": "checkbox"},
+                {"id": "fld4", "name": 'Say "hi"', "type": "singleLineText"},
+            ],
+        },
+        {"id": "tblPeople", "name": "People", "fields": [{"name": "Name", "type": "email"}]},
+    ]
+}
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path / "basefields"
+    for name in [name for name in sys.modules if name.startswith("basefields")]:
+        del sys.modules[name]
+
+
+def test_names():
+    """Test schema names become Python identifiers"""
+    assert constant_name("Due Date") == "DUE_DATE"
+    assert constant_name("1st") == "F_1ST"
+    assert class_name("work orders") == "WorkOrders"
+    assert module_name("Work Orders") == "work_orders"
+    assert module_name("class") == "t_class"
+    assert class_name("None") == "None_"
+    assert class_name("true") == "True_"
+
+
+def test_keyword_table_names_import(package):
+    """Test tables named after Python keywords generate importable modules"""
+    schema = {
+        "tables": [
+            {"name": name, "fields": [{"name": "Name", "type": "singleLineText"}]}
+            for name in ("None", "True", "false", "class")
+        ]
+    }
+    generate_package(schema, package)
+    basefields = importlib.import_module("basefields")
+    assert basefields.__all__ == ["Class", "False_", "None_", "True_"]
+    assert basefields.None_.NAME == TextField(name="Name")
+
+
+def test_generated_package_imports(package):
+    """Test the generated package defines typed field constants per table"""
+    generate_package(SCHEMA, package)
+    basefields = importlib.import_module("basefields")
+    orders = basefields.WorkOrders
+    assert isinstance(orders.DUE_DATE, DateField)
+    assert orders.DUE_DATE_2 == NumberField(name="due-date")
+    assert isinstance(orders.F_1ST, BooleanField)
+    assert orders.SAY_HI == TextField(name='Say "hi"')
+    assert basefields.People.NAME.equals("x") == '{Name}="x"'
+    assert basefields.__all__ == ["People", "WorkOrders"]
+
+
+def test_regeneration_is_incremental(package, tmp_path):
+    """Test only changed tables are rewritten and removed tables deleted"""
+    schema_file = tmp_path / "schema.json"
+    schema_file.write_text(json.dumps(SCHEMA))
+    assert len(generate_package(schema_file, package)) == 3
+    assert generate_package(schema_file, package) == []
+
+    changed = json.loads(json.dumps(SCHEMA))
+    changed["tables"][1]["fields"].append({"name": "Age", "type": "number"})
+    assert generate_package(changed, package) == [package / "people.py"]
+
+    del changed["tables"][0]
+    written = generate_package(changed, package)
+    assert written == [package / "work_orders.py", package / "__init__.py"]
+    assert not (package / "work_orders.py").exists()
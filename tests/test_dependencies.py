@@ -0,0 +1,66 @@
+from airtableformulahelpers import AND, IF, OR, DateField, NumberField, TextField
+from airtableformulahelpers.dependencies import (
+    DependencyIndex,
+    fields_projection,
+    list_request_params,
+    referenced_fields,
+    referenced_fields_many,
+)
+from airtableformulahelpers.formula import parse
+
+status = TextField(name="Status")
+count = NumberField(name="Count")
+due = DateField(name="Due Date")
+
+
+def test_referenced_fields():
+    """Test field references are extracted from helper output"""
+    formula = AND(status.contains("open"), count.greater_than(3), due.is_before().days_ago(2))
+    assert referenced_fields(formula) == {"Status", "Count", "Due Date"}
+
+
+def test_referenced_fields_ignores_string_literals():
+    """Test braces inside string literals are not field references"""
+    formula = IF(status.equals("{Not a field}")).THEN("{Nor this}", string=True).ELSE("{Count}")
+    assert referenced_fields(formula) == {"Status", "Count"}
+
+
+def test_referenced_fields_from_tree():
+    """Test trees and strings give the same fields"""
+    formula = OR(status.equals("a"), count.equals(1))
+    assert referenced_fields(parse(formula)) == referenced_fields(formula)
+
+
+def test_referenced_fields_many():
+    """Test a batch of formulas gives the union of their fields"""
+    assert referenced_fields_many([status.equals("a"), count.equals(1)]) == {"Status", "Count"}
+
+
+def test_dependency_index():
+    """Test the index maps fields back to the formulas that reference them"""
+    index = DependencyIndex()
+    index.add("open", status.equals("Open"))
+    index.add("big", AND(status.equals("Open"), count.greater_than(10)))
+    assert index.affected(["Count"]) == {"big"}
+    assert index.affected(["Status", "Other"]) == {"open", "big"}
+    index.remove("big")
+    assert index.affected(["Count"]) == set()
+    assert len(index) == 1
+
+
+def test_fields_projection():
+    """Test the projection lists output fields first, then filter fields"""
+    formula = AND(status.equals("Open"), count.greater_than(10))
+    assert fields_projection(formula, ["Name", "Status"]) == ["Name", "Status", "Count"]
+    assert fields_projection(formula, ["Name"], include_filter_fields=False) == ["Name"]
+    assert fields_projection([status.equals("a"), count.equals(1)]) == ["Count", "Status"]
+
+
+def test_list_request_params():
+    """Test list request parameters carry the formula and projection"""
+    formula = status.equals("Open")
+    assert list_request_params(formula, ["Name"]) == [
+        ("filterByFormula", formula),
+        ("fields[]", "Name"),
+        ("fields[]", "Status"),
+    ]
@@ -0,0 +1,122 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from airtableformulahelpers import (
+    AND,
+    IF,
+    NOT,
+    OR,
+    XOR,
+    AttachmentsField,
+    BooleanField,
+    DateField,
+    NumberField,
+    TextField,
+    TextListField,
+    id_equals,
+)
+from airtableformulahelpers.evaluate import EvaluationError, Row, compile_formula, evaluate, matches
+from airtableformulahelpers.formula import Members
+
+NOW = datetime(2024, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def test_text_field_conditions():
+    """Test text helpers evaluate like Airtable"""
+    email = TextField(name="Email")
+    record = {"Email": "  Jane@Example.COM "}
+    assert matches(email.contains("example"), record)
+    assert not matches(email.contains("example", case_sensitive=True), record)
+    assert matches(email.ends_with(".com"), record)
+    assert not matches(email.not_ends_with(".com"), record)
+    assert matches(email.starts_with("jane"), record)
+    assert matches(email.not_contains("other"), record)
+    assert matches(email.regex_match(r"@\w+\."), record)
+    assert not matches(email.equals("jane@example.com"), record)
+
+
+def test_blank_values():
+    """Test empty and missing fields are blank"""
+    name = TextField(name="Name")
+    assert matches(name.is_empty(), {})
+    assert matches(name.is_empty(), {"Name": ""})
+    assert not matches(name.is_not_empty(), {"Name": ""})
+    assert matches(name.is_not_empty(), {"Name": "x"})
+
+
+def test_number_and_boolean_conditions():
+    """Test number and checkbox comparisons"""
+    count = NumberField(name="Count")
+    done = BooleanField(name="Done")
+    assert matches(count.greater_than(2), {"Count": 3})
+    assert not matches(count.greater_than(2), {})
+    assert matches(count.equals(2.0), {"Count": 2})
+    assert matches(done.is_false(), {})
+    assert matches(done.is_true(), {"Done": True})
+
+
+def test_list_fields():
+    """Test list fields use item text and item counts"""
+    tags = TextListField(name="Tags")
+    files = AttachmentsField(name="Files")
+    record = {"Tags": ["Red", "Blue"], "Files": [{"filename": "a.png"}, {"filename": "b.png"}]}
+    assert matches(tags.contains_all(["red", "blue"]), record)
+    assert not matches(tags.contains_any(["green"]), record)
+    assert matches(files.count_is(2), record)
+    assert matches(files.is_empty(), {})
+
+
+def test_date_conditions():
+    """Test date helpers against ISO strings from the API"""
+    due = DateField(name="Due")
+    record = {"Due": "2024-06-10T00:00:00.000Z"}
+    assert matches(due.is_after("2024-06-01"), record, now=NOW)
+    assert matches(due.is_on("2024-06-10"), record, now=NOW)
+    assert matches(due.is_before().days_ago(3), record, now=NOW)
+    assert not matches(due.is_before().weeks_ago(1), record, now=NOW)
+    assert matches(due.is_on().months_ago(0), record, now=NOW)
+
+
+def test_logic_and_if():
+    """Test logical functions and IF values"""
+    a, b = "{A}", "{B}"
+    record = {"A": 1, "B": 0}
+    assert matches(OR(a, b), record)
+    assert not matches(AND(a, b), record)
+    assert matches(XOR(a, b), record)
+    assert matches(NOT(b), record)
+    assert evaluate(IF(a).THEN("yes", string=True).ELSE("no", string=True), record) == "yes"
+    assert evaluate('IF({B}, "x")', record) is None
+
+
+def test_record_id_and_operators():
+    """Test RECORD_ID, concatenation and arithmetic"""
+    assert matches(id_equals("rec1"), {}, record_id="rec1")
+    assert evaluate('{A} & "-" & {B}', {"A": "x", "B": 2}) == "x-2"
+    assert evaluate("({A} + 1) * 2", {"A": 3}) == 8
+    assert evaluate("{A} / 0", {"A": 3}) is None
+    assert evaluate('SWITCH({A}, "a", 1, "b", 2, 3)', {"A": "b"}) == 2
+
+
+def test_compiled_formula_is_reusable():
+    """Test a compiled formula evaluates many rows"""
+    check = compile_formula(NumberField(name="N").less_than(5))
+    assert [check(Row({"N": n})) for n in range(3, 7)] == [True, True, False, False]
+
+
+def test_unsupported_formula():
+    """Test unknown functions and identifiers are rejected"""
+    with pytest.raises(EvaluationError):
+        evaluate("UNKNOWN_FN({A})", {})
+    with pytest.raises(EvaluationError):
+        evaluate("AND(a,b)", {})
+
+
+def test_members_membership():
+    """Test membership nodes match like the OR of equalities they stand for"""
+    ids = Members.record_ids([f"rec{i}" for i in range(100)])
+    assert matches(ids, {}, "rec42") and not matches(ids, {}, "rec100")
+    codes = Members.field_equals("Code", ["1", "2", ""])
+    for fields in ({"Code": "2"}, {"Code": 2}, {"Code": None}, {"Code": "3"}, {"Code": 3.5}):
+        assert matches(codes, fields) == matches(codes.expand(), fields)
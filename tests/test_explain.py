@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from airtableformulahelpers import AND, IF, OR, DateField, NumberField, TextField
+from airtableformulahelpers.explain import explain
+from airtableformulahelpers.formula import parse, walk
+
+name = TextField(name="Name")
+count = NumberField(name="Count")
+records = [{"Name": "ada" if i % 2 else "bob", "Count": i} for i in range(10)]
+
+
+def test_counts_follow_short_circuiting():
+    """Test each node counts the records reaching it and those it matched"""
+    report = explain(AND(name.equals("ada"), count.greater_than(4)), records)
+    assert (report.evaluated, report.matched) == (10, 3)
+    first, second = report.children
+    assert (first.evaluated, first.matched) == (10, 5)
+    assert (second.evaluated, second.matched) == (5, 3)
+    assert second.selectivity == 0.6
+    assert first.text == '{Name}="ada"'
+
+
+def test_tree_mirrors_the_formula():
+    """Test every node of the formula gets a step, in order, with inclusive times"""
+    formula = IF(OR(count.equals(1), count.equals(2))).THEN("1").ELSE("0")
+    report = explain(formula, records)
+    assert [step.node for step in report.walk()] == list(walk(parse(formula)))
+    assert report.seconds >= sum(child.seconds for child in report.children)
+    assert report.self_seconds >= 0
+
+
+def test_unreached_nodes_and_ndjson_input():
+    """Test NDJSON records work and nodes never reached have no selectivity"""
+    due = DateField(name="Due")
+    formula = AND(count.greater_than(100), due.is_before().days_ago(3))
+    lines = ['{"id": "rec1", "fields": {"Count": 5, "Due": "2024-01-01"}}']
+    report = explain(formula, lines, now=datetime(2024, 2, 1))
+    assert report.children[1].evaluated == 0
+    assert report.children[1].selectivity is None
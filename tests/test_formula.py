@@ -0,0 +1,186 @@
+import pickle
+
+import pytest
+
+from airtableformulahelpers import (
+    AND,
+    IF,
+    NOT,
+    OR,
+    AttachmentsField,
+    DateField,
+    NumberField,
+    TextField,
+    TextListField,
+    id_equals,
+)
+from airtableformulahelpers.evaluate import evaluate
+from airtableformulahelpers.formula import (
+    MAX_DEPTH,
+    BinOp,
+    Call,
+    FieldRef,
+    FormulaSyntaxError,
+    LiteralList,
+    Members,
+    Num,
+    Str,
+    compact,
+    parse,
+    pretty,
+    render,
+    walk,
+)
+
+
+def test_parse_field_comparison():
+    """Test parsing a simple field comparison"""
+    assert parse('{Name}="John"') == BinOp("=", FieldRef("Name"), Str("John"))
+
+
+def test_parse_function_call():
+    """Test parsing nested function calls"""
+    node = parse('FIND(LOWER("a"), LOWER({Tags}))>0')
+    assert node == BinOp(
+        ">",
+        Call("FIND", (Call("LOWER", (Str("a"),)), Call("LOWER", (FieldRef("Tags"),)))),
+        Num(0),
+    )
+
+
+def test_parse_operator_precedence():
+    """Test arithmetic binds tighter than comparison"""
+    node = parse("{A} = {B} - 1 + 2")
+    assert node == BinOp("=", FieldRef("A"), BinOp("+", BinOp("-", FieldRef("B"), Num(1)), Num(2)))
+
+
+def test_parse_negative_number():
+    """Test parsing negative numbers"""
+    assert parse("{N}=-3") == BinOp("=", FieldRef("N"), Num(-3))
+
+
+def test_parse_escaped_quotes():
+    """Test parsing escaped quotes inside strings"""
+    assert parse(r'"say \"hi\""') == Str('say "hi"')
+
+
+def test_parse_errors():
+    """Test malformed formulas raise FormulaSyntaxError"""
+    for formula in ["AND(", "{A}=", "AND(a))", "{A} ? 1"]:
+        with pytest.raises(FormulaSyntaxError):
+            parse(formula)
+
+
+def test_parse_depth_limit():
+    """Test nesting up to MAX_DEPTH parses and evaluates, and deeper is a syntax error"""
+    chain = '"none"'
+    for i in range(MAX_DEPTH):
+        chain = IF(f"{{Count}}={i}").THEN(f'"v{i}"').ELSE(chain)
+    assert evaluate(chain, {"Count": MAX_DEPTH - 1}) == f"v{MAX_DEPTH - 1}"
+    assert evaluate(chain, {"Count": -1}) == "none"
+    for formula in [
+        IF("{Count}=0").THEN('"v"').ELSE(chain),
+        "NOT(" * (MAX_DEPTH + 1) + "{A}" + ")" * (MAX_DEPTH + 1),
+        "(" * (MAX_DEPTH + 1) + "1" + ")" * (MAX_DEPTH + 1),
+        "-" * (MAX_DEPTH + 1) + "{A}",
+    ]:
+        with pytest.raises(FormulaSyntaxError, match="levels deep"):
+            parse(formula)
+
+
+def test_render_round_trips_helper_output():
+    """Test every helper's output renders back unchanged"""
+    text = TextField(name="Email")
+    number = NumberField(name="Count")
+    date = DateField(name="Due")
+    formulas = [
+        text.equals("a"),
+        text.contains("x"),
+        text.ends_with(".com"),
+        text.not_ends_with(".com", case_sensitive=True, trim=False),
+        text.regex_match(r"^\d{3}-\d{4}$"),
+        number.greater_than(5.5),
+        number.equals(-3),
+        date.is_on("2023-01-01"),
+        date.is_before().days_ago(3),
+        IF(AND(text.equals("x"), number.less_than(2))).THEN("yes", string=True).ELSE("0"),
+        TextListField(name="Tags").contains_any(["a", "b"]),
+        id_equals("rec123"),
+        AttachmentsField(name="Files").count_is(2),
+        NOT(text.is_empty()),
+        OR(text.is_not_empty(), number.is_empty()),
+        'IF({Code}="063", "Product " & {Package} & "\\n", "")',
+    ]
+    for formula in formulas:
+        assert render(parse(formula)) == formula
+
+
+def test_render_adds_required_parentheses():
+    """Test parentheses are kept where precedence requires them"""
+    assert render(parse("({A}+1)*2")) == "({A} + 1) * 2"
+    assert render(parse("{A}-({B}-1)")) == "{A} - ({B} - 1)"
+
+
+def test_compact_drops_optional_bytes():
+    """Test compact mode removes whitespace and shortens quotes and numbers"""
+    formula = IF(NumberField(name="N").equals(1.0)).THEN("a, b", string=True).ELSE("2.5e+20")
+    assert compact(formula) == 'IF({N}=1,"a, b",2.5e20)'
+    assert compact("DATETIME_DIFF(NOW(), {Due}, 'days') > 3 - 1") == (
+        'DATETIME_DIFF(NOW(),{Due},"days")>3-1'
+    )
+    assert render(Str('say "hi"'), "compact") == "'say \"hi\"'"
+    assert compact("({A} + 1) * 2") == "({A}+1)*2"
+
+
+def test_compact_and_pretty_parse_back_to_the_same_tree():
+    """Test compact and pretty output parse back to the formula they were rendered from"""
+    formula = AND(
+        TextField(name="Email").ends_with(".com"),
+        DateField(name="Due").is_before().days_ago(3),
+        TextListField(name="Tags").contains_any(["alpha", "beta", "gamma"]),
+    )
+    assert compact(parse(compact(formula))) == compact(formula)
+    assert parse(pretty(formula, width=40)) == parse(formula)
+
+
+def test_pretty_splits_long_calls():
+    """Test pretty mode keeps short calls on one line and indents long ones"""
+    assert pretty("AND({A}, {B})") == "AND({A},{B})"
+    assert pretty('OR({Name}="alpha",{Name}="beta")', width=20) == (
+        'OR(\n  {Name}="alpha",\n  {Name}="beta"\n)'
+    )
+    with pytest.raises(ValueError):
+        render(parse("{A}"), "tiny")  # type: ignore[arg-type]
+
+
+def test_walk_visits_every_node():
+    """Test walk yields parents before children"""
+    nodes = list(walk(parse('AND({A}="x",{B})')))
+    assert isinstance(nodes[0], Call)
+    assert [n.name for n in nodes if isinstance(n, FieldRef)] == ["A", "B"]
+
+
+def test_literal_list_packs_values():
+    """Test a literal list indexes, slices, iterates and tests membership like a list"""
+    values = LiteralList(["rec1", "", "ünï", "rec4"])
+    assert len(values) == 4
+    assert list(values) == ["rec1", "", "ünï", "rec4"]
+    assert (values[2], values[-1]) == ("ünï", "rec4")
+    assert list(values[1:3]) == ["", "ünï"]
+    assert "ünï" in values and "" in values and "rec5" not in values and 4 not in values
+    assert values == LiteralList(["rec1", "", "ünï", "rec4"]) != LiteralList(["rec1"])
+    assert LiteralList() != LiteralList([""])
+    assert "rec4" in pickle.loads(pickle.dumps(values))
+    with pytest.raises(ValueError):
+        LiteralList(["a\0b"])
+
+
+def test_members_render_like_the_or_they_replace():
+    """Test a membership node renders the OR of equalities the helpers would build"""
+    ids = Members.record_ids(["rec1", "rec2"])
+    assert render(ids) == OR(id_equals("rec1"), id_equals("rec2"))
+    assert parse(render(ids)) == ids.expand()
+    tags = Members.field_equals("Tag", ['say "hi"', "x\\"])
+    assert parse(render(tags)) == tags.expand()
+    assert render(tags, "compact") == "OR({Tag}='say \"hi\"',{Tag}='x\\\\')"
+    assert render(Members.field_equals("Tag", [])) == "FALSE()"
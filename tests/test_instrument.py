@@ -0,0 +1,61 @@
+import pytest
+
+import airtableformulahelpers
+from airtableformulahelpers import IF, DateField, TextField, instrument
+from airtableformulahelpers.evaluate import evaluate
+
+
+@pytest.fixture(autouse=True)
+def _disabled():
+    yield
+    instrument.disable()
+
+
+def test_disabled_leaves_helpers_untouched():
+    """Test helpers are the original functions until instrumentation is enabled"""
+    original = TextField.contains
+    instrument.enable()
+    assert TextField.contains is not original
+    instrument.disable()
+    assert TextField.contains is original
+    assert "__init__" not in TextField.__dict__
+    assert not instrument.is_enabled()
+
+
+def test_counts_calls_bytes_and_nodes():
+    """Test helper calls, rendered bytes and constructed nodes are counted"""
+    with instrument.instrumented() as metrics:
+        text = TextField(name="Name")
+        text.equals("Ada")
+        text.equals("Bob")
+        IF(text.is_empty()).THEN("x", string=True).ELSE("y")
+    data = metrics.snapshot()
+    assert data["helpers"]["TextField.equals"]["calls"] == 2
+    assert data["helpers"]["TextField.equals"]["bytes"] == len('{Name}="Ada"') * 2
+    assert data["helpers"]["Field.is_empty"]["calls"] == 1
+    assert data["nodes"] == {"ELSE": 1, "THEN": 1, "TextField": 1}
+
+
+def test_parse_date_and_cache_hits():
+    """Test date parsing is timed and cache hits are reported from enable"""
+    with instrument.instrumented() as metrics:
+        DateField(name="Due").is_after("2024-01-02")
+        evaluate("{A}>12345", {"A": 1})
+        evaluate("{A}>12345", {"A": 1})
+    data = metrics.snapshot()
+    assert data["parse_date"]["calls"] >= 1
+    assert data["parse_date"]["seconds"] > 0
+    assert data["caches"]["evaluate._compiled"]["hits"] >= 1
+
+
+def test_exporters_receive_snapshot():
+    """Test registered exporters get the snapshot when the block ends"""
+    seen = []
+    exporter = instrument.add_exporter(seen.append)
+    try:
+        with instrument.instrumented():
+            # Looked up on the package, since names imported earlier keep the unwrapped function.
+            airtableformulahelpers.AND("1", "2")
+    finally:
+        instrument.remove_exporter(exporter)
+    assert [data["helpers"]["AND"]["calls"] for data in seen] == [1]
@@ -0,0 +1,100 @@
+import itertools
+
+from airtableformulahelpers import AND, NOT, OR, NumberField, TextField
+from airtableformulahelpers.formula import Call, Name, parse
+from airtableformulahelpers.minimize import minimize
+
+
+def _truth(node, assignment):
+    if isinstance(node, Name):
+        return assignment[node.name]
+    assert isinstance(node, Call)
+    values = [_truth(arg, assignment) for arg in node.args]
+    if node.name == "AND":
+        return all(values)
+    if node.name == "OR":
+        return any(values)
+    if node.name == "NOT":
+        return not values[0]
+    return node.name == "TRUE"
+
+
+def _equivalent(a: str, b: str) -> bool:
+    names = sorted({c for c in a if c.islower()})
+    left, right = parse(a), parse(b)
+    for values in itertools.product([False, True], repeat=len(names)):
+        assignment = dict(zip(names, values))
+        if _truth(left, assignment) != _truth(right, assignment):
+            return False
+    return True
+
+
+def test_minimize_absorption():
+    """Test a term absorbs the conjunctions that contain it"""
+    assert minimize("OR(AND(a,b),AND(a,c),a)") == "a"
+
+
+def test_minimize_double_negation():
+    """Test repeated NOT is removed"""
+    assert minimize("NOT(NOT(a))") == "a"
+
+
+def test_minimize_consensus():
+    """Test the consensus term is dropped"""
+    assert minimize("OR(AND(a,b),AND(NOT(a),c),AND(b,c))") == "OR(AND(a,b),AND(NOT(a),c))"
+
+
+def test_minimize_complements():
+    """Test complementary conditions collapse to constants"""
+    assert minimize("AND(a,NOT(a))") == "FALSE()"
+    assert minimize("OR(AND(a,b),AND(a,NOT(b)))") == "a"
+
+
+def test_minimize_field_conditions():
+    """Test leaf conditions from the field helpers are treated as atoms"""
+    status = TextField(name="Status")
+    count = NumberField(name="Count")
+    formula = OR(
+        AND(status.equals("Open"), count.greater_than(5)),
+        AND(status.equals("Open"), NOT(count.greater_than(5))),
+    )
+    assert minimize(formula) == status.equals("Open")
+
+
+def test_minimize_not_equals_is_negation():
+    """Test `!=` cancels against `=` on the same operands"""
+    status = TextField(name="Status")
+    assert minimize(AND(status.equals("a"), status.not_equals("a"))) == "FALSE()"
+    assert minimize(OR(status.equals("a"), status.not_equals("a"))) == "TRUE()"
+
+
+def test_minimize_inside_if_condition():
+    """Test the condition of an IF is minimized"""
+    assert minimize('IF(OR(a,AND(a,b)), "y", "n")') == 'IF(a, "y", "n")'
+
+
+def test_minimize_never_grows():
+    """Test minimization never makes a formula longer"""
+    for formula in ["AND(x,OR(a,b,c))", "NOT(AND(a,b))", "XOR(a,b)"]:
+        assert len(minimize(formula)) <= len(formula)
+
+
+def test_minimize_preserves_meaning():
+    """Test minimized formulas are equivalent on every assignment"""
+    formulas = [
+        "OR(AND(a,b,c),AND(a,b,NOT(c)),AND(a,NOT(b)))",
+        "AND(OR(a,b),OR(a,NOT(b)),OR(c,d))",
+        "OR(AND(a,NOT(b)),AND(NOT(a),b),AND(a,b),AND(c,NOT(c)))",
+        "NOT(OR(AND(a,b),NOT(OR(c,d))))",
+        "AND(OR(a,b,c),OR(NOT(a),b),OR(NOT(b),c),OR(a,NOT(c),d))",
+    ]
+    for formula in formulas:
+        result = minimize(formula)
+        assert _equivalent(formula, result), (formula, result)
+
+
+def test_minimize_term_limit_falls_back():
+    """Test large inputs fall back to algebraic rules within the term limit"""
+    clauses = [OR(f"a{i}", f"b{i}") for i in range(12)]
+    formula = AND(*clauses, clauses[0])
+    assert minimize(formula, max_terms=16) == AND(*clauses)
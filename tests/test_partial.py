@@ -0,0 +1,93 @@
+from airtableformulahelpers import AND, IF, NOT, OR, XOR, DateField, NumberField, TextField
+from airtableformulahelpers.evaluate import matches
+from airtableformulahelpers.formula import Call, Members, render, to_node
+from airtableformulahelpers.partial import specialize
+
+region = TextField(name="Region")
+status = TextField(name="Status")
+count = NumberField(name="Count")
+
+
+def test_decided_condition_is_dropped_from_and():
+    """Test a true condition disappears from AND"""
+    formula = AND(region.equals("EU"), status.equals("Open"))
+    assert specialize(formula, {"Region": "EU"}) == status.equals("Open")
+
+
+def test_false_condition_short_circuits():
+    """Test a false condition decides AND and OR"""
+    assert specialize(AND(region.equals("EU"), status.equals("Open")), {"Region": "US"}) == (
+        "FALSE()"
+    )
+    assert specialize(OR(region.equals("EU"), status.equals("Open")), {"Region": "EU"}) == (
+        "TRUE()"
+    )
+
+
+def test_if_picks_branch():
+    """Test a decided IF condition selects its branch"""
+    formula = IF(region.equals("EU")).THEN("{Price EU}").ELSE("{Price US}")
+    assert specialize(formula, {"Region": "US"}) == "{Price US}"
+
+
+def test_nested_simplification():
+    """Test folding propagates through nested logic"""
+    formula = OR(
+        AND(region.equals("EU"), count.greater_than(5)),
+        AND(NOT(region.equals("EU")), count.greater_than(10)),
+    )
+    assert specialize(formula, {"Region": "EU"}) == count.greater_than(5)
+
+
+def test_xor_with_known_operand():
+    """Test a true XOR operand negates the rest"""
+    assert specialize(XOR(region.equals("EU"), "{Flag}"), {"Region": "EU"}) == "NOT({Flag})"
+
+
+def test_text_helpers_fold():
+    """Test FIND/LOWER/TRIM chains fold wherever their inputs are known"""
+    formula = AND(region.contains("eu"), status.ends_with("done"))
+    assert specialize(formula, {"Region": " EU-West "}) == (
+        'FIND("done", TRIM(LOWER({Status}))) = LEN(TRIM(LOWER({Status}))) - 4 + 1'
+    )
+
+
+def test_unknown_fields_and_volatile_calls_are_kept():
+    """Test residual parts stay unchanged"""
+    due = DateField(name="Due")
+    formula = AND(due.is_before().days_ago(1), status.equals("Open"))
+    assert specialize(formula, {}) == formula
+
+
+def test_residual_agrees_with_full_evaluation():
+    """Test the residual formula gives the same answers as the original"""
+    formula = OR(
+        AND(region.equals("EU"), count.greater_than(5)),
+        IF(region.equals("US")).THEN(status.equals("Open")).ELSE("FALSE()"),
+    )
+    for tenant in ["EU", "US", "APAC"]:
+        residual = specialize(formula, {"Region": tenant})
+        for fields in [{"Count": 6, "Status": "Open"}, {"Count": 1, "Status": "Closed"}]:
+            record = {**fields, "Region": tenant}
+            assert matches(residual, record) == matches(formula, record)
+
+
+def test_unsupported_functions_are_kept():
+    """Test calls the local evaluator cannot compute stay in the residual formula"""
+    formula = 'AND({Region}="EU", SUM(1,2)>{A})'
+    assert specialize(formula, {"Region": "EU"}) == "SUM(1, 2)>{A}"
+    formula = 'DATETIME_FORMAT({D}, "YYYY")="2024"'
+    assert specialize(formula, {"D": "2024-03-01"}) == (
+        'DATETIME_FORMAT("2024-03-01", "YYYY")="2024"'
+    )
+
+
+def test_members_fold_when_target_is_known():
+    """Test a membership test on a known field folds like the equivalent OR"""
+    members = Members.field_equals("Region", ["EU", "UK"])
+    formula = Call("AND", (members, to_node(status.equals("Open"))))
+    assert specialize(members, {"Region": "UK"}) == "TRUE()"
+    assert specialize(members, {"Region": "US"}) == specialize(members.expand(), {"Region": "US"})
+    assert specialize(formula, {"Region": "UK"}) == status.equals("Open")
+    assert specialize(formula, {"Region": "US"}) == "FALSE()"
+    assert specialize(formula, {"Status": "Open"}) == render(members)
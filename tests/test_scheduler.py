@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+import pytest
+
+from airtableformulahelpers import AND, NumberField, TextField
+from airtableformulahelpers.scheduler import RateLimitedError, Scheduler, TokenBucket
+
+status = TextField(name="Status")
+count = NumberField(name="Count")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_rate():
+    """Test the bucket allows a burst then spaces requests at the rate"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=5, capacity=2, clock=clock)
+    assert bucket.delay() == 0
+    assert bucket.delay() == 0
+    assert bucket.delay() == pytest.approx(0.2)
+    clock.now += 0.2
+    assert bucket.delay() == 0
+
+
+def test_token_bucket_adapts():
+    """Test a 429 halves the rate and pauses; successes recover it"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=8, clock=clock)
+    bucket.penalize(1.5)
+    assert bucket.rate == 4
+    assert bucket.delay() == pytest.approx(1.5)
+    for _ in range(100):
+        bucket.reward()
+    assert bucket.rate == 8
+
+
+def test_identical_queries_are_coalesced():
+    """Test equivalent formulas in flight share one request"""
+    calls = []
+
+    async def execute(base, table, formula):
+        calls.append(formula)
+        await asyncio.sleep(0.01)
+        return [{"id": "rec1"}]
+
+    async def run():
+        async with Scheduler(execute, rate=100) as scheduler:
+            a = AND(status.equals("Open"), count.greater_than(1))
+            b = AND(count.greater_than(1), status.equals("Open"))
+            results = await asyncio.gather(
+                scheduler.submit("app1", "Jobs", a),
+                scheduler.submit("app1", "Jobs", b),
+                scheduler.submit("app2", "Jobs", a),
+            )
+            return results, scheduler.stats
+
+    results, stats = asyncio.run(run())
+    assert results[0] == results[1] == [{"id": "rec1"}]
+    assert len(calls) == 2
+    assert stats.coalesced == 1
+
+
+def test_priority_lanes():
+    """Test higher priority queries run first"""
+    order = []
+
+    async def execute(base, table, formula):
+        order.append(formula)
+
+    async def run():
+        async with Scheduler(execute, rate=1000, max_in_flight=1) as scheduler:
+            blocker = asyncio.create_task(scheduler.submit("app1", "T", "{Blocker}"))
+            await asyncio.sleep(0)
+            await asyncio.gather(
+                scheduler.submit("app1", "T", "{Low}", priority="low"),
+                scheduler.submit("app1", "T", "{Normal}"),
+                scheduler.submit("app1", "T", "{High}", priority="high"),
+            )
+            await blocker
+
+    asyncio.run(run())
+    assert order == ["{Blocker}", "{High}", "{Normal}", "{Low}"]
+
+
+def test_rate_limited_queries_are_retried():
+    """Test a 429 backs off, slows the base down and retries"""
+    attempts = []
+
+    async def execute(base, table, formula):
+        attempts.append(formula)
+        if len(attempts) == 1:
+            raise RateLimitedError(retry_after=0.01)
+        return "ok"
+
+    async def run():
+        async with Scheduler(execute, rate=100) as scheduler:
+            result = await scheduler.submit("app1", "Jobs", "{A}")
+            return result, scheduler.bucket("app1").rate, scheduler.stats
+
+    result, rate, stats = asyncio.run(run())
+    assert result == "ok"
+    assert len(attempts) == 2
+    assert stats.rate_limited == 1
+    assert rate < 100
+
+
+def test_retries_are_bounded():
+    """Test a query gives up after max_retries"""
+
+    async def execute(base, table, formula):
+        raise RateLimitedError(retry_after=0)
+
+    async def run():
+        async with Scheduler(execute, rate=1000, max_retries=2) as scheduler:
+            await scheduler.submit("app1", "Jobs", "{A}")
+
+    with pytest.raises(RateLimitedError):
+        asyncio.run(run())
+
+
+def test_paginated_queries_take_a_token_per_page():
+    """Test every page request waits for its own token"""
+    offsets = []
+
+    async def fetch_page(base, table, formula, offset):
+        offsets.append(offset)
+        page = int(offset or 0)
+        following = str(page + 1) if page < 9 else None
+        return {"records": [{"id": f"rec{page}"}], "offset": following}
+
+    async def run():
+        async with Scheduler(fetch_page, rate=50, burst=1, paginated=True) as scheduler:
+            start = time.monotonic()
+            records = await scheduler.submit("app1", "Jobs", "{A}")
+            return records, time.monotonic() - start, scheduler.stats
+
+    records, elapsed, stats = asyncio.run(run())
+    assert [r["id"] for r in records] == [f"rec{i}" for i in range(10)]
+    assert offsets == [None, *map(str, range(1, 10))]
+    assert stats.executed == 10
+    assert elapsed >= 9 / 50 * 0.9
+
+
+def test_rate_limited_page_resumes():
+    """Test a 429 mid-pagination retries that page, keeping the records already fetched"""
+    offsets = []
+
+    async def fetch_page(base, table, formula, offset):
+        offsets.append(offset)
+        if offset == "2" and offsets.count("2") == 1:
+            raise RateLimitedError(retry_after=0.01)
+        page = int(offset or 0)
+        return {"records": [{"id": f"rec{page}"}], "offset": str(page + 1) if page < 2 else None}
+
+    async def run():
+        async with Scheduler(fetch_page, rate=100, paginated=True) as scheduler:
+            return await scheduler.submit("app1", "Jobs", "{A}"), scheduler.stats
+
+    records, stats = asyncio.run(run())
+    assert [r["id"] for r in records] == ["rec0", "rec1", "rec2"]
+    assert offsets == [None, "1", "2", "2"]
+    assert stats.rate_limited == 1
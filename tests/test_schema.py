@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from airtableformulahelpers import (
+    AttachmentsField,
+    BooleanField,
+    DateField,
+    NumberField,
+    TextField,
+    TextListField,
+)
+from airtableformulahelpers.schema import UnknownFieldError, field_class, load_schema
+
+SCHEMA = {
+    "tables": [
+        {
+            "id": "tblJobs",
+            "name": "Jobs",
+            "primaryFieldId": "fldName",
+            "fields": [
+                {"id": "fldName", "name": "Name", "type": "singleLineText"},
+                {"id": "fldCount", "name": "Count", "type": "number", "options": {"precision": 0}},
+                {"id": "fldDue", "name": "Due Date", "type": "dateTime"},
+                {"id": "fldDone", "name": "Done", "type": "checkbox"},
+                {"id": "fldTags", "name": "Tags", "type": "multipleSelects"},
+                {"id": "fldFiles", "name": "Files", "type": "multipleAttachments"},
+                {
+                    "id": "fldTotal",
+                    "name": "Total",
+                    "type": "formula",
+                    "options": {"result": {"type": "currency"}},
+                },
+                {"id": "fldWho", "name": "Owner", "type": "singleCollaborator"},
+            ],
+        },
+        {"id": "tblOther", "name": "Other", "fields": []},
+    ]
+}
+
+
+@pytest.fixture
+def schema(tmp_path):
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(SCHEMA))
+    return load_schema(path)
+
+
+def test_field_types(schema):
+    """Test each Airtable type maps to its helper class"""
+    jobs = schema["Jobs"]
+    assert {name: type(jobs[name]) for name in jobs} == {
+        "Name": TextField,
+        "Count": NumberField,
+        "Due Date": DateField,
+        "Done": BooleanField,
+        "Tags": TextListField,
+        "Files": AttachmentsField,
+        "Total": NumberField,
+        "Owner": TextField,
+    }
+
+
+def test_lookup_by_name_or_id(schema):
+    """Test tables and fields resolve by name and by id to the same object"""
+    jobs = schema["tblJobs"]
+    assert jobs is schema["Jobs"]
+    assert jobs["fldDue"] is jobs["Due Date"]
+    assert jobs["fldCount"].greater_than(3) == "{Count}>3"
+    assert jobs.primary_field is jobs["Name"]
+
+
+def test_fields_are_built_lazily(schema):
+    """Test field objects are only created on access"""
+    jobs = schema["Jobs"]
+    assert jobs._fields == {}
+    jobs["Done"]
+    assert list(jobs._fields) == ["Done"]
+
+
+def test_typed_lookup(schema):
+    """Test an expected type is checked"""
+    jobs = schema["Jobs"]
+    assert jobs.field("Due Date", DateField).name == "Due Date"
+    with pytest.raises(TypeError, match="NumberField"):
+        jobs.field("Count", DateField)
+
+
+def test_unknown_names(schema):
+    """Test unknown tables and fields raise UnknownFieldError"""
+    assert "Nope" not in schema["Jobs"]
+    with pytest.raises(UnknownFieldError):
+        schema["Jobs"]["Nope"]
+    with pytest.raises(UnknownFieldError):
+        schema["Nope"]
+
+
+def test_field_class_of_nested_results():
+    """Test lookups and rollups use their result type"""
+    rollup = {"type": "rollup", "options": {"result": {"type": "date"}}}
+    assert field_class(rollup) is DateField
+    assert field_class({"type": "formula"}) is TextField
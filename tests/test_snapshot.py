@@ -0,0 +1,198 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from airtableformulahelpers import AND, DateField, NumberField, TextField, TextListField
+from airtableformulahelpers.evaluate import matches
+from airtableformulahelpers.snapshot import (
+    Snapshot,
+    SnapshotError,
+    append_snapshot,
+    infer_type,
+    write_snapshot,
+)
+
+RECORDS = [
+    {
+        "id": "rec1",
+        "fields": {
+            "Name": "Ada",
+            "Status": "Open",
+            "Count": 3,
+            "Done": True,
+            "Due": "2024-01-05T00:00:00.000Z",
+            "Tags": ["urgent", "ops"],
+        },
+    },
+    {"id": "rec2", "fields": {"Name": "Bob", "Status": "Open", "Count": 12.5, "Done": False}},
+    {"id": "rec3", "fields": {"Name": "Cy", "Status": "Closed", "Due": "2023-06-01"}},
+    {"id": "rec4", "fields": {}},
+]
+
+
+def test_round_trip(tmp_path):
+    """Test records read back from a snapshot with typed values"""
+    with write_snapshot(tmp_path / "jobs", RECORDS) as snapshot:
+        records = list(snapshot)
+        assert [record["id"] for record in records] == ["rec1", "rec2", "rec3", "rec4"]
+        assert records[0]["fields"] == {
+            "Name": "Ada",
+            "Status": "Open",
+            "Count": 3,
+            "Done": True,
+            "Due": datetime(2024, 1, 5, tzinfo=timezone.utc),
+            "Tags": ["urgent", "ops"],
+        }
+        assert records[3]["fields"] == {}
+        assert {name: column.type for name, column in snapshot.columns.items()} == {
+            "Name": "text",
+            "Status": "text",
+            "Count": "number",
+            "Done": "bool",
+            "Due": "date",
+            "Tags": "json",
+        }
+
+
+def test_reopen_is_zero_copy(tmp_path):
+    """Test a reopened snapshot reads columns straight from the mapped files"""
+    write_snapshot(tmp_path, RECORDS).close()
+    with Snapshot(tmp_path) as snapshot:
+        assert snapshot.columns["Count"].values.format == "d"
+        assert snapshot.columns["Due"].values.format == "q"
+        assert snapshot.columns["Count"][1] == 12.5
+        assert snapshot.get("rec3")["fields"]["Status"] == "Closed"
+
+
+def test_string_pool_deduplicates(tmp_path):
+    """Test repeated text values are stored once"""
+    with write_snapshot(tmp_path, RECORDS) as snapshot:
+        assert len(snapshot.columns["Status"]._pool) == 2
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        TextField(name="Status").equals("Open"),
+        NumberField(name="Count").greater_than(5),
+        DateField(name="Due").is_after("2023-12-31"),
+        TextListField(name="Tags").contains_any("ops"),
+        AND(TextField(name="Name").is_not_empty(), NumberField(name="Count").less_than(10)),
+    ],
+)
+def test_filter_matches_evaluation(tmp_path, formula):
+    """Test filtering a snapshot agrees with evaluating the JSON records"""
+    expected = [r["id"] for r in RECORDS if matches(formula, r["fields"], r["id"])]
+    with write_snapshot(tmp_path, RECORDS) as snapshot:
+        assert list(snapshot.filter(formula)) == expected
+
+
+def test_append_supersedes_and_adds_columns(tmp_path):
+    """Test appended rows replace earlier versions and new fields get a column"""
+    write_snapshot(tmp_path, RECORDS).close()
+    update = [
+        {"id": "rec2", "fields": {"Name": "Bob", "Status": "Closed", "Owner": "Dee"}},
+        {"id": "rec5", "fields": {"Name": "Eve", "Status": "Open"}},
+    ]
+    with append_snapshot(tmp_path, update) as snapshot:
+        assert snapshot.rows == 6
+        assert len(snapshot) == 5
+        assert [r["id"] for r in snapshot] == ["rec1", "rec3", "rec4", "rec2", "rec5"]
+        assert snapshot.get("rec2")["fields"] == {
+            "Name": "Bob",
+            "Status": "Closed",
+            "Owner": "Dee",
+        }
+        assert snapshot.get("rec1")["fields"].get("Owner") is None
+        assert len(snapshot.columns["Status"]._pool) == 2
+        assert list(snapshot.filter(TextField(name="Status").equals("Open"))) == ["rec1", "rec5"]
+
+
+def test_open_snapshot_is_unaffected_by_append(tmp_path):
+    """Test a reader keeps the rows of the manifest it opened"""
+    with write_snapshot(tmp_path, RECORDS) as before:
+        append_snapshot(tmp_path, [{"id": "rec9", "fields": {"Name": "Zed"}}]).close()
+        assert before.rows == 4
+        assert [r["id"] for r in before] == ["rec1", "rec2", "rec3", "rec4"]
+
+
+def test_interrupted_append_is_discarded(tmp_path):
+    """Test bytes written past the manifest are cut off by the next append"""
+    write_snapshot(tmp_path, RECORDS).close()
+    with open(tmp_path / "c1.data", "ab") as f:
+        f.write(b"\xff" * 12)
+    with open(tmp_path / "c1.pool", "ab") as f:
+        f.write(b"garbage")
+    with append_snapshot(tmp_path, [{"id": "rec5", "fields": {"Name": "Eve"}}]) as snapshot:
+        assert [r["fields"].get("Name") for r in snapshot] == ["Ada", "Bob", "Cy", None, "Eve"]
+
+
+def test_torn_append_is_ignored_by_readers(tmp_path):
+    """Test partial items past the committed length do not stop a snapshot opening"""
+    write_snapshot(tmp_path, RECORDS).close()
+    for name, torn in [("c1.data", b"\xff" * 3), ("c1.offsets", b"\x01" * 5), ("c3.data", b"\0")]:
+        with open(tmp_path / name, "ab") as f:
+            f.write(torn)
+    with Snapshot(tmp_path) as snapshot:
+        assert [r["fields"].get("Name") for r in snapshot] == ["Ada", "Bob", "Cy", None]
+
+
+def test_truncated_column_raises(tmp_path):
+    """Test a column file shorter than the manifest says is a SnapshotError"""
+    write_snapshot(tmp_path, RECORDS).close()
+    with open(tmp_path / "c1.data", "r+b") as f:
+        f.truncate(6)
+    with pytest.raises(SnapshotError, match="c1.data"):
+        Snapshot(tmp_path)
+    (tmp_path / "c1.data").write_bytes(b"")
+    with pytest.raises(SnapshotError, match="c1.data"):
+        Snapshot(tmp_path)
+
+
+def test_type_mismatch(tmp_path):
+    """Test a value that does not fit the column type is rejected"""
+    write_snapshot(tmp_path, RECORDS).close()
+    with pytest.raises(SnapshotError, match="Count"):
+        append_snapshot(tmp_path, [{"id": "rec5", "fields": {"Count": "many"}}])
+
+
+def test_types_override(tmp_path):
+    """Test explicit column types win over inference"""
+    records = [{"id": "rec1", "fields": {"Code": "2024-01-01"}}]
+    with write_snapshot(tmp_path, records, types={"Code": "text"}) as snapshot:
+        assert snapshot.get("rec1")["fields"]["Code"] == "2024-01-01"
+
+
+def test_infer_type():
+    """Test column type inference"""
+    assert infer_type([1, 2.5, None]) == "number"
+    assert infer_type([True, None]) == "bool"
+    assert infer_type(["2024-01-01", "2024-02-01T10:00:00.000Z"]) == "date"
+    assert infer_type(["2024-01-01", "soon"]) == "text"
+    assert infer_type([["a"], "b"]) == "json"
+    assert infer_type([None]) == "text"
+
+
+def test_missing_snapshot(tmp_path):
+    """Test opening a directory without a manifest fails"""
+    with pytest.raises(SnapshotError):
+        Snapshot(tmp_path)
+
+
+def test_write_replaces_only_snapshot_files(tmp_path):
+    """Test rewriting a snapshot leaves unrelated files in its directory alone"""
+    write_snapshot(tmp_path, RECORDS).close()
+    (tmp_path / "customers.csv").write_text("id\n")
+    (tmp_path / "config.json").write_text("{}")
+    with write_snapshot(tmp_path, RECORDS[:1]) as snapshot:
+        assert [r["id"] for r in snapshot] == ["rec1"]
+    assert (tmp_path / "customers.csv").exists()
+    assert (tmp_path / "config.json").exists()
+
+
+def test_write_refuses_other_directory(tmp_path):
+    """Test writing into a non-empty directory that is not a snapshot fails"""
+    (tmp_path / "customers.csv").write_text("id\n")
+    with pytest.raises(SnapshotError, match="not empty"):
+        write_snapshot(tmp_path, RECORDS)
+    assert (tmp_path / "customers.csv").exists()
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from airtableformulahelpers import AND, IF, NOT, DateField, NumberField, TextField, id_equals
+from airtableformulahelpers.spec import (
+    SpecError,
+    build,
+    compile_entries,
+    load_spec,
+    spec_entries,
+    spec_formula,
+)
+
+FIELDS = {"Status": "text", "Count": "number", "Due": "date", "Done": "boolean"}
+
+
+def test_build_field_comparisons():
+    """Test field conditions call the matching field helper"""
+    assert build({"field": "Status", "op": "equals", "value": "Open"}, FIELDS) == (
+        TextField(name="Status").equals("Open")
+    )
+    assert build({"field": "Count", "op": "greater_than", "value": 3}, FIELDS) == (
+        NumberField(name="Count").greater_than(3)
+    )
+    assert build(
+        {"field": "Status", "op": "contains", "value": "op", "case_sensitive": True}, FIELDS
+    ) == TextField(name="Status").contains("op", case_sensitive=True)
+
+
+def test_build_dates():
+    """Test absolute and relative date conditions"""
+    due = DateField(name="Due")
+    assert build({"field": "Due", "op": "is_after", "value": "2024-01-01"}, FIELDS) == (
+        due.is_after("2024-01-01")
+    )
+    assert build({"field": "Due", "op": "is_before", "days_ago": 7}, FIELDS) == (
+        due.is_before().days_ago(7)
+    )
+
+
+def test_build_logic():
+    """Test and/not/if combine nested conditions"""
+    condition = {
+        "if": {
+            "and": [
+                {"field": "Status", "op": "equals", "value": "Open"},
+                {"not": {"field": "Done", "op": "is_true"}},
+            ]
+        },
+        "then": "Pending",
+        "else": "",
+        "string": True,
+    }
+    status = TextField(name="Status").equals("Open")
+    expected = (
+        IF(AND(status, NOT("{Done}=TRUE()"))).THEN("Pending", string=True).ELSE("", string=True)
+    )
+    assert build(condition, FIELDS) == expected
+
+
+def test_build_raw_formulas():
+    """Test raw formula strings pass through"""
+    assert build("{A}>1") == "{A}>1"
+    assert build({"formula": "{A}>1"}) == "{A}>1"
+    assert build({"id": "rec1"}) == id_equals("rec1")
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        {"field": "Status", "op": "explode"},
+        {"field": "Status", "type": "colour", "op": "equals", "value": "x"},
+        {"field": "Due", "op": "is_after"},
+        {"and": {"field": "Status"}},
+        {"unknown": 1},
+        42,
+    ],
+)
+def test_build_errors(condition):
+    """Test malformed conditions raise SpecError"""
+    with pytest.raises(SpecError):
+        build(condition, FIELDS)
+
+
+def test_load_spec(tmp_path):
+    """Test JSON and YAML specs load the same"""
+    spec = {"fields": FIELDS, "formulas": {"open": {"field": "Status", "op": "is_not_empty"}}}
+    (tmp_path / "spec.json").write_text(json.dumps(spec))
+    (tmp_path / "spec.yaml").write_text(
+        "fields:\n  Status: text\nformulas:\n  open: {field: Status, op: is_not_empty}\n"
+    )
+    loaded = load_spec(tmp_path / "spec.json")
+    assert spec_formula(loaded) == TextField(name="Status").is_not_empty()
+    pytest.importorskip("yaml")
+    assert spec_formula(load_spec(tmp_path / "spec.yaml"), "open") == spec_formula(loaded)
+
+
+def test_spec_formula_needs_a_name():
+    """Test choosing among several formulas requires a name"""
+    spec = {"formulas": {"a": "{A}", "b": "{B}"}}
+    assert spec_formula(spec, "b") == "{B}"
+    with pytest.raises(SpecError):
+        spec_formula(spec)
+    with pytest.raises(SpecError):
+        spec_formula(spec, "c")
+
+
+def test_compile_entries_in_order():
+    """Test compiled entries keep spec order, with or without worker processes"""
+    spec = {
+        "fields": {"Count": "number"},
+        "formulas": {
+            f"over_{i}": {"field": "Count", "op": "greater_than", "value": i} for i in range(20)
+        },
+    }
+    spec["formulas"]["broken"] = {"field": "Count", "op": "explode"}
+    serial = list(compile_entries(spec_entries(spec), workers=1))
+    assert serial[0] == {"name": "over_0", "formula": "{Count}>0"}
+    assert serial[-1]["name"] == "broken" and "explode" in serial[-1]["error"]
+    assert list(compile_entries(spec_entries(spec), workers=2)) == serial
@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from airtableformulahelpers import AND, OR, BooleanField, NumberField, TextField, id_equals
+from airtableformulahelpers.evaluate import matches
+from airtableformulahelpers.formula import BinOp, Call, FieldRef, LiteralList, Members, Str
+from airtableformulahelpers.split import (
+    DEFAULT_BUDGET,
+    SplitError,
+    merge_records,
+    split_formula,
+    url_length,
+)
+
+tag = TextField(name="Tag")
+count = NumberField(name="Count")
+active = BooleanField(name="Active")
+faceted = AND(active.is_true(), OR(*(tag.equals(f"value-{i}") for i in range(300))))
+records = [
+    {"id": f"rec{i}", "fields": {"Tag": f"value-{i % 400}", "Active": i % 3 != 0}}
+    for i in range(800)
+]
+id_records = [{"id": f"rec{i:014d}"} for i in range(600)]
+
+
+def test_short_formula_is_not_split():
+    """Test a formula under the budget comes back alone, compacted"""
+    assert split_formula("OR({A} = 1, {B} = 2)") == ["OR({A}=1,{B}=2)"]
+
+
+def test_split_fits_budget_and_keeps_context():
+    """Test every part is under the budget and repeats the AND context"""
+    queries = split_formula(faceted, budget=1000)
+    assert len(queries) > 1
+    assert all(url_length(query) <= 1000 for query in queries)
+    assert all(query.startswith("AND({Active}=TRUE(),OR(") for query in queries)
+
+
+def test_split_matches_the_same_records():
+    """Test the merged results of the parts equal the results of the whole formula"""
+    queries = split_formula(faceted, budget=800, size=len)
+    expected = [r for r in records if matches(faceted, r["fields"], r["id"])]
+    parts = [[r for r in records if matches(q, r["fields"], r["id"])] for q in queries]
+    assert sorted(r["id"] for r in merge_records(parts)) == sorted(r["id"] for r in expected)
+
+
+def test_split_uses_few_queries():
+    """Test packing needs no more queries than one over the size lower bound"""
+    formula = OR(*(count.equals(i * 7919 % 100_000) for i in range(500)))
+    queries = split_formula(formula, budget=600, size=len)
+    total = sum(len(q) for q in queries)
+    assert len(queries) <= total // 600 + 2
+
+
+def test_unsplittable_formula_raises():
+    """Test a long formula without an OR, or with an oversized condition, is an error"""
+    with pytest.raises(SplitError):
+        split_formula(AND(*(count.equals(i) for i in range(100))), budget=50)
+    with pytest.raises(SplitError):
+        split_formula(OR(tag.equals("x" * 100), tag.equals("y")), budget=60, size=len)
+
+
+def test_merge_records_deduplicates_by_id():
+    """Test records returned by several sub-queries appear once, in first-seen order"""
+    merged = merge_records([[{"id": "a"}, {"id": "b"}], [{"id": "b"}, {"id": "c"}]])
+    assert [r["id"] for r in merged] == ["a", "b", "c"]
+
+
+def test_split_membership_node():
+    """Test a packed membership node splits into smaller membership nodes"""
+    ids = Members.record_ids([f"rec{i:014d}" for i in range(500)])
+    queries = split_formula(ids, budget=2000)
+    assert all(url_length(query) <= 2000 for query in queries)
+    parts = [[r for r in id_records if matches(q, {}, r["id"])] for q in queries]
+    assert len(merge_records(parts)) == 500
+
+
+def test_split_membership_node_inside_or():
+    """Test a membership node among other disjuncts is split into chunks like a plain OR"""
+    ids = [f"rec{i:014d}" for i in range(3000)]
+    formula = Call("OR", (Members.record_ids(ids), FieldRef("X")))
+    queries = split_formula(formula)
+    plain = split_formula(OR(*(id_equals(i) for i in ids), "{X}"))
+    assert len(queries) == len(plain) > 1
+    assert all(url_length(query) <= DEFAULT_BUDGET for query in queries)
+    rows = [{"id": i, "fields": {}} for i in ids[::150]] + [{"id": "recX", "fields": {"X": 1}}]
+    parts = [[r for r in rows if matches(q, r["fields"], r["id"])] for q in queries]
+    assert len(merge_records(parts)) == len(rows)
+
+
+def test_split_parts_fit_budget_whatever_the_quotes():
+    """Test random membership lists mixing both quotes split into parts all under the budget"""
+    for seed in range(1000):
+        rng = random.Random(seed)
+        values = {
+            "".join(rng.choice("ab'\"\\") for _ in range(rng.randint(1, 4))) + str(i)
+            for i in range(rng.randint(2, 12))
+        }
+        packed = Members(FieldRef("S"), LiteralList(sorted(values)), rng.choice("'\""))
+        formula = rng.choice([packed, Call("OR", (packed, BinOp("=", FieldRef("T"), Str("x"))))])
+        size = rng.choice([len, url_length])
+        budget = rng.randint(40, 200)
+        try:
+            queries = split_formula(formula, budget=budget, size=size)
+        except SplitError:
+            continue
+        assert all(size(query) <= budget for query in queries), (seed, queries)
+        for value in values:
+            assert any(matches(query, {"S": value}) for query in queries), (seed, value)
@@ -0,0 +1,202 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from airtableformulahelpers import (
+    AND,
+    IF,
+    NOT,
+    OR,
+    XOR,
+    BooleanField,
+    DateField,
+    NumberField,
+    TextField,
+    id_equals,
+)
+from airtableformulahelpers.evaluate import matches
+from airtableformulahelpers.sqlite import (
+    SqlTranslationError,
+    quote_identifier,
+    register_functions,
+    suggest_indexes,
+    to_sqlite,
+)
+from airtableformulahelpers.synthetic import FIELD_MIX, Workload
+
+name = TextField(name="Name")
+email = TextField(name="Email")
+count = NumberField(name="Count")
+done = BooleanField(name="Done")
+due = DateField(name="Due Date")
+
+RECORDS = [
+    {
+        "id": "rec1",
+        "fields": {
+            "Name": "Ada",
+            "Email": " ada@Example.com",
+            "Count": 3,
+            "Done": 1,
+            "Due Date": "2024-01-05T00:00:00.000Z",
+        },
+    },
+    {
+        "id": "rec2",
+        "fields": {
+            "Name": "Bob",
+            "Email": "bob@test.org",
+            "Count": 12,
+            "Due Date": "2023-06-01T00:00:00.000Z",
+        },
+    },
+    {"id": "rec3", "fields": {"Name": "", "Count": 0}},
+    {
+        "id": "rec4",
+        "fields": {
+            "Name": "Cy",
+            "Email": "cy@example.COM",
+            "Count": 7,
+            "Done": 0,
+            "Due Date": "2024-02-01",
+        },
+    },
+    {"id": "rec5", "fields": {"Name": "Dee"}},
+]
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    register_functions(connection)
+    connection.execute(
+        'CREATE TABLE "Jobs" (id TEXT, "Name" TEXT, "Email" TEXT, "Count" INTEGER, '
+        '"Done" INTEGER, "Due Date" TEXT)'
+    )
+    for record in RECORDS:
+        f = record["fields"]
+        connection.execute(
+            'INSERT INTO "Jobs" VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                record["id"],
+                f.get("Name"),
+                f.get("Email"),
+                f.get("Count"),
+                f.get("Done"),
+                f.get("Due Date"),
+            ),
+        )
+    return connection
+
+
+def _ids(connection, formula):
+    sql, params = to_sqlite(formula).select("Jobs", "id")
+    return sorted(row[0] for row in connection.execute(sql, params))
+
+
+def _expected(formula):
+    return sorted(r["id"] for r in RECORDS if matches(formula, r["fields"], r["id"]))
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        name.equals("Ada"),
+        name.not_equals("Ada"),
+        name.is_empty(),
+        name.is_not_empty(),
+        email.contains("example"),
+        email.ends_with(".com"),
+        email.starts_with("bob", case_sensitive=True, trim=False),
+        email.regex_match(r"@example\.com$"),
+        count.greater_than(5),
+        count.less_than_or_equals(3),
+        done.is_true(),
+        due.is_after("2023-12-31"),
+        due.is_on_or_before("2024-01-05"),
+        due.is_before().days_ago(30),
+        due.is_before().months_ago(3),
+        id_equals("rec2"),
+        AND(count.greater_than(1), OR(name.equals("Ada"), name.equals("Cy"))),
+        NOT(count.greater_than(5)),
+        XOR(count.greater_than(5), email.contains("example")),
+        IF(count.greater_than(5)).THEN(name.equals("Bob")).ELSE(name.equals("Ada")),
+        '{Name} & "!" = "Ada!"',
+        done.is_false(),
+        NOT(done.is_true()),
+        "{Done}!=FALSE()",
+        count.less_than(10),
+        count.greater_than_or_equals(0),
+        "{Count}+1>0",
+        "-{Count}>=0",
+        XOR(done.is_false(), count.less_than(5)),
+        "DATETIME_DIFF(NOW(), {Due Date}, 'days')<30",
+        '{Email}=""',
+        '{Email}!=""',
+        '""={Name}',
+        '""!={Name}',
+        "{Name}=BLANK()",
+        'FALSE()=""',
+        'FIND("o", {Email}, 2)>0',
+        'FIND("b", {Email}, 4)>0',
+        'FIND("e", {Email}, {Count})=10',
+        'FIND("a", {Email}, -3)=2',
+        'FIND("", {Name}, 4)>0',
+    ],
+)
+def test_sqlite_matches_local_evaluation(connection, formula):
+    """Test the SQL translation selects the same records as the evaluator"""
+    assert _ids(connection, formula) == _expected(formula)
+
+
+def test_synthetic_formulas_match_local_evaluation():
+    """Test SQL and the evaluator agree on random formulas over records with blank fields"""
+    # Attachment lists have no column form whose LEN() matches the evaluator's list length.
+    mix = {kind: weight for kind, weight in FIELD_MIX.items() if kind != "attachments"}
+    workload = Workload(seed=3, field_mix=mix, blank_rate=0.3)
+    records = list(workload.records(100))
+    names = list(workload.field_types)
+    connection = sqlite3.connect(":memory:")
+    register_functions(connection)
+    connection.execute(f"CREATE TABLE t (id TEXT, {', '.join(map(quote_identifier, names))})")
+    for record in records:
+        values = [record["fields"].get(name) for name in names]
+        row = [record["id"], *(", ".join(v) if isinstance(v, list) else v for v in values)]
+        connection.execute(f"INSERT INTO t VALUES ({', '.join('?' * len(row))})", row)
+    now = datetime.now(timezone.utc)
+    for formula in workload.formulas(200):
+        sql, params = to_sqlite(formula).select("t", "id")
+        selected = sorted(row[0] for row in connection.execute(sql, params))
+        expected = sorted(r["id"] for r in records if matches(formula, r["fields"], r["id"], now))
+        assert selected == expected, formula
+
+
+def test_translation_is_parameterized():
+    """Test literals become parameters"""
+    query = to_sqlite(TextField(name="Name").equals("x'; DROP TABLE Jobs; --"))
+    assert query.where == '("Name" IS ?)'
+    assert query.params == ["x'; DROP TABLE Jobs; --"]
+    assert query.fields == {"Name"}
+
+
+def test_text_functions_translate():
+    """Test FIND/LOWER/TRIM map to instr/lower/trim"""
+    assert to_sqlite(email.contains("a")).where == (
+        "(instr(COALESCE(trim(lower(\"Email\")), ''), COALESCE(trim(lower(?)), '')) > ?)"
+    )
+
+
+def test_suggest_indexes():
+    """Test indexes are suggested for sargable comparisons only"""
+    formula = AND(count.greater_than(5), due.is_after("2024-01-01"), email.contains("x"))
+    assert suggest_indexes(formula, "Jobs") == [
+        'CREATE INDEX IF NOT EXISTS "idx_jobs_count" ON "Jobs" (COALESCE("Count", 0))',
+        'CREATE INDEX IF NOT EXISTS "idx_jobs_due_date_jd" ON "Jobs" (julianday("Due Date"))',
+    ]
+
+
+def test_untranslatable_function():
+    """Test functions without a translation are rejected"""
+    with pytest.raises(SqlTranslationError):
+        to_sqlite("SOMETHING({A})")
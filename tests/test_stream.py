@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+from airtableformulahelpers.stream import detect_format, filter_items, read_items, write_items
+
+RECORDS = [
+    {"id": f"rec{i}", "fields": {"Status": "Open" if i % 3 else "Done", "Count": i}}
+    for i in range(50)
+]
+NDJSON = "".join(json.dumps(record) + "\n" for record in RECORDS)
+
+
+def test_detect_format():
+    """Test formats are guessed from the file suffix"""
+    assert detect_format("export.CSV") == "csv"
+    assert detect_format("export.jsonl") == "ndjson"
+    assert detect_format(None) == "ndjson"
+
+
+def test_filter_ndjson_keeps_lines():
+    """Test matching NDJSON lines pass through unchanged and in order"""
+    items, _ = read_items(io.StringIO(NDJSON + "\n"), "ndjson")
+    matched = list(filter_items(items, '{Status}="Done"', chunk_size=7))
+    assert matched == [json.dumps(r) for r in RECORDS if r["fields"]["Status"] == "Done"]
+
+
+def test_filter_flat_objects():
+    """Test NDJSON objects without a fields key are treated as the fields"""
+    items, _ = read_items(io.StringIO('{"id": "a", "N": 1}\n{"id": "b", "N": 5}\n'), "ndjson")
+    assert list(filter_items(items, 'AND({N}>2, RECORD_ID()="b")')) == ['{"id": "b", "N": 5}']
+
+
+def test_filter_csv():
+    """Test CSV rows are filtered and written back with their header"""
+    source = io.StringIO("id,Status,Count\nrec1,Open,3\nrec2,Done,12\nrec3,Open,20\n")
+    items, fieldnames = read_items(source, "csv")
+    target = io.StringIO()
+    count = write_items(target, filter_items(items, "{Count}>5"), "csv", fieldnames)
+    assert count == 2
+    assert target.getvalue().splitlines() == ["id,Status,Count", "rec2,Done,12", "rec3,Open,20"]
+
+
+def test_filter_with_workers():
+    """Test process workers give the same matches in input order"""
+    items, _ = read_items(io.StringIO(NDJSON), "ndjson")
+    expected = [json.dumps(r) for r in RECORDS if r["fields"]["Count"] > 20]
+    assert list(filter_items(items, "{Count}>20", chunk_size=4, workers=2)) == expected
+
+
+def test_filter_is_lazy():
+    """Test records are only read as matches are consumed"""
+    consumed = []
+
+    def lines():
+        for record in RECORDS:
+            consumed.append(record["id"])
+            yield json.dumps(record)
+
+    first = next(filter_items(lines(), "{Count}>0", chunk_size=5))
+    assert json.loads(first)["id"] == "rec1"
+    assert len(consumed) == 5
+
+
+def test_filter_rejects_bad_sizes():
+    """Test chunk size and worker count must be positive"""
+    with pytest.raises(ValueError):
+        list(filter_items([], "{A}", chunk_size=0))
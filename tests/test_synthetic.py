@@ -0,0 +1,50 @@
+import pytest
+
+from airtableformulahelpers.evaluate import evaluate
+from airtableformulahelpers.formula import parse
+from airtableformulahelpers.schema import BaseSchema
+from airtableformulahelpers.synthetic import Workload
+
+
+def test_same_seed_same_workload():
+    """Test the same seed and settings give identical formulas and records"""
+    assert list(Workload(seed=7).formulas(20)) == list(Workload(seed=7).formulas(20))
+    assert list(Workload(seed=7).records(20)) == list(Workload(seed=7).records(20))
+    assert list(Workload(seed=7).formulas(20)) != list(Workload(seed=8).formulas(20))
+
+
+def test_streams_are_independent():
+    """Test formulas do not depend on how many records were drawn"""
+    workload = Workload(seed=1)
+    first = list(workload.formulas(5))
+    list(workload.records(100))
+    assert list(workload.formulas(5)) == first
+    assert workload.formula(3) == first[3]
+
+
+def test_formulas_parse_and_evaluate():
+    """Test generated formulas parse and evaluate against generated records"""
+    workload = Workload(seed=3, depth=4)
+    records = list(workload.records(50))
+    matched = 0
+    for formula in workload.formulas(30):
+        parse(formula)
+        matched += sum(bool(evaluate(formula, record["fields"])) for record in records)
+    assert matched > 0
+
+
+def test_depth_zero_and_field_mix():
+    """Test depth 0 gives single comparisons and field_mix limits the field types"""
+    workload = Workload(depth=0, field_mix={"number": 1})
+    assert set(workload.field_types.values()) == {"number"}
+    assert all(formula.startswith("{Number") for formula in workload.formulas(10))
+    with pytest.raises(ValueError):
+        Workload(field_mix={"emoji": 1})
+
+
+def test_schema_loads():
+    """Test the exported schema types every field with the matching helper"""
+    workload = Workload(fields=12)
+    table = BaseSchema(workload.schema())["Synthetic"]
+    for name in workload.field_types:
+        assert type(table[name]) is type(workload._objects[name])
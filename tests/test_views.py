@@ -0,0 +1,80 @@
+from airtableformulahelpers import AND, NumberField, TextField
+from airtableformulahelpers.views import ViewEvent, ViewIndex
+
+status = TextField(name="Status")
+count = NumberField(name="Count")
+owner = TextField(name="Owner")
+
+
+def _index():
+    index = ViewIndex()
+    index.register("open", status.equals("Open"))
+    index.register("big", count.greater_than(10))
+    index.register("mine", AND(owner.equals("me"), status.equals("Open")))
+    return index
+
+
+def test_new_record_checks_every_view():
+    """Test a first-seen record is evaluated against all views"""
+    index = _index()
+    events = index.apply("rec1", {"Status": "Open", "Count": 20})
+    assert events == [ViewEvent("big", "rec1", "enter"), ViewEvent("open", "rec1", "enter")]
+    assert index.evaluations == 3
+
+
+def test_change_only_evaluates_affected_views():
+    """Test a change re-evaluates only views referencing the changed field"""
+    index = _index()
+    index.load([{"id": "rec1", "fields": {"Status": "Open", "Count": 20, "Owner": "me"}}])
+    index.evaluations = 0
+    events = index.apply("rec1", {"Count": 5})
+    assert events == [ViewEvent("big", "rec1", "leave")]
+    assert index.evaluations == 1
+
+
+def test_enter_and_leave_on_shared_field():
+    """Test views sharing a field all receive events"""
+    index = _index()
+    index.load([{"id": "rec1", "fields": {"Status": "Open", "Owner": "me"}}])
+    events = index.apply("rec1", {status.name: "Closed"})
+    assert events == [ViewEvent("mine", "rec1", "leave"), ViewEvent("open", "rec1", "leave")]
+    assert index.members("open") == frozenset()
+
+
+def test_unrelated_change_is_free():
+    """Test changing an unreferenced field evaluates nothing"""
+    index = _index()
+    index.apply("rec1", {"Status": "Open"})
+    index.evaluations = 0
+    assert index.apply("rec1", {"Notes": "hello"}) == []
+    assert index.evaluations == 0
+
+
+def test_remove_record():
+    """Test deleting a record leaves its views"""
+    index = _index()
+    index.apply("rec1", {"Status": "Open", "Count": 11})
+    assert index.remove("rec1") == [
+        ViewEvent("big", "rec1", "leave"),
+        ViewEvent("open", "rec1", "leave"),
+    ]
+
+
+def test_register_after_load():
+    """Test a view registered later is evaluated against mirrored records"""
+    index = ViewIndex()
+    index.load([{"id": "rec1", "fields": {"Count": 3}}, {"id": "rec2", "fields": {"Count": 30}}])
+    assert index.register("big", count.greater_than(10)) == [ViewEvent("big", "rec2", "enter")]
+
+
+def test_reregister_reports_only_changes():
+    """Test replacing a view's formula only reports records whose membership changed"""
+    index = ViewIndex()
+    index.register("big", count.greater_than(10))
+    index.load([{"id": f"rec{n}", "fields": {"Count": n}} for n in (5, 15, 25)])
+    assert index.register("big", count.greater_than(20)) == [ViewEvent("big", "rec15", "leave")]
+    assert index.register("big", count.greater_than(1)) == [
+        ViewEvent("big", "rec5", "enter"),
+        ViewEvent("big", "rec15", "enter"),
+    ]
+    assert index.members("big") == {"rec5", "rec15", "rec25"}